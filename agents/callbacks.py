@@ -0,0 +1,113 @@
+import os
+import time
+import statistics
+
+import psutil
+from ray.rllib.callbacks.callbacks import RLlibCallback
+
+from environment import profiling
+
+# Training phases timed by the algorithm: result key -> RLlib timer name
+PHASE_TIMERS = {"sample_s": "sample", "learn_s": "learn", "sync_weights_s": "synch_weights"}
+
+
+# Function: Drain the step profiler of the process an env runner lives in
+def _drain_profiler(env_runner):
+    return profiling.drain(reset=True)
+
+
+# Class: Adds per-phase step timings from every env runner to the training result
+# as result["profiling"], which the CSV logger flattens into progress.csv columns
+# ("profiling/env.interact/total_s", ...). Dumps every `profile_every` iterations
+# (env_config key, default 1) and always on the first, since progress.csv takes its
+# columns from the first result. Each dump covers the time since the previous one.
+class ProfilingCallbacks(RLlibCallback):
+    def on_train_result(self, *, algorithm, metrics_logger=None, result, **kwargs):
+        every = max(1, int(algorithm.config.env_config.get("profile_every", 1)))
+        iteration = int(result.get("training_iteration", 1))
+        if (iteration - 1) % every:
+            return
+
+        merged = profiling.PhaseProfiler()
+        for snapshot in algorithm.env_runner_group.foreach_env_runner(_drain_profiler, local_env_runner=True):
+            merged.merge(snapshot or {})
+        result["profiling"] = merged.snapshot()
+
+
+# Function: Resident memory (MiB) of the process an env runner lives in
+def _process_rss_mb(env_runner=None):
+    return psutil.Process(os.getpid()).memory_info().rss / 2**20
+
+
+# Function: Cumulative seconds per training phase so far (RLlib keeps running totals in _timers)
+def _phase_totals(algorithm):
+    timers = getattr(algorithm, "_timers", {})
+    return {key: float(getattr(timers.get(name), "_total_time", 0.0) or 0.0) for key, name in PHASE_TIMERS.items()}
+
+
+# Class: Adds training speed to every result as result["throughput"] (progress.csv columns
+# "throughput/env_steps_per_sec", ...). wall_s is the time since the previous result, so it
+# also covers what the training loop does between iterations (checkpoints, evaluation).
+# Env runners sample in lockstep with learning, so they idle for everything but sampling.
+class ThroughputCallbacks(RLlibCallback):
+    def on_algorithm_init(self, *, algorithm, metrics_logger=None, **kwargs):
+        self._last = (time.perf_counter(), _phase_totals(algorithm))
+
+    def on_train_result(self, *, algorithm, metrics_logger=None, result, **kwargs):
+        now = time.perf_counter()
+        phases = _phase_totals(algorithm)
+        last_time, last_phases = getattr(self, "_last", (now - result.get("time_this_iter_s", 0.0), phases))
+        self._last = (now, phases)
+
+        wall = now - last_time
+        delta = {key: phases[key] - last_phases.get(key, 0.0) for key in phases}
+        steps = int(result.get("num_env_steps_sampled_this_iter", 0) or 0)
+        episodes = int((result.get("env_runners") or {}).get("episodes_this_iter", 0) or 0)
+
+        remote_rss = []
+        if algorithm.env_runner_group.num_remote_env_runners() > 0:
+            remote_rss = algorithm.env_runner_group.foreach_env_runner(_process_rss_mb, local_env_runner=False)
+
+        def per_sec(count, seconds):
+            return count / seconds if seconds > 0 else 0.0
+
+        idle = max(0.0, wall - delta["sample_s"])
+        result["throughput"] = {
+            "wall_s": wall,
+            "env_steps": steps,
+            "env_steps_per_sec": per_sec(steps, wall),
+            "sampling_steps_per_sec": per_sec(steps, delta["sample_s"]),
+            "episodes": episodes,
+            "episodes_per_sec": per_sec(episodes, wall),
+            **delta,
+            "env_runner_idle_s": idle,
+            "env_runner_idle_share": idle / wall if wall > 0 else 0.0,
+            "driver_rss_mb": _process_rss_mb(),
+            "env_runner_rss_mb": sum(remote_rss),
+        }
+
+
+# Function: Whole-run summary of the per-iteration throughput rows
+def summarise_throughput(rows):
+    if not rows:
+        return {"iterations": 0}
+
+    def total(key):
+        return float(sum(row[key] for row in rows))
+
+    wall = total("wall_s")
+    summary = {
+        "iterations": len(rows),
+        "wall_s": wall,
+        "env_steps": int(total("env_steps")),
+        "env_steps_per_sec": total("env_steps") / wall if wall > 0 else 0.0,
+        "env_steps_per_sec_median": statistics.median(row["env_steps_per_sec"] for row in rows),
+        "episodes": int(total("episodes")),
+        "episodes_per_sec": total("episodes") / wall if wall > 0 else 0.0,
+    }
+    for key in list(PHASE_TIMERS) + ["env_runner_idle_s"]:
+        summary[key] = total(key)
+        summary[key[:-2] + "_share"] = total(key) / wall if wall > 0 else 0.0
+    summary["driver_rss_mb_peak"] = max(row["driver_rss_mb"] for row in rows)
+    summary["env_runner_rss_mb_peak"] = max(row["env_runner_rss_mb"] for row in rows)
+    return summary
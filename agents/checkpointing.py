@@ -0,0 +1,304 @@
+import os
+import re
+import copy
+import json
+import pickle
+import queue
+import shutil
+import threading
+
+# Sidecar in each checkpoint with the episode-seed RNG state of every sampling env
+ENV_RNG_FILE = "env_rng.pkl"
+# Marker of a compacted, weights-only checkpoint (policies/ only, no optimizer or algorithm state)
+WEIGHTS_ONLY_FILE = "weights_only.json"
+
+
+# Function: Episode-seed RNG states of one env runner's envs, keyed "<worker_index>/<vector_index>"
+def _env_rng_states(env_runner):
+    states = env_runner.foreach_env_with_context(
+        lambda env, ctx: (f"{ctx.worker_index}/{ctx.vector_index}",
+                          env.get_rng_state() if hasattr(env, "get_rng_state") else None)
+    )
+    return {key: state for key, state in states if state is not None}
+
+
+# Function: Put saved RNG states back into one env runner's envs, returning how many matched
+def _set_env_rng_states(states, env_runner):
+    def apply(env, ctx):
+        state = states.get(f"{ctx.worker_index}/{ctx.vector_index}")
+        if state is None or not hasattr(env, "set_rng_state"):
+            return 0
+        env.set_rng_state(state)
+        return 1
+    return sum(env_runner.foreach_env_with_context(apply))
+
+
+# Function: Episode-seed RNG states of every sampling env (local and remote env runners)
+def collect_env_rng(algo):
+    states = {}
+    for runner_states in algo.env_runner_group.foreach_env_runner(_env_rng_states, local_env_runner=True):
+        states.update(runner_states)
+    return states
+
+
+# Function: Restore the states from collect_env_rng; envs with no saved state (e.g. after
+# changing the runner count) keep their seed-derived RNG. Returns how many envs were restored.
+def restore_env_rng(algo, states):
+    return sum(algo.env_runner_group.foreach_env_runner(
+        lambda runner: _set_env_rng_states(states, runner), local_env_runner=True))
+
+
+# Function: Newest complete full checkpoint under `checkpoint_root` as (step, path), or None.
+# Directories still being written (.tmp) and weights-only checkpoints are skipped.
+def latest_checkpoint(checkpoint_root):
+    found = full_checkpoints(checkpoint_root)
+    return found[-1] if found else None
+
+
+# Function: Complete full (resumable) checkpoints under `checkpoint_root` as sorted [(step, path)]
+def full_checkpoints(checkpoint_root):
+    found = []
+    if os.path.isdir(checkpoint_root):
+        for name in os.listdir(checkpoint_root):
+            match = re.fullmatch(r"checkpoint_(\d+)", name)
+            path = os.path.join(checkpoint_root, name)
+            if match and os.path.isfile(os.path.join(path, "rllib_checkpoint.json")):
+                found.append((int(match.group(1)), path))
+    return sorted(found)
+
+
+# Function: Whether `path` is a weights-only checkpoint made by compact_checkpoint
+def is_weights_only(path):
+    return os.path.isfile(os.path.join(path, WEIGHTS_ONLY_FILE))
+
+
+# Function: Turn a full checkpoint into a weights-only one in place. Keeps each policy's
+# policy_state.pkl (weights and policy spec, which is all evaluation needs) without its
+# optimizer state, and drops algorithm_state.pkl and the env RNG sidecar.
+# Returns the bytes freed.
+def compact_checkpoint(path):
+    import ray.cloudpickle as cloudpickle
+
+    path = os.path.abspath(path)
+    before = _dir_bytes(path)
+    tmp_dir = path + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    policies_dir = os.path.join(path, "policies")
+    policy_ids = sorted(os.listdir(policies_dir)) if os.path.isdir(policies_dir) else []
+    if not policy_ids:
+        raise ValueError(f"{path}: no policies/ to keep")
+
+    for pid in policy_ids:
+        src = os.path.join(policies_dir, pid)
+        dst = os.path.join(tmp_dir, "policies", pid)
+        os.makedirs(dst)
+        with open(os.path.join(src, "policy_state.pkl"), "rb") as f:
+            policy_state = cloudpickle.load(f)
+        policy_state.pop("_optimizer_variables", None)
+        with open(os.path.join(dst, "policy_state.pkl"), "wb") as f:
+            cloudpickle.dump(policy_state, f)
+        shutil.copy2(os.path.join(src, "rllib_checkpoint.json"), dst)
+
+    with open(os.path.join(tmp_dir, WEIGHTS_ONLY_FILE), "w") as f:
+        json.dump({"policy_ids": policy_ids}, f)
+
+    # Swap directories so the full checkpoint is only deleted once the compact one is in place
+    old_dir = path + ".old"
+    shutil.rmtree(old_dir, ignore_errors=True)
+    os.replace(path, old_dir)
+    os.replace(tmp_dir, path)
+    shutil.rmtree(old_dir)
+    return before - _dir_bytes(path)
+
+
+def _dir_bytes(path):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+# Function: Split full checkpoints into (keep, compact): the newest `keep_last` stay full so
+# training can resume, as do the steps in `keep_steps`; the rest are compacted.
+# best_checkpoint/ is never touched (its name is not checkpoint_<step>).
+def plan_retention(checkpoint_root, keep_last, keep_steps=()):
+    found = full_checkpoints(checkpoint_root)
+    newest = found[-keep_last:] if keep_last > 0 else []
+    keep = [(step, path) for step, path in found if (step, path) in newest or step in set(keep_steps)]
+    compact = [(step, path) for step, path in found if (step, path) not in keep]
+    return keep, compact
+
+
+# Function: Compact every full checkpoint the retention policy does not keep.
+# Returns [(step, path, bytes_freed)].
+def apply_retention(checkpoint_root, keep_last, keep_steps=()):
+    _, compact = plan_retention(checkpoint_root, keep_last, keep_steps)
+    return [(step, path, compact_checkpoint(path)) for step, path in compact]
+
+
+# Function: Copy of an (old API stack) algorithm's state that training can no longer change.
+# Policy weights and optimizer tensors come back as numpy views of the live parameters,
+# so they are deep-copied here; this is the only part of a save the training loop waits for.
+# Returns (algorithm state without policies, {policy_id: policy state}).
+def snapshot_algorithm(algo):
+    state = algo.__getstate__()
+    policy_states = {}
+    if "worker" in state and "policy_states" in state["worker"]:
+        policy_states = state["worker"].pop("policy_states", {})
+    return copy.deepcopy(state), copy.deepcopy(policy_states)
+
+
+# Function: Write a snapshot in the layout Algorithm.save_checkpoint uses, so
+# Algorithm.from_checkpoint and Policy.from_checkpoint load it unchanged.
+# Files go to a temporary sibling directory that is renamed into place at the end,
+# so an interrupted write never leaves a checkpoint that looks complete.
+def write_checkpoint(checkpoint_dir, state, policy_states, env_rng=None):
+    import ray
+    import ray.cloudpickle as cloudpickle
+    from ray.rllib.utils.checkpoints import CHECKPOINT_VERSION
+
+    checkpoint_dir = os.path.abspath(checkpoint_dir)
+    tmp_dir = checkpoint_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    state["checkpoint_version"] = CHECKPOINT_VERSION
+    with open(os.path.join(tmp_dir, "algorithm_state.pkl"), "wb") as f:
+        cloudpickle.dump(state, f)
+    with open(os.path.join(tmp_dir, "rllib_checkpoint.json"), "w") as f:
+        json.dump({
+            "type": "Algorithm",
+            "checkpoint_version": str(CHECKPOINT_VERSION),
+            "format": "cloudpickle",
+            "state_file": os.path.join(checkpoint_dir, "algorithm_state.pkl"),
+            "policy_ids": list(policy_states),
+            "ray_version": ray.__version__,
+            "ray_commit": ray.__commit__,
+        }, f)
+
+    for pid, policy_state in policy_states.items():
+        _write_policy_dir(os.path.join(tmp_dir, "policies", pid), policy_state)
+
+    if env_rng:
+        with open(os.path.join(tmp_dir, ENV_RNG_FILE), "wb") as f:
+            pickle.dump(env_rng, f)
+
+    shutil.rmtree(checkpoint_dir, ignore_errors=True)
+    os.replace(tmp_dir, checkpoint_dir)
+
+
+# Function: One policy's directory in the layout Policy.from_checkpoint loads
+def _write_policy_dir(policy_dir, policy_state):
+    import ray
+    import ray.cloudpickle as cloudpickle
+    from ray.rllib.utils.checkpoints import CHECKPOINT_VERSION
+
+    os.makedirs(policy_dir)
+    policy_state["checkpoint_version"] = CHECKPOINT_VERSION
+    with open(os.path.join(policy_dir, "policy_state.pkl"), "wb") as f:
+        cloudpickle.dump(policy_state, f)
+    with open(os.path.join(policy_dir, "rllib_checkpoint.json"), "w") as f:
+        json.dump({
+            "type": "Policy",
+            "checkpoint_version": str(CHECKPOINT_VERSION),
+            "format": "cloudpickle",
+            "state_file": "policy_state.pkl",
+            "ray_version": ray.__version__,
+            "ray_commit": ray.__commit__,
+        }, f)
+
+
+# Function: Write policy states as a weights-only checkpoint (the layout compact_checkpoint
+# leaves), which the RLlib eval scripts load without an algorithm. Written to a temporary
+# sibling directory and renamed into place, like write_checkpoint.
+def write_policy_checkpoint(checkpoint_dir, policy_states):
+    checkpoint_dir = os.path.abspath(checkpoint_dir)
+    tmp_dir = checkpoint_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    for pid, policy_state in policy_states.items():
+        policy_state.pop("_optimizer_variables", None)
+        _write_policy_dir(os.path.join(tmp_dir, "policies", pid), policy_state)
+    with open(os.path.join(tmp_dir, WEIGHTS_ONLY_FILE), "w") as f:
+        json.dump({"policy_ids": sorted(policy_states)}, f)
+
+    shutil.rmtree(checkpoint_dir, ignore_errors=True)
+    os.replace(tmp_dir, checkpoint_dir)
+
+
+# Function: Env RNG states saved with a checkpoint ({} for checkpoints without the sidecar)
+def load_env_rng(checkpoint_dir):
+    path = os.path.join(checkpoint_dir, ENV_RNG_FILE)
+    if not os.path.isfile(path):
+        return {}
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+# Class: Saves checkpoints on a background thread so sampling does not wait for pickling and disk.
+#   writer = AsyncCheckpointWriter(max_pending=2)
+#   writer.save(algo, "models/run/checkpoints/checkpoint_500000")   # returns after the in-memory snapshot
+#   writer.close()                                                   # waits for every pending write
+# At most `max_pending` snapshots wait in memory; save() blocks when the queue is full.
+# A failed write is raised from the next save(), flush() or close().
+# `after_write(checkpoint_dir)`, if given, runs on the writer thread after each write
+# (the training loop uses it to apply the retention policy).
+class AsyncCheckpointWriter:
+    def __init__(self, max_pending=2, write_fn=write_checkpoint, after_write=None):
+        self.write_fn = write_fn
+        self.after_write = after_write
+        self.queue = queue.Queue(maxsize=max(1, max_pending))
+        self.written = []
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name="checkpoint-writer", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            job = self.queue.get()
+            try:
+                if job is None:
+                    return
+                if self.error is None:
+                    checkpoint_dir, state, policy_states, env_rng = job
+                    self.write_fn(checkpoint_dir, state, policy_states, env_rng)
+                    self.written.append(checkpoint_dir)
+                    if self.after_write is not None:
+                        self.after_write(checkpoint_dir)
+            except BaseException as e:
+                self.error = e
+            finally:
+                self.queue.task_done()
+
+    def _raise_error(self):
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise RuntimeError("Writing a checkpoint failed") from error
+
+    # Function: Snapshot `algo` (and its envs' RNG states) now and write it to `checkpoint_dir` in the background
+    def save(self, algo, checkpoint_dir):
+        self._raise_error()
+        if not self.thread.is_alive():
+            raise RuntimeError("Checkpoint writer is closed")
+        state, policy_states = snapshot_algorithm(algo)
+        env_rng = collect_env_rng(algo) if hasattr(algo, "env_runner_group") else {}
+        self.queue.put((checkpoint_dir, state, policy_states, env_rng))
+        return checkpoint_dir
+
+    # Function: Wait until every queued checkpoint is on disk
+    def flush(self):
+        self.queue.join()
+        self._raise_error()
+
+    # Function: Flush, then stop the writer thread
+    def close(self):
+        if self.thread.is_alive():
+            self.queue.join()
+            self.queue.put(None)
+            self.thread.join()
+        self._raise_error()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
@@ -0,0 +1,137 @@
+import os
+import csv
+import time
+
+from agents.experiment import VARIANTS
+
+# Columns of logs/<name>/eval_progress.csv, one row per evaluated checkpoint
+EVAL_PROGRESS_FIELDS = [
+    "step", "iteration", "level", "n_episodes", "perfect_rate", "score_mean", "truncated_rate",
+    "failed_orders_mean", "steps_mean", "eval_s",
+]
+
+
+# Function: Evaluation controller around in-memory policy states
+def controller_from_policy_states(variant, policy_states):
+    from ray.rllib.policy.policy import Policy
+    from evaluation.controllers import RLlibCentralisedController, RLlibPerAgentController, RLlibPolicySet
+
+    policies = RLlibPolicySet({pid: Policy.from_state(state) for pid, state in policy_states.items()})
+    if VARIANTS[variant]["multi_agent"]:
+        return RLlibPerAgentController(policies, VARIANTS[variant]["wrapper"])
+    return RLlibCentralisedController(policies)
+
+
+# Function: Append evaluation rows to eval_progress.csv, writing the header on first use
+def append_eval_rows(progress_path, rows):
+    new_file = not os.path.exists(progress_path)
+    with open(progress_path, "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=EVAL_PROGRESS_FIELDS)
+        if new_file:
+            writer.writeheader()
+        writer.writerows(rows)
+
+
+# Class: Plays the held-out seeds on each checkpoint's policies. Runs as a Ray actor with a
+# CPU of its own, so evaluation overlaps with sampling instead of pausing it. Per-episode CSVs
+# and summaries go to <out_dir>/eval_checkpoint_<step>_<level>.*, the layout checkpoint sweeps write.
+class EvalWorker:
+    def __init__(self, variant, level, seeds, stack_n, deterministic, max_steps_cap, out_dir):
+        from evaluation.engine import init_headless_pygame
+        init_headless_pygame()
+
+        self.variant = variant
+        self.level = level
+        self.seeds = list(seeds)
+        self.stack_n = stack_n
+        self.deterministic = deterministic
+        self.max_steps_cap = max_steps_cap
+        self.out_dir = out_dir
+        os.makedirs(out_dir, exist_ok=True)
+
+    def evaluate(self, step, policy_states):
+        from evaluation.engine import evaluate_level
+        from evaluation.results_writer import StreamingResultWriter, EVENT_KEYS
+
+        start = time.perf_counter()
+        controller = controller_from_policy_states(self.variant, policy_states)
+        base = os.path.join(self.out_dir, f"eval_checkpoint_{step}_{self.level}")
+        with StreamingResultWriter(base + ".csv", base + ".summary.json", self.level, EVENT_KEYS) as writer:
+            evaluate_level(
+                writer, None, None, self.level, self.seeds,
+                deterministic=self.deterministic,
+                stack_n=self.stack_n,
+                max_steps_cap=self.max_steps_cap,
+                controller=controller,
+            )
+        summary = writer.summary()
+
+        return {
+            "step": step,
+            "level": self.level,
+            "n_episodes": summary["n_episodes"],
+            "perfect_rate": summary["perfect_rate"],
+            "score_mean": summary["score_mean"],
+            "truncated_rate": summary["truncated_rate"],
+            "failed_orders_mean": summary["failed_orders"]["mean"],
+            "steps_mean": summary["steps"]["mean"],
+            "eval_s": time.perf_counter() - start,
+        }
+
+
+# Class: Driver side of in-training evaluation. submit() copies the policies at a checkpoint
+# and hands them to the EvalWorker actor without waiting; poll() appends finished results to
+# logs/<name>/eval_progress.csv; close() waits for the evaluations still running.
+class InTrainingEvaluator:
+    def __init__(self, spec, progress_path):
+        import ray
+
+        cfg = spec["eval"]
+        self.progress_path = progress_path
+        self.pending = {}
+        self.submitted = set()
+
+        seeds = range(cfg["first_seed"], cfg["first_seed"] + cfg["episodes"])
+        out_dir = os.path.abspath(os.path.join(cfg["out_dir"], spec["name"]))
+        self.worker = ray.remote(num_cpus=1)(EvalWorker).remote(
+            spec["variant"], spec["level"], seeds, spec["env"]["stack_n"],
+            cfg["deterministic"], cfg["max_steps_cap"], out_dir,
+        )
+
+    # Function: Queue an evaluation of the algorithm's current policies, labelled `step`
+    def submit(self, step, algo):
+        if step in self.submitted:
+            return
+        self.submitted.add(step)
+
+        policy_states = {}
+        for pid in algo.config.policies:
+            state = algo.get_policy(pid).get_state()
+            state.pop("_optimizer_variables", None)
+            policy_states[pid] = state
+        # .remote() serialises the states now, so training can keep updating the weights
+        self.pending[self.worker.evaluate.remote(step, policy_states)] = algo.iteration
+
+    # Function: Record finished evaluations; with block=True wait for all of them
+    def poll(self, block=False):
+        import ray
+
+        if not self.pending:
+            return []
+        done, _ = ray.wait(list(self.pending), num_returns=len(self.pending), timeout=None if block else 0)
+        rows = []
+        for ref in done:
+            iteration = self.pending.pop(ref)
+            rows.append(dict(ray.get(ref), iteration=iteration))
+        rows.sort(key=lambda row: row["step"])
+
+        if rows:
+            append_eval_rows(self.progress_path, rows)
+        return rows
+
+    def close(self):
+        import ray
+
+        rows = self.poll(block=True)
+        ray.kill(self.worker)
+        return rows
@@ -0,0 +1,284 @@
+import os
+import copy
+import json
+import math
+import argparse
+from functools import partial
+
+from environment import profiling
+from environment.rollouts import record_from_config
+from environment.levels import LEVELS
+from environment.gym_wrapper_rllib_centralised import GymCoopEnvRLlibCentralised
+from environment.gym_wrapper_rllib_decentralised import GymCoopEnvRLlibDecentralised
+from environment.gym_wrapper_rllib_decentralised_comms import GymCoopEnvRLlibDecentralisedComms
+
+EXPERIMENTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "experiments")
+
+# Variant -> registered env name, wrapper class, one policy per agent or one joint policy
+VARIANTS = {
+    "centralised": {"env_name": "marl_coop_centralised", "wrapper": GymCoopEnvRLlibCentralised, "multi_agent": False},
+    "decentralised": {"env_name": "marl_coop_decentralised", "wrapper": GymCoopEnvRLlibDecentralised, "multi_agent": True},
+    "decentralised_comms": {"env_name": "marl_coop_decentralised_comms", "wrapper": GymCoopEnvRLlibDecentralisedComms, "multi_agent": True},
+}
+
+# Every key an experiment spec may set, with the values the official runs used.
+# "variant" and "level" have no default; "name" defaults to ppo_<variant>_<level>.
+DEFAULT_SPEC = {
+    "variant": None,
+    "level": None,
+    "name": None,
+    "seed": 12345,
+    "timesteps": 10_000_000,
+    "checkpoint_every": 500_000,
+    # None keeps every checkpoint in full, as the official runs did. A number N keeps the newest
+    # N in full (resumable) and compacts older ones to policy weights only.
+    "keep_full_checkpoints": None,
+    "models_dir": "models",
+    "log_dir": "logs",
+    "profile": False,
+    "profile_every": 1,
+    "env": {
+        "stack_n": 4,
+    },
+    # In-training evaluation at every checkpoint on a side worker (0 episodes: off).
+    # 250 episodes from seed 0 is the validation set the checkpoint sweeps use.
+    "eval": {
+        "episodes": 0,
+        "first_seed": 0,
+        "deterministic": True,
+        "max_steps_cap": None,
+        "out_dir": "eval_sweeps",
+    },
+    # Rollout export from the training envs (out_dir None: off). Every `every`-th episode of
+    # each env is written to <out_dir>/<name>/, see environment/rollouts.py.
+    "rollouts": {
+        "out_dir": None,
+        "every": 10,
+        "chunk_episodes": 16,
+    },
+    "resources": {
+        "num_env_runners": 0,
+        "num_envs_per_env_runner": 8,
+        # None: an even share of train_batch_size per env (4096 with 0 runners and 8 envs)
+        "rollout_fragment_length": None,
+        "num_gpus": 0,
+    },
+    "ppo": {
+        "lr": 2e-4,
+        "gamma": 0.995,
+        "lambda_": 0.97,
+        "entropy_coeff": 0.005,
+        "train_batch_size": 4096 * 8,
+        "minibatch_size": 512,
+        "num_epochs": 12,
+        "clip_param": 0.2,
+        "vf_loss_coeff": 0.5,
+        "grad_clip": 0.5,
+        "use_kl_loss": False,
+        "kl_coeff": 0.0,
+        "vf_clip_param": 1_000_000.0,
+        "model": {
+            "fcnet_hiddens": [512, 512, 256],
+            "fcnet_activation": "tanh",
+            "vf_share_layers": False,
+        },
+    },
+}
+
+# Sections whose contents are passed through (e.g. RLlib model options), not checked key by key
+FREE_FORM = {("ppo", "model")}
+
+
+# Function: Read a spec file, JSON or YAML by extension
+def load_spec(path):
+    with open(path) as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError as e:
+                raise ImportError("YAML experiment specs need PyYAML (pip install pyyaml), or use JSON") from e
+            spec = yaml.safe_load(f)
+        else:
+            spec = json.load(f)
+    if not isinstance(spec, dict):
+        raise ValueError(f"{path}: experiment spec must be a mapping, got {type(spec).__name__}")
+    return spec
+
+
+# Function: Overlay `override` on `base`, refusing keys the defaults do not know about
+def _merge(base, override, path=()):
+    merged = copy.deepcopy(base)
+    for key, value in override.items():
+        if key not in base:
+            where = ".".join(path + (key,))
+            raise ValueError(f"Unknown experiment setting '{where}'")
+        if isinstance(base[key], dict) and path + (key,) not in FREE_FORM:
+            if not isinstance(value, dict):
+                raise ValueError(f"Experiment setting '{'.'.join(path + (key,))}' must be a mapping")
+            merged[key] = _merge(base[key], value, path + (key,))
+        elif isinstance(base[key], dict):
+            merged[key] = {**base[key], **value}
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+# Function: Set "a.b.c" in a nested dict (command line --set overrides)
+def set_path(spec, dotted, value):
+    keys = dotted.split(".")
+    cur = spec
+    for key in keys[:-1]:
+        cur = cur.setdefault(key, {})
+    cur[keys[-1]] = value
+    return spec
+
+
+# Function: Parse a KEY=VALUE override, VALUE as JSON when it parses (numbers, true, null, lists)
+def parse_override(item):
+    key, sep, raw = item.partition("=")
+    if not sep or not key:
+        raise argparse.ArgumentTypeError(f"Expected KEY=VALUE, got {item}")
+    try:
+        value = json.loads(raw)
+    except json.JSONDecodeError:
+        value = raw
+    return key, value
+
+
+# Function: Complete spec from defaults plus a (partial) spec, with derived values filled in
+def resolve_spec(spec):
+    resolved = _merge(DEFAULT_SPEC, spec)
+
+    if resolved["variant"] not in VARIANTS:
+        raise ValueError(f"Unknown variant {resolved['variant']!r}, expected one of {sorted(VARIANTS)}")
+    if resolved["level"] not in LEVELS:
+        raise ValueError(f"Unknown level {resolved['level']!r}, expected one of {sorted(LEVELS)}")
+
+    if not resolved["name"]:
+        resolved["name"] = f"ppo_{resolved['variant']}_{resolved['level']}"
+
+    res = resolved["resources"]
+    if res["rollout_fragment_length"] is None:
+        envs = max(1, res["num_env_runners"]) * res["num_envs_per_env_runner"]
+        res["rollout_fragment_length"] = math.ceil(resolved["ppo"]["train_batch_size"] / envs)
+
+    return resolved
+
+
+# Function: Ray runtime env that lets worker processes import agents/ and environment/
+# from the repo root, whatever directory training was started from
+def ray_runtime_env():
+    repo_root = os.path.dirname(EXPERIMENTS_DIR)
+    pythonpath = os.pathsep.join(p for p in (repo_root, os.environ.get("PYTHONPATH")) if p)
+    return {"env_vars": {"PYTHONPATH": pythonpath}}
+
+
+# Function: CPUs one run holds while it trains: its driver, one per remote env runner,
+# and one for the evaluation worker when in-training evaluation is on
+def run_cpus(spec):
+    return 1 + spec["resources"]["num_env_runners"] + (1 if spec["eval"]["episodes"] > 0 else 0)
+
+
+# Function: Rollout export settings for the training env config, None when export is off
+def rollout_config(spec):
+    rollouts = spec["rollouts"]
+    if not rollouts["out_dir"]:
+        return None
+    return dict(rollouts, out_dir=os.path.abspath(os.path.join(rollouts["out_dir"], spec["name"])))
+
+
+# Function: Create the RLlib environment, turning on step profiling in this process
+# and rollout export for this env if asked
+def _create_env(wrapper_cls, env_config):
+    if env_config.get("profile"):
+        profiling.enable()
+    env = wrapper_cls(env_config)
+    record_from_config(env, env_config)
+    return env
+
+
+# Function: Map each environment agent to its own policy
+def policy_mapping_fn(agent_id, *args, **kwargs):
+    return "agent_1_policy" if agent_id == "agent_1" else "agent_2_policy"
+
+
+# Function: Build the PPO config for a resolved spec.
+# Sampling moves to `num_env_runners` remote runners when it is above 0, and every env
+# gets its own seed base_seed + (worker_index - 1) * num_envs_per_env_runner + vector_index.
+def build_config(spec):
+    from ray.tune.registry import register_env
+    from ray.rllib.algorithms.ppo import PPOConfig
+    from ray.rllib.policy.policy import PolicySpec
+    from ray.rllib.algorithms.callbacks import make_multi_callbacks
+    from agents.callbacks import ProfilingCallbacks, ThroughputCallbacks
+
+    variant = VARIANTS[spec["variant"]]
+    res = spec["resources"]
+    ppo = copy.deepcopy(spec["ppo"])
+
+    register_env(variant["env_name"], partial(_create_env, variant["wrapper"]))
+
+    env_config = {
+        "level_name": spec["level"],
+        "stack_n": spec["env"]["stack_n"],
+        "render": False,
+        "base_seed": spec["seed"],
+        "seed_envs_per_runner": res["num_envs_per_env_runner"],
+    }
+    if spec["profile"]:
+        env_config.update(profile=True, profile_every=spec["profile_every"])
+    if rollout_config(spec):
+        env_config["rollouts"] = rollout_config(spec)
+
+    cfg = (
+        PPOConfig()
+        .api_stack(
+            enable_rl_module_and_learner=False,
+            enable_env_runner_and_connector_v2=False,
+        )
+        .environment(env=variant["env_name"], env_config=env_config, disable_env_checking=True)
+        .env_runners(
+            num_env_runners=res["num_env_runners"],
+            num_envs_per_env_runner=res["num_envs_per_env_runner"],
+            rollout_fragment_length=res["rollout_fragment_length"],
+            batch_mode="truncate_episodes",
+        )
+        .framework("torch")
+        .resources(num_gpus=res["num_gpus"])
+        .debugging(seed=spec["seed"])
+    )
+
+    if variant["multi_agent"]:
+        # Single-agent spaces for the two policies
+        dummy_env = variant["wrapper"](dict(env_config, profile=False))
+        policy = PolicySpec(
+            observation_space=dummy_env.single_observation_space,
+            action_space=dummy_env.single_action_space,
+            config={},
+        )
+        cfg = cfg.multi_agent(
+            policies={"agent_1_policy": policy, "agent_2_policy": policy},
+            policy_mapping_fn=policy_mapping_fn,
+            policies_to_train=["agent_1_policy", "agent_2_policy"],
+            count_steps_by="env_steps",
+        )
+
+    # Older RLlib releases call the epoch and minibatch settings num_sgd_iter / sgd_minibatch_size
+    num_epochs = ppo.pop("num_epochs")
+    try:
+        cfg = cfg.training(num_epochs=num_epochs, shuffle_batch_per_epoch=True, **ppo)
+    except TypeError:
+        ppo["sgd_minibatch_size"] = ppo.pop("minibatch_size")
+        cfg = cfg.training(num_sgd_iter=num_epochs, **ppo)
+
+    # Keep PPO updates simple and stable on CPU, and keep raw observations
+    cfg.simple_optimizer = True
+    cfg._disable_preprocessor_api = True
+
+    # The old API stack takes a single callbacks class
+    if spec["profile"]:
+        cfg.callbacks(make_multi_callbacks([ThroughputCallbacks, ProfilingCallbacks]))
+    else:
+        cfg.callbacks(ThroughputCallbacks)
+
+    return cfg
@@ -0,0 +1,111 @@
+import os
+import time
+import contextlib
+
+from agents.experiment import ray_runtime_env, run_cpus
+
+
+# Function: Remote env runners per run when `num_runs` runs share `num_cpus` evenly,
+# each also holding `fixed_cpus` for its driver (and evaluation worker)
+def share_env_runners(num_cpus, num_runs, fixed_cpus=1):
+    return max(0, num_cpus // max(1, num_runs) - fixed_cpus)
+
+
+# Function: Copy of a spec with every output directory made absolute (models, logs, eval
+# results and rollouts), since Ray workers do not start in the launch directory
+def absolute_dirs(spec):
+    spec = dict(spec, models_dir=os.path.abspath(spec["models_dir"]), log_dir=os.path.abspath(spec["log_dir"]))
+    spec["eval"] = dict(spec["eval"], out_dir=os.path.abspath(spec["eval"]["out_dir"]))
+    if spec["rollouts"]["out_dir"]:
+        spec["rollouts"] = dict(spec["rollouts"], out_dir=os.path.abspath(spec["rollouts"]["out_dir"]))
+    return spec
+
+
+# Function: Index of the first pending run that fits in `free_cpus`, None when none does.
+# First fit rather than strict order, so small runs fill the gaps around a large one.
+def next_fit(pending, free_cpus):
+    for i, spec in enumerate(pending):
+        if run_cpus(spec) <= free_cpus:
+            return i
+    return None
+
+
+# Function: Train one spec inside a Ray task, sending its console output to logs/<name>/train.log
+def _train_run(spec, resume=False):
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    from agents.train_rllib import train
+
+    log_dir = os.path.join(spec["log_dir"], spec["name"])
+    os.makedirs(log_dir, exist_ok=True)
+    start = time.perf_counter()
+    with open(os.path.join(log_dir, "train.log"), "a") as f, \
+            contextlib.redirect_stdout(f), contextlib.redirect_stderr(f):
+        train(spec, resume=resume)
+    return time.perf_counter() - start
+
+
+# Function: Train resolved specs concurrently in one Ray instance.
+# Each run reserves its driver CPU as a Ray task and its env runners (and evaluation worker)
+# take one CPU each, so a run only starts once run_cpus(spec) CPUs are free; the rest wait in the queue.
+# With resume=True each run continues from its newest checkpoint.
+# Returns one {name, status, cpus, wall_s, error} entry per spec, in the order they finished.
+def run_all(specs, num_cpus=None, max_concurrent=None, resume=False, progress=print):
+    import ray
+
+    num_cpus = num_cpus or os.cpu_count() or 1
+    max_concurrent = max_concurrent or len(specs)
+
+    # Ray workers do not start in this directory
+    specs = [absolute_dirs(spec) for spec in specs]
+
+    names = [spec["name"] for spec in specs]
+    duplicates = sorted({n for n in names if names.count(n) > 1})
+    if duplicates:
+        raise ValueError(f"Runs would share models/ and logs/ directories: {', '.join(duplicates)}")
+    for spec in specs:
+        if run_cpus(spec) > num_cpus:
+            raise ValueError(f"{spec['name']} needs {run_cpus(spec)} CPUs, only {num_cpus} available")
+
+    ray.init(num_cpus=num_cpus, include_dashboard=False, log_to_driver=False, runtime_env=ray_runtime_env())
+    train_task = ray.remote(_train_run)
+
+    pending = list(specs)
+    running = {}
+    free_cpus = num_cpus
+    results = []
+    start = time.perf_counter()
+
+    try:
+        while pending or running:
+            while pending and len(running) < max_concurrent:
+                i = next_fit(pending, free_cpus)
+                if i is None:
+                    break
+                spec = pending.pop(i)
+                ref = train_task.options(
+                    num_cpus=1,
+                    num_gpus=spec["resources"]["num_gpus"],
+                    max_retries=0,
+                    name=f"train:{spec['name']}",
+                ).remote(spec, resume)
+                running[ref] = spec
+                free_cpus -= run_cpus(spec)
+                progress(f"[{time.perf_counter() - start:7.0f}s] started  {spec['name']} "
+                         f"({run_cpus(spec)} CPUs, {len(pending)} queued)")
+
+            done, _ = ray.wait(list(running), num_returns=1)
+            for ref in done:
+                spec = running.pop(ref)
+                free_cpus += run_cpus(spec)
+                entry = {"name": spec["name"], "status": "ok", "cpus": run_cpus(spec), "wall_s": None, "error": None}
+                try:
+                    entry["wall_s"] = ray.get(ref)
+                except Exception as e:
+                    entry.update(status="failed", error=str(e).strip().splitlines()[-1])
+                results.append(entry)
+                progress(f"[{time.perf_counter() - start:7.0f}s] {entry['status']:<7}  {spec['name']}"
+                         + (f": {entry['error']}" if entry["error"] else ""))
+    finally:
+        ray.shutdown()
+
+    return results
@@ -0,0 +1,384 @@
+import re
+import time
+from collections import deque
+
+import numpy as np
+import torch
+from torch import nn
+from torch.distributions import Categorical
+
+from agents.experiment import VARIANTS, rollout_config
+from agents.checkpointing import write_policy_checkpoint
+from environment.vector_env import CoopVectorEnv
+
+ACTIVATIONS = {"tanh": nn.Tanh, "relu": nn.ReLU}
+
+# Episodes averaged into the reported return and length, as RLlib's metrics smoothing window
+EPISODE_WINDOW = 100
+
+
+# Function: RLlib's normc initializer: unit-normal rows scaled to norm `std`
+def _normc_(weight, std):
+    with torch.no_grad():
+        weight.normal_(0.0, 1.0)
+        weight.mul_(std / weight.pow(2).sum(1, keepdim=True).sqrt())
+
+
+# Class: Linear layer with an optional activation, named like RLlib's SlimFC
+class _SlimFC(nn.Module):
+    def __init__(self, in_size, out_size, std, activation=None):
+        super().__init__()
+        linear = nn.Linear(in_size, out_size)
+        _normc_(linear.weight, std)
+        nn.init.zeros_(linear.bias)
+        layers = [linear] + ([activation()] if activation is not None else [])
+        self._model = nn.Sequential(*layers)
+
+    def forward(self, x):
+        return self._model(x)
+
+
+# Class: Policy and value MLPs with the parameter names and initialisation of RLlib's
+# FullyConnectedNetwork, so state_dict() loads straight into an RLlib torch policy.
+# The logits are one block per sub-action: [6, 6] for the joint action, [6] per agent.
+class PolicyNet(nn.Module):
+    def __init__(self, obs_dim, action_sizes, hiddens=(512, 512, 256), activation="tanh", vf_share_layers=False):
+        super().__init__()
+        if activation not in ACTIVATIONS:
+            raise ValueError(f"Unsupported fcnet_activation {activation!r}, expected one of {sorted(ACTIVATIONS)}")
+        act = ACTIVATIONS[activation]
+        self.action_sizes = list(action_sizes)
+        self.vf_share_layers = vf_share_layers
+
+        sizes = [obs_dim] + list(hiddens)
+        self._hidden_layers = nn.Sequential(*[_SlimFC(i, o, 1.0, act) for i, o in zip(sizes, sizes[1:])])
+        self._logits = _SlimFC(sizes[-1], sum(self.action_sizes), 0.01)
+        if not vf_share_layers:
+            self._value_branch_separate = nn.Sequential(*[_SlimFC(i, o, 1.0, act) for i, o in zip(sizes, sizes[1:])])
+        self._value_branch = _SlimFC(sizes[-1], 1, 0.01)
+
+    def forward(self, obs):
+        features = self._hidden_layers(obs)
+        value_features = features if self.vf_share_layers else self._value_branch_separate(obs)
+        return self._logits(features), self._value_branch(value_features).squeeze(-1)
+
+    def distributions(self, logits):
+        return [Categorical(logits=part) for part in torch.split(logits, self.action_sizes, dim=-1)]
+
+    # Function: Actions (B, n_sub_actions), their log-probabilities and the values for a batch
+    @torch.no_grad()
+    def act(self, obs, deterministic=False):
+        logits, value = self(obs)
+        dists = self.distributions(logits)
+        if deterministic:
+            actions = [d.probs.argmax(-1) for d in dists]
+        else:
+            actions = [d.sample() for d in dists]
+        logp = sum(d.log_prob(a) for d, a in zip(dists, actions))
+        return torch.stack(actions, dim=-1), logp, value
+
+    # Function: Log-probabilities, entropies and values of given actions (for the PPO loss)
+    def evaluate(self, obs, actions):
+        logits, value = self(obs)
+        dists = self.distributions(logits)
+        logp = sum(d.log_prob(actions[:, i]) for i, d in enumerate(dists))
+        entropy = sum(d.entropy() for d in dists)
+        return logp, entropy, value
+
+
+# Function: Names of the numbered SlimFC layers in an RLlib FullyConnectedNetwork branch, in order
+def _layer_names(keys, branch):
+    found = (re.fullmatch(rf"{branch}\.(\d+)\._model\.0\.weight", key) for key in keys)
+    return [f"{branch}.{i}" for i in sorted(int(m.group(1)) for m in found if m)]
+
+
+# Class: Same-shaped policies (RLlib FullyConnectedNetwork weights) evaluated together:
+# each layer's weights are stacked to (num_policies, in, out) and applied with one batched
+# matmul, so two agents' policies cost one forward per layer instead of two.
+# Inference only; training keeps the policies separate and load() copies in new weights.
+# Used by the torch trainer's sampling and by deterministic eval (RLlibPerAgentController).
+# RLlib's own env runners (agents/train_rllib.py) still run one forward per policy.
+#
+#   fused = FusedPolicies([net_1.state_dict(), net_2.state_dict()], [6])
+#   actions, logp, values = fused.act(obs)   # obs (2, batch, obs_dim) -> actions (2, batch, 1)
+class FusedPolicies:
+    def __init__(self, state_dicts, action_sizes, activation="tanh", vf_share_layers=False):
+        if activation not in ACTIVATIONS:
+            raise ValueError(f"Unsupported fcnet_activation {activation!r}, expected one of {sorted(ACTIVATIONS)}")
+        self.activation = ACTIVATIONS[activation]()
+        self.action_sizes = list(action_sizes)
+        self.vf_share_layers = vf_share_layers
+
+        keys = state_dicts[0].keys()
+        self.hidden = _layer_names(keys, "_hidden_layers")
+        self.value_hidden = [] if vf_share_layers else _layer_names(keys, "_value_branch_separate")
+        self.layers = {}
+        self.load(state_dicts)
+
+    # Function: Copy in the policies' current weights
+    def load(self, state_dicts):
+        for name in self.hidden + self.value_hidden + ["_logits", "_value_branch"]:
+            weight = torch.stack([torch.as_tensor(sd[f"{name}._model.0.weight"]) for sd in state_dicts]).transpose(1, 2)
+            bias = torch.stack([torch.as_tensor(sd[f"{name}._model.0.bias"]) for sd in state_dicts]).unsqueeze(1)
+            if name in self.layers:
+                self.layers[name][0].copy_(weight)
+                self.layers[name][1].copy_(bias)
+            else:
+                self.layers[name] = (weight.float().contiguous(), bias.float().contiguous())
+
+    def _mlp(self, x, names):
+        for name in names:
+            weight, bias = self.layers[name]
+            x = self.activation(torch.baddbmm(bias, x, weight))
+        return x
+
+    def _linear(self, x, name):
+        weight, bias = self.layers[name]
+        return torch.baddbmm(bias, x, weight)
+
+    # Function: Logits (P, B, sum(action_sizes)) and, if asked, values (P, B) for obs (P, B, obs_dim)
+    @torch.no_grad()
+    def forward(self, obs, values=True):
+        features = self._mlp(obs, self.hidden)
+        logits = self._linear(features, "_logits")
+        if not values:
+            return logits, None
+        value_features = features if self.vf_share_layers else self._mlp(obs, self.value_hidden)
+        return logits, self._linear(value_features, "_value_branch").squeeze(-1)
+
+    # Function: Actions (P, B, n_sub_actions), log-probabilities and values, as PolicyNet.act per policy
+    @torch.no_grad()
+    def act(self, obs, deterministic=False, values=True):
+        logits, value = self.forward(obs, values)
+        dists = [Categorical(logits=part) for part in torch.split(logits, self.action_sizes, dim=-1)]
+        if deterministic:
+            actions = [d.probs.argmax(-1) for d in dists]
+        else:
+            actions = [d.sample() for d in dists]
+        logp = sum(d.log_prob(a) for d, a in zip(dists, actions))
+        return torch.stack(actions, dim=-1), logp, value
+
+
+# Function: Generalised advantage estimates over a (T, N) rollout. `next_values[t]` is the
+# value after step t: the next step's value, the bootstrap value where an episode hit the
+# time limit, 0 where it terminated.
+def compute_gae(rewards, values, next_values, dones, gamma, lambda_):
+    advantages = np.zeros_like(values)
+    gae = np.zeros(values.shape[1], dtype=values.dtype)
+    for t in reversed(range(len(rewards))):
+        delta = rewards[t] + gamma * next_values[t] - values[t]
+        gae = delta + gamma * lambda_ * (1.0 - dones[t]) * gae
+        advantages[t] = gae
+    return advantages
+
+
+# Class: PPO on a CoopVectorEnv in a single process, with the spec's hyperparameters and the
+# loss of RLlib's (old API stack) torch PPO: clipped surrogate, clipped squared value error,
+# entropy bonus, advantages standardised over the train batch, global-norm gradient clipping.
+# Centralised specs train one joint-action policy ("default_policy"); multi-agent specs train
+# "agent_1_policy" and "agent_2_policy" independently on their own agent's steps.
+#
+#   ppo = TorchPPO(spec)
+#   result = ppo.train()                  # one rollout of ~train_batch_size env steps + update
+#   ppo.save("models/run/checkpoints/checkpoint_500000")
+class TorchPPO:
+    def __init__(self, spec):
+        ppo = spec["ppo"]
+        if ppo["use_kl_loss"]:
+            raise ValueError("The torch PPO trainer does not implement the KL penalty (ppo.use_kl_loss)")
+
+        self.spec = spec
+        self.ppo = ppo
+        res = spec["resources"]
+        # The envs RLlib's runners would step together, and the same fragment per env
+        self.num_envs = max(1, res["num_env_runners"]) * res["num_envs_per_env_runner"]
+        self.fragment = res["rollout_fragment_length"]
+
+        torch.manual_seed(spec["seed"])
+        self.rng = np.random.default_rng(spec["seed"])
+
+        variant = VARIANTS[spec["variant"]]
+        self.venv = CoopVectorEnv(variant["wrapper"], spec["level"], self.num_envs,
+                                  base_seed=spec["seed"], stack_n=spec["env"]["stack_n"],
+                                  rollouts=rollout_config(spec))
+        if variant["multi_agent"]:
+            self.policy_ids = ("agent_1_policy", "agent_2_policy")
+            action_sizes = [int(self.venv.action_space.n)]
+        else:
+            self.policy_ids = ("default_policy",)
+            action_sizes = [int(n) for n in self.venv.action_space.nvec]
+
+        model = ppo["model"]
+        self.nets = {
+            pid: PolicyNet(self.venv.obs_dim, action_sizes, model.get("fcnet_hiddens", [256, 256]),
+                           model.get("fcnet_activation", "tanh"), model.get("vf_share_layers", False))
+            for pid in self.policy_ids
+        }
+        self.optimizers = {pid: torch.optim.Adam(net.parameters(), lr=ppo["lr"]) for pid, net in self.nets.items()}
+        # Both agents' policies sample through one batched forward
+        self.fused = None
+        if len(self.policy_ids) > 1:
+            self.fused = FusedPolicies([self.nets[pid].state_dict() for pid in self.policy_ids], action_sizes,
+                                       model.get("fcnet_activation", "tanh"), model.get("vf_share_layers", False))
+
+        self.iteration = 0
+        self.env_steps = 0
+        self.episodes = deque(maxlen=EPISODE_WINDOW)
+        self._obs = self.venv.reset()
+        self._export_policies = None
+
+    # Function: Step every env `fragment` times with the current policies.
+    # Returns one batch per policy with flattened obs, actions, log-probs, advantages and value targets.
+    def sample(self):
+        T, N, P = self.fragment, self.num_envs, len(self.policy_ids)
+        obs_buf = np.zeros((T, N, P, self.venv.obs_dim), dtype=np.float32)
+        act_buf = np.zeros((T, N, 2), dtype=np.int64)
+        logp_buf = np.zeros((T, N, P), dtype=np.float32)
+        value_buf = np.zeros((T, N, P), dtype=np.float32)
+        reward_buf = np.zeros((T, N), dtype=np.float32)
+        done_buf = np.zeros((T, N), dtype=np.float32)
+        next_value_buf = np.zeros((T, N, P), dtype=np.float32)
+        truncated_obs = []
+
+        for t in range(T):
+            obs_buf[t] = self._obs
+            obs = torch.from_numpy(self._obs)
+            if self.fused is not None:
+                action, logp, value = self.fused.act(obs.transpose(0, 1))
+                act_buf[t] = action[:, :, 0].T.numpy()
+                logp_buf[t] = logp.T.numpy()
+                value_buf[t] = value.T.numpy()
+            else:
+                action, logp, value = self.nets[self.policy_ids[0]].act(obs[:, 0])
+                act_buf[t] = action.numpy()
+                logp_buf[t, :, 0] = logp.numpy()
+                value_buf[t, :, 0] = value.numpy()
+
+            self._obs, reward_buf[t], terminated, truncated, final_obs = self.venv.step(act_buf[t])
+            done_buf[t] = terminated | truncated
+            truncated_obs += [(t, i, final_obs[i]) for i in np.flatnonzero(truncated)]
+
+        with torch.no_grad():
+            obs = torch.from_numpy(self._obs)
+            boot = torch.from_numpy(np.stack([o for _, _, o in truncated_obs])) if truncated_obs else None
+            for p, pid in enumerate(self.policy_ids):
+                # Following values: the next step's, 0 after termination, V(last obs) at the time limit
+                next_value_buf[:-1, :, p] = value_buf[1:, :, p] * (1.0 - done_buf[:-1])
+                next_value_buf[-1, :, p] = self.nets[pid](obs[:, p])[1].numpy() * (1.0 - done_buf[-1])
+                if boot is not None:
+                    values = self.nets[pid](boot[:, p])[1].numpy()
+                    for (t, i, _), value in zip(truncated_obs, values):
+                        next_value_buf[t, i, p] = value
+
+        self.env_steps += T * N
+        self.episodes.extend(self.venv.pop_episodes())
+
+        k = 2 // P
+        batches = {}
+        for p, pid in enumerate(self.policy_ids):
+            advantages = compute_gae(reward_buf, value_buf[:, :, p], next_value_buf[:, :, p], done_buf,
+                                     self.ppo["gamma"], self.ppo["lambda_"])
+            batches[pid] = {
+                "obs": obs_buf[:, :, p].reshape(T * N, -1),
+                "actions": act_buf[:, :, p * k:(p + 1) * k].reshape(T * N, k),
+                "logp": logp_buf[:, :, p].reshape(-1),
+                "advantages": advantages.reshape(-1),
+                "value_targets": (advantages + value_buf[:, :, p]).reshape(-1),
+            }
+        return batches
+
+    # Function: num_epochs passes of shuffled minibatch updates on one policy's batch
+    def learn(self, pid, batch):
+        net, optimizer, ppo = self.nets[pid], self.optimizers[pid], self.ppo
+        data = {key: torch.from_numpy(value) for key, value in batch.items()}
+        adv = data["advantages"]
+        data["advantages"] = (adv - adv.mean()) / max(1e-4, float(adv.std()))
+
+        size = len(adv)
+        stats = {"policy_loss": 0.0, "vf_loss": 0.0, "entropy": 0.0, "approx_kl": 0.0}
+        updates = 0
+        for _ in range(ppo["num_epochs"]):
+            order = torch.from_numpy(self.rng.permutation(size))
+            for start in range(0, size, ppo["minibatch_size"]):
+                idx = order[start:start + ppo["minibatch_size"]]
+                logp, entropy, value = net.evaluate(data["obs"][idx], data["actions"][idx])
+                adv_mb = data["advantages"][idx]
+
+                ratio = torch.exp(logp - data["logp"][idx])
+                surrogate = torch.min(adv_mb * ratio,
+                                      adv_mb * torch.clamp(ratio, 1 - ppo["clip_param"], 1 + ppo["clip_param"]))
+                vf_loss = torch.clamp((value - data["value_targets"][idx]) ** 2, 0, ppo["vf_clip_param"])
+                loss = (-surrogate + ppo["vf_loss_coeff"] * vf_loss - ppo["entropy_coeff"] * entropy).mean()
+
+                optimizer.zero_grad()
+                loss.backward()
+                if ppo["grad_clip"] is not None:
+                    nn.utils.clip_grad_norm_(net.parameters(), ppo["grad_clip"])
+                optimizer.step()
+
+                with torch.no_grad():
+                    stats["policy_loss"] += float(-surrogate.mean())
+                    stats["vf_loss"] += float(vf_loss.mean())
+                    stats["entropy"] += float(entropy.mean())
+                    stats["approx_kl"] += float((data["logp"][idx] - logp).mean())
+                updates += 1
+        return {key: value / max(1, updates) for key, value in stats.items()}
+
+    # Function: One training iteration: sample, then update every policy. Returns a result dict
+    # using RLlib's key names where there is one.
+    def train(self):
+        start = time.perf_counter()
+        batches = self.sample()
+        sampled = time.perf_counter()
+        learner = {pid: self.learn(pid, batch) for pid, batch in batches.items()}
+        if self.fused is not None:
+            self.fused.load([self.nets[pid].state_dict() for pid in self.policy_ids])
+        end = time.perf_counter()
+        self.iteration += 1
+
+        steps = self.fragment * self.num_envs
+        episodes = list(self.episodes)
+        return {
+            "training_iteration": self.iteration,
+            "num_env_steps_sampled_lifetime": self.env_steps,
+            "num_env_steps_sampled_this_iter": steps,
+            "episode_return_mean": float(np.mean([e["return"] for e in episodes])) if episodes else float("nan"),
+            "episode_len_mean": float(np.mean([e["length"] for e in episodes])) if episodes else float("nan"),
+            "score_mean": float(np.mean([e["score"] for e in episodes])) if episodes else float("nan"),
+            "time_this_iter_s": end - start,
+            "sample_s": sampled - start,
+            "learn_s": end - sampled,
+            "env_steps_per_sec": steps / (end - start),
+            "learner": learner,
+        }
+
+    # Function: Write the policies as an RLlib weights-only checkpoint, which the
+    # eval_*_rllib.py scripts, checkpoint sweeps and Policy.from_checkpoint load as is
+    def save(self, checkpoint_dir):
+        write_policy_checkpoint(checkpoint_dir, self.policy_states())
+        return checkpoint_dir
+
+    # Function: RLlib policy states ({policy_id: state}) holding the current weights
+    def policy_states(self):
+        policies = self._rllib_policies()
+        states = {}
+        for pid, net in self.nets.items():
+            policies[pid].set_weights({key: value.detach().cpu().numpy() for key, value in net.state_dict().items()})
+            state = policies[pid].get_state()
+            state["global_timestep"] = self.env_steps
+            states[pid] = state
+        return states
+
+    # Function: RLlib policy objects (built once, on the first save) that give the checkpoint
+    # its policy spec and config; only their weights are ever set
+    def _rllib_policies(self):
+        if self._export_policies is None:
+            from ray.rllib.algorithms.ppo.ppo_torch_policy import PPOTorchPolicy
+            from agents.experiment import build_config
+
+            config = build_config(self.spec).to_dict()
+            self._export_policies = {
+                pid: PPOTorchPolicy(self.venv.observation_space, self.venv.action_space, config)
+                for pid in self.policy_ids
+            }
+        return self._export_policies
@@ -0,0 +1,93 @@
+import sys
+import os
+import copy
+import glob
+import time
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.experiment import EXPERIMENTS_DIR, load_spec, resolve_spec, set_path, parse_override
+from agents.scheduler import run_all, run_cpus, share_env_runners
+
+
+# Function: Resolved specs for the given files, with the same --set overrides applied to each.
+# num_env_runners="auto" gives each run an even share of `num_cpus` across `num_runs` concurrent runs.
+def load_specs(paths, overrides, num_env_runners=None, num_cpus=None, num_runs=None):
+    specs = []
+    for path in paths:
+        spec = load_spec(path)
+        for key, value in overrides:
+            set_path(spec, key, value)
+
+        runners = num_env_runners
+        if runners == "auto":
+            # CPUs the run holds besides its env runners (driver, evaluation worker)
+            fixed = run_cpus(resolve_spec(set_path(copy.deepcopy(spec), "resources.num_env_runners", 0)))
+            runners = share_env_runners(num_cpus, num_runs, fixed)
+        if runners is not None:
+            set_path(spec, "resources.num_env_runners", runners)
+        specs.append(resolve_spec(spec))
+    return specs
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Train several RLlib experiment specs concurrently in one Ray instance")
+    parser.add_argument("specs", nargs="*", default=None,
+                        help=f"Experiment spec files (default: every spec in {os.path.relpath(EXPERIMENTS_DIR)}/)")
+    parser.add_argument("--num-cpus", type=int, default=None, help="CPUs to pack runs into (default: all cores)")
+    parser.add_argument("--max-concurrent", type=int, default=None, help="Most runs training at once (default: no cap)")
+    parser.add_argument("--num-env-runners", type=str, default=None,
+                        help="Env runners for every run; 'auto' splits the CPUs evenly between the concurrent runs "
+                             "(default: each spec's own setting)")
+    parser.add_argument("--set", nargs="+", type=parse_override, default=None, metavar="KEY=VALUE",
+                        help="Override a setting in every spec, e.g. timesteps=2000000")
+    parser.add_argument("--resume", action="store_true", default=False,
+                        help="Continue each run from its newest checkpoint (re-run after an interruption)")
+    parser.add_argument("--dry-run", action="store_true", default=False, help="Print the runs and their CPUs, then exit")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    paths = args.specs or sorted(glob.glob(os.path.join(EXPERIMENTS_DIR, "*.json")))
+    num_cpus = args.num_cpus or os.cpu_count() or 1
+
+    num_env_runners = args.num_env_runners
+    if num_env_runners not in (None, "auto"):
+        num_env_runners = int(num_env_runners)
+    num_runs = min(len(paths), args.max_concurrent or len(paths))
+
+    try:
+        specs = load_specs(paths, args.set or [], num_env_runners, num_cpus, num_runs)
+    except (ValueError, OSError) as e:
+        parser.error(str(e))
+
+    print(f"{len(specs)} run(s) on {num_cpus} CPUs, at most {args.max_concurrent or len(specs)} at once")
+    for spec in specs:
+        print(f"  {spec['name']:<36} {run_cpus(spec)} CPUs ({spec['resources']['num_env_runners']} env runners)")
+    if args.dry_run:
+        return
+
+    start = time.perf_counter()
+    try:
+        results = run_all(specs, num_cpus=num_cpus, max_concurrent=args.max_concurrent, resume=args.resume)
+    except ValueError as e:
+        parser.error(str(e))
+    total_s = time.perf_counter() - start
+
+    ok = [r for r in results if r["status"] == "ok"]
+    print(f"\n{len(ok)}/{len(results)} run(s) finished in {total_s:.0f}s")
+    if ok:
+        slowest = max(ok, key=lambda r: r["wall_s"])
+        print(f"Slowest run: {slowest['name']} ({slowest['wall_s']:.0f}s)")
+    failed = [r for r in results if r["status"] != "ok"]
+    for r in failed:
+        print(f"FAILED {r['name']}: {r['error']} (see logs/{r['name']}/train.log)")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
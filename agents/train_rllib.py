@@ -0,0 +1,235 @@
+import sys
+import os
+import json
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+
+import pygame
+pygame.init()
+pygame.display.set_mode((1, 1))
+
+from agents.experiment import EXPERIMENTS_DIR, VARIANTS, load_spec, resolve_spec, set_path, parse_override, build_config, ray_runtime_env, run_cpus
+from agents.checkpointing import AsyncCheckpointWriter, apply_retention, latest_checkpoint, load_env_rng, restore_env_rng
+from agents.eval_worker import InTrainingEvaluator
+from agents.callbacks import summarise_throughput
+
+
+# Function: Get nested dictionary values
+def get_nested(d, path, default=None):
+    cur = d
+    for p in path.split("/"):
+        if not isinstance(cur, dict) or p not in cur:
+            return default
+        cur = cur[p]
+    return cur
+
+
+# Function: Number of env runners from the command line, "auto" uses every core but the driver's
+def parse_num_env_runners(value):
+    if value == "auto":
+        return max(0, (os.cpu_count() or 1) - 1)
+    return int(value)
+
+
+# Function: Train one experiment from a resolved spec. With resume=True it continues from the
+# newest checkpoint in models/<name>/checkpoints (algorithm, optimizer and env RNG state), or
+# starts fresh when there is none.
+def train(spec, resume=False):
+    import ray
+    from ray.tune.logger import UnifiedLogger
+
+    name = spec["name"]
+    models_dir = os.path.abspath(os.path.join(spec["models_dir"], name))
+    ckpt_root = os.path.join(models_dir, "checkpoints")
+    run_log_dir = os.path.join(spec["log_dir"], name)
+    os.makedirs(ckpt_root, exist_ok=True)
+    os.makedirs(run_log_dir, exist_ok=True)
+
+    # Keep the exact settings next to the checkpoints
+    with open(os.path.join(models_dir, "experiment.json"), "w") as f:
+        json.dump(spec, f, indent=2)
+
+    # Each env runner, and the evaluation worker, takes a CPU on top of the driver's
+    needed = run_cpus(spec)
+    cores = os.cpu_count() or 1
+    if needed > cores:
+        print(f"Warning: driver + {spec['resources']['num_env_runners']} env runners"
+              f"{' + eval worker' if spec['eval']['episodes'] else ''} need {needed} CPUs, "
+              f"this machine has {cores}; they will share cores")
+
+    # Start Ray, or join the one this run was scheduled in (agents/scheduler.py).
+    # An own Ray instance gets a slot per process even when that oversubscribes the cores,
+    # rather than leaving runners waiting for CPUs that never come.
+    owns_ray = not ray.is_initialized()
+    if owns_ray:
+        ray.init(num_cpus=max(cores, needed), include_dashboard=False, log_to_driver=False,
+                 runtime_env=ray_runtime_env())
+
+    cfg = build_config(spec)
+
+    def logger_creator(config):
+        return UnifiedLogger(config, run_log_dir, loggers=None)
+
+    algo = cfg.build(logger_creator=logger_creator)
+
+    # Multi-agent results sum both agents' (shared) rewards
+    reward_scale = 0.5 if VARIANTS[spec["variant"]]["multi_agent"] else 1.0
+
+    timesteps = spec["timesteps"]
+    save_every = spec["checkpoint_every"]
+    next_save = save_every
+
+    latest = latest_checkpoint(ckpt_root) if resume else None
+    if latest is not None:
+        start_step, ckpt_dir = latest
+        algo.restore(ckpt_dir)
+        restored_envs = restore_env_rng(algo, load_env_rng(ckpt_dir))
+        next_save = start_step + save_every
+        print(f"Resumed from {ckpt_dir} (iteration {algo.iteration}, {restored_envs} env RNG states restored)")
+        if start_step >= timesteps:
+            print(f"Already trained for {timesteps} steps")
+            algo.stop()
+            if owns_ray:
+                ray.shutdown()
+            return
+    elif resume:
+        print(f"No checkpoint in {ckpt_root}, starting from scratch")
+
+    # Checkpoints are written on a background thread; training only waits for the state copy.
+    # After each write, checkpoints beyond the newest `keep_full_checkpoints` become weights-only.
+    keep_full = spec["keep_full_checkpoints"]
+    retain = None if keep_full is None else (lambda _: apply_retention(ckpt_root, keep_full))
+    writer = AsyncCheckpointWriter(max_pending=2, after_write=retain)
+
+    # Held-out evaluation of every checkpoint, running alongside training
+    evaluator = None
+    if spec["eval"]["episodes"] > 0:
+        evaluator = InTrainingEvaluator(spec, os.path.join(run_log_dir, "eval_progress.csv"))
+
+    throughput = []
+    final_saved = False
+
+    while True:
+        result = algo.train()
+        speed = result.get("throughput", {})
+        if speed:
+            throughput.append(speed)
+
+        steps = int(result.get("num_env_steps_sampled_lifetime", 0))
+
+        reward_mean = result.get("episode_reward_mean", None)
+        len_mean = result.get("episode_len_mean", None)
+
+        if reward_mean is None:
+            reward_mean = get_nested(result, "env_runners/episode_return_mean", 0.0)
+        if len_mean is None:
+            len_mean = get_nested(result, "env_runners/episode_len_mean", 0.0)
+
+        reward_mean = float(reward_mean) * reward_scale if reward_mean is not None else 0.0
+        len_mean = float(len_mean) if len_mean is not None else 0.0
+
+        print("-----------------------------------------------")
+        print(f"t = {steps} steps\navg_reward = {reward_mean:.3f}\navg_len = {len_mean:.1f}")
+        if speed:
+            print(f"env_steps/s = {speed['env_steps_per_sec']:.0f} (sample {speed['sample_s']:.1f}s, "
+                  f"learn {speed['learn_s']:.1f}s, runner idle {speed['env_runner_idle_share']:.0%})")
+        print("-----------------------------------------------")
+
+        if steps >= next_save:
+            while steps >= next_save:
+                writer.save(algo, os.path.join(ckpt_root, f"checkpoint_{next_save}"))
+                if evaluator is not None:
+                    evaluator.submit(next_save, algo)
+                final_saved = final_saved or next_save == timesteps
+                next_save += save_every
+
+        if evaluator is not None:
+            for row in evaluator.poll():
+                print(f"eval @ {row['step']}: perfect_rate = {row['perfect_rate']:.3f}, score_mean = {row['score_mean']:.3f}")
+
+        if steps >= timesteps:
+            break
+
+    # Save the final model, unless the loop above already saved this step
+    if not final_saved:
+        writer.save(algo, os.path.join(ckpt_root, f"checkpoint_{timesteps}"))
+    writer.close()
+    if evaluator is not None:
+        if not final_saved:
+            evaluator.submit(timesteps, algo)
+        for row in evaluator.close():
+            print(f"eval @ {row['step']}: perfect_rate = {row['perfect_rate']:.3f}, score_mean = {row['score_mean']:.3f}")
+
+    # Throughput over this session (a resumed run only covers the iterations since resuming)
+    summary = summarise_throughput(throughput)
+    with open(os.path.join(run_log_dir, "throughput_summary.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+    if throughput:
+        print(f"Throughput: {summary['env_steps_per_sec']:.0f} env steps/s, {summary['episodes_per_sec']:.2f} episodes/s, "
+              f"env runners idle {summary['env_runner_idle_share']:.0%} of the time")
+
+    # Release the env runners' CPUs for the next run
+    algo.stop()
+    if owns_ray:
+        ray.shutdown()
+
+
+# Function: Spec from the command line: the spec file (if any), then --variant/--level/...
+# shortcuts, then --set overrides, in that order
+def spec_from_args(args):
+    spec = load_spec(args.spec) if args.spec else {}
+
+    shortcuts = {
+        "variant": args.variant,
+        "level": args.level,
+        "name": args.name,
+        "resources.num_env_runners": args.num_env_runners,
+        "profile": True if args.profile else None,
+    }
+    for key, value in shortcuts.items():
+        if value is not None:
+            set_path(spec, key, value)
+
+    for key, value in args.set or []:
+        set_path(spec, key, value)
+
+    return resolve_spec(spec)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Train an RLlib PPO experiment from a JSON/YAML spec")
+    parser.add_argument("spec", nargs="?", default=None,
+                        help=f"Experiment spec file (see {os.path.relpath(EXPERIMENTS_DIR)}/)")
+    parser.add_argument("--variant", choices=sorted(VARIANTS), default=None)
+    parser.add_argument("--level", type=str, default=None)
+    parser.add_argument("--name", type=str, default=None, help="Run name for models/ and logs/ (default ppo_<variant>_<level>)")
+    parser.add_argument("--num-env-runners", type=parse_num_env_runners, default=None,
+                        help="Remote env runners for sampling (0 samples on the driver, 'auto' uses all cores)")
+    parser.add_argument("--profile", action="store_true", default=False, help="Per-phase step timings in progress.csv")
+    parser.add_argument("--set", nargs="+", type=parse_override, default=None, metavar="KEY=VALUE",
+                        help="Override any spec setting, e.g. ppo.lr=3e-4 resources.num_envs_per_env_runner=16")
+    parser.add_argument("--resume", action="store_true", default=False,
+                        help="Continue from the newest checkpoint in models/<name>/checkpoints")
+    parser.add_argument("--print-spec", action="store_true", default=False, help="Print the resolved spec and exit")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        spec = spec_from_args(args)
+    except (ValueError, OSError) as e:
+        parser.error(str(e))
+
+    if args.print_spec:
+        print(json.dumps(spec, indent=2))
+        return
+
+    train(spec, resume=args.resume)
+
+
+if __name__ == "__main__":
+    main()
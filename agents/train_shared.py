@@ -12,8 +12,9 @@ import gymnasium as gym
 from stable_baselines3 import PPO
 from stable_baselines3.common.callbacks import CheckpointCallback
 from stable_baselines3.common.env_util import make_vec_env
-from stable_baselines3.common.vec_env import VecFrameStack
+from stable_baselines3.common.vec_env import DummyVecEnv, VecFrameStack
 from environment.gym_wrapper import GymCoopEnv
+from environment.shm_vec_env import ShmSubprocVecEnv
 
 def train_shared():
     EXPERIMENT_NAME = "ppo_shared" # Model name
@@ -29,11 +30,17 @@ def train_shared():
     # Fixed starting seed for reproducibility
     TRAIN_SEED = 12345
 
+    # Worker processes stepping the 8 environments (shared-memory buffers between them and
+    # the learner); on a single core everything stays in this process
+    NUM_WORKERS = min(8, os.cpu_count() or 1)
+
     # Create the gym environment
     env = make_vec_env(
         GymCoopEnv,
         n_envs=8,
         seed=TRAIN_SEED,
+        vec_env_cls=ShmSubprocVecEnv if NUM_WORKERS > 1 else DummyVecEnv,
+        vec_env_kwargs={"n_workers": NUM_WORKERS} if NUM_WORKERS > 1 else None,
     )
     # Frame stacking for temporal context
     env = VecFrameStack(env, n_stack=4)
@@ -0,0 +1,156 @@
+import sys
+import os
+import csv
+import json
+import time
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.experiment import EXPERIMENTS_DIR, VARIANTS, load_spec, resolve_spec, set_path, parse_override
+from agents.eval_worker import EvalWorker, append_eval_rows
+from agents.torch_ppo import TorchPPO
+
+# Columns of logs/<name>/progress.csv
+PROGRESS_FIELDS = [
+    "training_iteration", "num_env_steps_sampled_lifetime", "episode_return_mean", "episode_len_mean",
+    "score_mean", "time_this_iter_s", "sample_s", "learn_s", "env_steps_per_sec",
+]
+LEARNER_FIELDS = ["policy_loss", "vf_loss", "entropy", "approx_kl"]
+
+
+# Function: Held-out evaluator for the spec's "eval" block, run in this process (None when off)
+def make_evaluator(spec):
+    cfg = spec["eval"]
+    if cfg["episodes"] <= 0:
+        return None
+    return EvalWorker(
+        spec["variant"], spec["level"], range(cfg["first_seed"], cfg["first_seed"] + cfg["episodes"]),
+        spec["env"]["stack_n"], cfg["deterministic"], cfg["max_steps_cap"],
+        os.path.abspath(os.path.join(cfg["out_dir"], spec["name"])),
+    )
+
+
+# Function: Train one experiment spec with the single-process torch PPO trainer.
+# Checkpoints are RLlib weights-only checkpoints in models/<name>/checkpoints, so every
+# eval_*_rllib.py script and checkpoint sweep works on them unchanged. With eval.episodes > 0
+# each checkpoint is evaluated in this process before training goes on.
+def train(spec):
+    name = spec["name"]
+    models_dir = os.path.abspath(os.path.join(spec["models_dir"], name))
+    ckpt_root = os.path.join(models_dir, "checkpoints")
+    run_log_dir = os.path.join(spec["log_dir"], name)
+    os.makedirs(ckpt_root, exist_ok=True)
+    os.makedirs(run_log_dir, exist_ok=True)
+
+    with open(os.path.join(models_dir, "experiment.json"), "w") as f:
+        json.dump(spec, f, indent=2)
+
+    # Settings only the RLlib trainer acts on
+    if spec["keep_full_checkpoints"] is not None:
+        print("Note: keep_full_checkpoints has no effect here, torch PPO checkpoints are always weights-only")
+    if spec["profile"]:
+        print("Note: profile is ignored by the torch PPO trainer, use agents/train_rllib.py --profile")
+
+    ppo = TorchPPO(spec)
+    evaluator = make_evaluator(spec)
+    eval_progress = os.path.join(run_log_dir, "eval_progress.csv")
+
+    # Function: Write checkpoint_<step> and evaluate it if asked
+    def save(step):
+        ppo.save(os.path.join(ckpt_root, f"checkpoint_{step}"))
+        if evaluator is not None:
+            row = dict(evaluator.evaluate(step, ppo.policy_states()), iteration=ppo.iteration)
+            append_eval_rows(eval_progress, [row])
+            print(f"eval @ {step}: perfect_rate = {row['perfect_rate']:.3f}, score_mean = {row['score_mean']:.3f}")
+    print(f"{ppo.num_envs} envs x {ppo.fragment} steps per iteration, policies: {', '.join(ppo.policy_ids)}")
+
+    fields = PROGRESS_FIELDS + [f"learner/{pid}/{key}" for pid in ppo.policy_ids for key in LEARNER_FIELDS]
+    progress = open(os.path.join(run_log_dir, "progress.csv"), "w", newline="")
+    writer = csv.DictWriter(progress, fieldnames=fields)
+    writer.writeheader()
+
+    timesteps = spec["timesteps"]
+    save_every = spec["checkpoint_every"]
+    next_save = save_every
+    final_saved = False
+    start = time.perf_counter()
+
+    try:
+        while True:
+            result = ppo.train()
+            steps = result["num_env_steps_sampled_lifetime"]
+
+            row = {key: result[key] for key in PROGRESS_FIELDS}
+            for pid, stats in result["learner"].items():
+                row.update({f"learner/{pid}/{key}": stats[key] for key in LEARNER_FIELDS})
+            writer.writerow(row)
+            progress.flush()
+
+            print("-----------------------------------------------")
+            print(f"t = {steps} steps\navg_reward = {result['episode_return_mean']:.3f}\navg_len = {result['episode_len_mean']:.1f}")
+            print(f"env_steps/s = {result['env_steps_per_sec']:.0f} (sample {result['sample_s']:.1f}s, learn {result['learn_s']:.1f}s)")
+            print("-----------------------------------------------")
+
+            while steps >= next_save:
+                save(next_save)
+                final_saved = final_saved or next_save == timesteps
+                next_save += save_every
+
+            if steps >= timesteps:
+                break
+    finally:
+        progress.close()
+
+    # Save the final model, unless the loop above already saved this step
+    if not final_saved:
+        save(timesteps)
+    total_s = time.perf_counter() - start
+    print(f"Trained {ppo.env_steps} env steps in {total_s:.0f}s ({ppo.env_steps / total_s:.0f} env steps/s)")
+
+
+# Function: Spec from the command line: the spec file (if any), then --variant/--level/--name
+# shortcuts, then --set overrides, in that order
+def spec_from_args(args):
+    spec = load_spec(args.spec) if args.spec else {}
+
+    shortcuts = {"variant": args.variant, "level": args.level, "name": args.name}
+    for key, value in shortcuts.items():
+        if value is not None:
+            set_path(spec, key, value)
+
+    for key, value in args.set or []:
+        set_path(spec, key, value)
+
+    return resolve_spec(spec)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Train a PPO experiment spec in one process with torch (no Ray)")
+    parser.add_argument("spec", nargs="?", default=None,
+                        help=f"Experiment spec file (see {os.path.relpath(EXPERIMENTS_DIR)}/)")
+    parser.add_argument("--variant", choices=sorted(VARIANTS), default=None)
+    parser.add_argument("--level", type=str, default=None)
+    parser.add_argument("--name", type=str, default=None, help="Run name for models/ and logs/ (default ppo_<variant>_<level>)")
+    parser.add_argument("--set", nargs="+", type=parse_override, default=None, metavar="KEY=VALUE",
+                        help="Override any spec setting, e.g. ppo.lr=3e-4 resources.num_envs_per_env_runner=16")
+    parser.add_argument("--print-spec", action="store_true", default=False, help="Print the resolved spec and exit")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        spec = spec_from_args(args)
+    except (ValueError, OSError) as e:
+        parser.error(str(e))
+
+    if args.print_spec:
+        print(json.dumps(spec, indent=2))
+        return
+
+    train(spec)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+from .harness import summarise_latencies, time_calls, action_stream, machine_info, compare_to_baseline
+from .env_cases import run_suite, build_cases
+from .memory_cases import run_memory_suite, build_memory_cases
+from .rllib_cases import run_sampling_sweep, build_training_config
+
+__all__ = ["summarise_latencies", "time_calls", "action_stream", "machine_info", "compare_to_baseline", "run_suite", "build_cases", "run_memory_suite", "build_memory_cases", "run_sampling_sweep", "build_training_config"]
@@ -0,0 +1,265 @@
+import os
+import fnmatch
+import contextlib
+from collections import deque
+import numpy as np
+
+from environment.env import CoopEnv
+from environment.levels import LEVELS
+from environment.gym_wrapper import GymCoopEnv
+from environment.gym_wrapper_rllib_centralised import GymCoopEnvRLlibCentralised
+from environment.gym_wrapper_rllib_decentralised import GymCoopEnvRLlibDecentralised
+from environment.gym_wrapper_rllib_decentralised_comms import GymCoopEnvRLlibDecentralisedComms
+from evaluation.engine import run_episode
+from evaluation.controllers import RLlibCentralisedController
+
+from .harness import time_calls, summarise_latencies, action_stream, machine_info, calibrate
+
+LEVEL_NAMES = ("level_1", "level_2", "level_3")
+STACK_NS = (1, 4, 8)
+
+# Calls per case at scale 1.0, scaled by --scale on the command line
+DEFAULT_CALLS = {
+    "step": 5000,
+    "reset": 200,
+    "get_obs": 2000,
+    "frame_stack": 20000,
+    "eval_episode": 5,
+}
+WARMUP_FRACTION = 0.05
+
+
+# Function: Joint action in the format each wrapper's step expects
+def _joint_action(a):
+    return np.array([int(a[0]), int(a[1])], dtype=np.int64)
+
+
+# Function: Per-agent action dict for the multi-agent wrappers
+def _agent_actions(a):
+    return {"agent_1": int(a[0]), "agent_2": int(a[1])}
+
+
+# Function: Observation features for both agents, as computed on every step
+def _obs_both_agents(env, raw_obs):
+    env._get_obs(raw_obs, agent_index=0)
+    env._get_obs(raw_obs, agent_index=1)
+
+
+# Wrapper name -> (constructor, action formatter, done check, _get_obs call, uses stack_n)
+WRAPPERS = {
+    "gym": (
+        lambda level, stack_n: GymCoopEnv(level),
+        _joint_action,
+        lambda out: out[2] or out[3],
+        lambda env, raw_obs: env._get_obs(raw_obs),
+        False,
+    ),
+    "rllib_centralised": (
+        lambda level, stack_n: GymCoopEnvRLlibCentralised({"level_name": level, "stack_n": stack_n}),
+        _joint_action,
+        lambda out: out[2] or out[3],
+        lambda env, raw_obs: env._get_obs(raw_obs),
+        True,
+    ),
+    "rllib_decentralised": (
+        lambda level, stack_n: GymCoopEnvRLlibDecentralised({"level_name": level, "stack_n": stack_n}),
+        _agent_actions,
+        lambda out: out[2]["__all__"] or out[3]["__all__"],
+        _obs_both_agents,
+        True,
+    ),
+    "rllib_decentralised_comms": (
+        lambda level, stack_n: GymCoopEnvRLlibDecentralisedComms({"level_name": level, "stack_n": stack_n}),
+        _agent_actions,
+        lambda out: out[2]["__all__"] or out[3]["__all__"],
+        _obs_both_agents,
+        True,
+    ),
+}
+
+
+# Class: Uniform random policy driven by a seeded generator, stands in for a trained model
+class SeededRandomPolicy:
+    def __init__(self, seed=0):
+        self.rng = np.random.default_rng(seed)
+
+    def compute_single_action(self, obs, policy_id=None, explore=False):
+        return self.rng.integers(0, 6, size=2)
+
+
+# Function: CoopEnv.step on a seeded action stream, finished episodes are reset untimed
+def bench_coopenv_step(level, calls, seed=0):
+    env = CoopEnv(LEVELS[level])
+    env.reset(seed=seed)
+    warmup = int(calls * WARMUP_FRACTION)
+    actions = action_stream(calls + warmup, seed).tolist()
+    state = {"i": 0, "done": False, "episode": seed}
+
+    def step():
+        a1, a2 = actions[state["i"]]
+        state["i"] += 1
+        state["done"] = env.step(a1, a2)[2]
+
+    def between():
+        if state["done"]:
+            state["episode"] += 1
+            env.reset(seed=state["episode"])
+
+    return summarise_latencies(time_calls(step, calls, warmup, between))
+
+
+# Function: CoopEnv.reset with a fresh seed each call
+def bench_coopenv_reset(level, calls, seed=0):
+    env = CoopEnv(LEVELS[level])
+    seeds = iter(range(seed, seed + calls + calls))
+    return summarise_latencies(time_calls(lambda: env.reset(seed=next(seeds)), calls, warmup=2))
+
+
+# Function: Wrapper reset, including the per-episode BFS distance maps
+def bench_wrapper_reset(wrapper, level, stack_n, calls, seed=0):
+    make_env = WRAPPERS[wrapper][0]
+    env = make_env(level, stack_n)
+    seeds = iter(range(seed, seed + calls + calls))
+    return summarise_latencies(time_calls(lambda: env.reset(seed=next(seeds)), calls, warmup=2))
+
+
+# Function: Wrapper step (CoopEnv.step + features + frame stack)
+def bench_wrapper_step(wrapper, level, stack_n, calls, seed=0):
+    make_env, fmt_action, is_done, _, _ = WRAPPERS[wrapper]
+    env = make_env(level, stack_n)
+    env.reset(seed=seed)
+    warmup = int(calls * WARMUP_FRACTION)
+    actions = [fmt_action(a) for a in action_stream(calls + warmup, seed)]
+    state = {"i": 0, "done": False, "episode": seed}
+
+    def step():
+        out = env.step(actions[state["i"]])
+        state["i"] += 1
+        state["done"] = is_done(out)
+
+    def between():
+        if state["done"]:
+            state["episode"] += 1
+            env.reset(seed=state["episode"])
+
+    return summarise_latencies(time_calls(step, calls, warmup, between))
+
+
+# Function: Observation feature extraction alone, on states visited by a seeded rollout
+def bench_wrapper_get_obs(wrapper, level, stack_n, calls, seed=0):
+    make_env, fmt_action, is_done, get_obs, _ = WRAPPERS[wrapper]
+    env = make_env(level, stack_n)
+    env.reset(seed=seed)
+    actions = [fmt_action(a) for a in action_stream(calls, seed)]
+    state = {"i": 0, "episode": seed}
+
+    def call():
+        get_obs(env, env.env.get_observation())
+
+    # Move to a new state between calls so features are not computed on one frozen state
+    def between():
+        out = env.step(actions[state["i"] % len(actions)])
+        state["i"] += 1
+        if is_done(out):
+            state["episode"] += 1
+            env.reset(seed=state["episode"])
+
+    return summarise_latencies(time_calls(call, calls, warmup=10, between=between))
+
+
+# Function: Frame stacking as done by the wrappers and the SB3 eval controller
+def bench_frame_stack(stack_n, calls, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = deque((rng.random(74, dtype=np.float32) for _ in range(stack_n)), maxlen=stack_n)
+    new_frames = rng.random((64, 74), dtype=np.float32)
+    state = {"i": 0}
+
+    def stack():
+        frames.append(new_frames[state["i"] & 63].copy())
+        state["i"] += 1
+        np.concatenate(list(frames), axis=0).astype(np.float32)
+
+    return summarise_latencies(time_calls(stack, calls, warmup=100))
+
+
+# Function: Whole evaluation episodes through the eval engine with a random policy.
+# per_sec is episodes per second; steps_per_sec is env steps per second.
+def bench_eval_episode(level, stack_n, calls, seed=0):
+    controller = RLlibCentralisedController(SeededRandomPolicy(seed))
+    seeds = iter(range(seed, seed + calls + 1))
+    steps = []
+
+    def episode():
+        steps.append(run_episode(controller, level, next(seeds), True, stack_n, None)["steps"])
+
+    stats = summarise_latencies(time_calls(episode, calls, warmup=1))
+    timed_steps = sum(steps[1:])
+    stats["steps_per_sec"] = timed_steps / stats["total_s"] if stats["total_s"] > 0 else float("inf")
+    return stats
+
+
+# Function: Every (case_id, thunk) in the suite for the given levels and stack sizes
+def build_cases(levels=LEVEL_NAMES, stack_ns=STACK_NS, scale=1.0, seed=0):
+    def n(kind):
+        return max(1, int(DEFAULT_CALLS[kind] * scale))
+
+    cases = []
+    for level in levels:
+        cases.append((f"coopenv.step[{level}]", lambda level=level: bench_coopenv_step(level, n("step"), seed)))
+        cases.append((f"coopenv.reset[{level}]", lambda level=level: bench_coopenv_reset(level, n("reset"), seed)))
+
+        for wrapper, (_, _, _, _, uses_stack) in WRAPPERS.items():
+            for stack_n in (stack_ns if uses_stack else (None,)):
+                suffix = f"{level},stack_n={stack_n}" if uses_stack else level
+                s = stack_n or 1
+                cases.append((f"{wrapper}.reset[{suffix}]",
+                              lambda w=wrapper, level=level, s=s: bench_wrapper_reset(w, level, s, n("reset"), seed)))
+                cases.append((f"{wrapper}.step[{suffix}]",
+                              lambda w=wrapper, level=level, s=s: bench_wrapper_step(w, level, s, n("step"), seed)))
+                # Features do not depend on stack_n, time them once per level
+                if stack_n in (None, stack_ns[0]):
+                    cases.append((f"{wrapper}._get_obs[{level}]",
+                                  lambda w=wrapper, level=level, s=s: bench_wrapper_get_obs(w, level, s, n("get_obs"), seed)))
+
+        for stack_n in stack_ns:
+            cases.append((f"eval.episode[{level},stack_n={stack_n}]",
+                          lambda level=level, s=stack_n: bench_eval_episode(level, s, n("eval_episode"), seed)))
+
+    for stack_n in stack_ns:
+        cases.append((f"frame_stack[stack_n={stack_n}]", lambda s=stack_n: bench_frame_stack(s, n("frame_stack"), seed)))
+
+    return cases
+
+
+# Function: Run the suite and return the results document.
+# `only` is a list of fnmatch patterns on case ids; handle_interact's prints
+# still run (they are part of the step cost) but go to /dev/null. With
+# repeats > 1 each case keeps its fastest run by median latency.
+def run_suite(levels=LEVEL_NAMES, stack_ns=STACK_NS, scale=1.0, seed=0, only=None, progress=None, repeats=1):
+    cases = build_cases(levels, stack_ns, scale, seed)
+    if only:
+        cases = [(cid, fn) for cid, fn in cases if any(fnmatch.fnmatch(cid, p) for p in only)]
+
+    # Calibrate before and after, the machine's speed can drift during a long run
+    calibration = [calibrate()]
+
+    results = {}
+    with open(os.devnull, "w") as devnull:
+        for case_id, fn in cases:
+            runs = []
+            with contextlib.redirect_stdout(devnull):
+                for _ in range(max(1, repeats)):
+                    runs.append(fn())
+            results[case_id] = min(runs, key=lambda stats: stats["p50_us"])
+            if progress is not None:
+                progress(case_id, results[case_id])
+
+    calibration.append(calibrate())
+    machine = machine_info()
+    machine["calibration_per_sec"] = float(np.mean(calibration))
+
+    return {
+        "machine": machine,
+        "config": {"levels": list(levels), "stack_ns": list(stack_ns), "scale": scale, "seed": seed, "repeats": repeats},
+        "cases": results,
+    }
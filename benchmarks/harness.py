@@ -0,0 +1,185 @@
+import os
+import sys
+import json
+import time
+import fnmatch
+import platform
+import subprocess
+import numpy as np
+
+
+# Function: Summarise per-call latencies (nanoseconds) into the stats stored per case
+def summarise_latencies(latencies_ns, units_per_call=1):
+    lat = np.asarray(latencies_ns, dtype=np.float64)
+    if lat.size == 0:
+        return {"calls": 0}
+
+    total_s = float(lat.sum()) / 1e9
+    p50, p90, p99 = np.percentile(lat, [50, 90, 99])
+    return {
+        "calls": int(lat.size),
+        "total_s": total_s,
+        "mean_us": float(lat.mean()) / 1e3,
+        "p50_us": float(p50) / 1e3,
+        "p90_us": float(p90) / 1e3,
+        "p99_us": float(p99) / 1e3,
+        "max_us": float(lat.max()) / 1e3,
+        "per_sec": (lat.size * units_per_call) / total_s if total_s > 0 else float("inf"),
+        # Throughput implied by the median call, much less sensitive to scheduler noise
+        "median_per_sec": units_per_call * 1e9 / float(p50) if p50 > 0 else float("inf"),
+    }
+
+
+# Function: Time fn() `calls` times after `warmup` untimed calls.
+# `between` runs untimed after every call (e.g. resetting a finished episode).
+def time_calls(fn, calls, warmup=0, between=None):
+    for _ in range(warmup):
+        fn()
+        if between is not None:
+            between()
+
+    clock = time.perf_counter_ns
+    latencies = np.empty(calls, dtype=np.int64)
+    for i in range(calls):
+        t0 = clock()
+        fn()
+        latencies[i] = clock() - t0
+        if between is not None:
+            between()
+    return latencies
+
+
+# Function: Seeded stream of joint actions, generated up front so it is not timed
+def action_stream(n, seed=0, n_actions=6):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, n_actions, size=(n, 2), dtype=np.int64)
+
+
+# Function: Speed of a fixed pure-Python workload (loops per second, best of `rounds`).
+# Stored with every result so comparisons can factor out a faster or slower machine.
+def calibrate(rounds=5, loops=200_000):
+    best = None
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        total = 0
+        table = {}
+        for i in range(loops):
+            total += i * i
+            table[i & 255] = total
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return loops / best
+
+
+# Function: Short git revision of the working tree, or None outside a checkout
+def _git_revision():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            capture_output=True, text=True, timeout=10,
+        )
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+# Function: Machine and software details stored with every result file
+def machine_info():
+    info = {
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "cpu_count": os.cpu_count(),
+        "git_revision": _git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    try:
+        import pygame
+        info["pygame"] = pygame.version.ver
+    except ImportError:
+        pass
+    return info
+
+
+# Function: Write a results file as JSON
+def write_results(path, results):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=False)
+
+
+# Function: Load a results/baseline file
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+# Function: Threshold for a case, the first matching fnmatch pattern wins
+def threshold_for(case_id, default, overrides=None):
+    for pattern, value in (overrides or []):
+        if fnmatch.fnmatch(case_id, pattern):
+            return value
+    return default
+
+
+# Function: Calibration speed ratio current/baseline, or None if either run lacks it
+def machine_speed_ratio(current, baseline):
+    cur_cal = current.get("machine", {}).get("calibration_per_sec")
+    base_cal = baseline.get("machine", {}).get("calibration_per_sec")
+    if not cur_cal or not base_cal:
+        return None
+    return cur_cal / base_cal
+
+
+# Function: Compare current cases against a baseline.
+# A case regresses when its throughput (`metric`, median-based by default)
+# drops by more than its threshold, given as a fraction of the baseline.
+# Cases missing on either side are reported but never fail the comparison.
+# With normalise=True each ratio is divided by the ratio of the two runs'
+# calibration speeds, so a uniformly slower machine does not read as a regression.
+def compare_to_baseline(current, baseline, threshold=0.15, overrides=None, metric="median_per_sec", normalise=False):
+    cur_cases = current.get("cases", {})
+    base_cases = baseline.get("cases", {})
+
+    speed = (machine_speed_ratio(current, baseline) or 1.0) if normalise else 1.0
+
+    rows = []
+    for case_id, cur in cur_cases.items():
+        base = base_cases.get(case_id)
+        if base is None or not base.get(metric) or not cur.get(metric):
+            rows.append({"case": case_id, "status": "new"})
+            continue
+
+        limit = threshold_for(case_id, threshold, overrides)
+        change = cur[metric] / (base[metric] * speed) - 1.0
+        rows.append({
+            "case": case_id,
+            "status": "regressed" if change < -limit else "ok",
+            "baseline_per_sec": base[metric],
+            "per_sec": cur[metric],
+            "change": change,
+            "threshold": limit,
+        })
+
+    for case_id in base_cases:
+        if case_id not in cur_cases:
+            rows.append({"case": case_id, "status": "missing"})
+
+    regressions = [r for r in rows if r["status"] == "regressed"]
+    return rows, regressions
+
+
+# Function: Print a comparison table
+def print_comparison(rows, out=sys.stdout):
+    for row in rows:
+        if row["status"] in ("new", "missing"):
+            print(f"  {row['status']:>9}  {row['case']}", file=out)
+            continue
+        print(
+            f"  {row['status']:>9}  {row['case']}: {row['per_sec']:.0f}/s "
+            f"vs {row['baseline_per_sec']:.0f}/s ({row['change']:+.1%}, limit -{row['threshold']:.0%})",
+            file=out,
+        )
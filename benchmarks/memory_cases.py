@@ -0,0 +1,250 @@
+import os
+import gc
+import sys
+import fnmatch
+import contextlib
+import tracemalloc
+import numpy as np
+import psutil
+
+from environment.env import CoopEnv
+from environment.levels import LEVELS
+
+from .env_cases import WRAPPERS, LEVEL_NAMES
+from .harness import action_stream, machine_info
+
+MIB = 1024 * 1024
+
+# Counts at scale 1.0, scaled by --scale on the command line
+DEFAULT_COUNTS = {
+    "alloc_steps": 2000,
+    "rss_envs": 32,
+    "retention_episodes": 10_000,
+    # Wrapper episodes are ~20x slower than raw CoopEnv ones; the per-episode
+    # containers live in CoopEnv, which gets the full 10k
+    "wrapper_retention_episodes": 1_000,
+}
+
+# Per-episode containers that must not carry anything over from earlier episodes
+EPISODE_CONTAINERS = ("pending_orders", "active_orders", "completed_orders", "failed_orders", "wall_items")
+
+
+# Function: Resident set size of this process in bytes
+def current_rss():
+    return psutil.Process(os.getpid()).memory_info().rss
+
+
+# Function: Env factory and step runner for "coopenv" or one of the wrapper names.
+# Returns (make_env(), step(env, action) -> done, reset(env, seed)).
+def _env_driver(kind, level, stack_n):
+    if kind == "coopenv":
+        return (
+            lambda: CoopEnv(LEVELS[level]),
+            lambda env, a: env.step(int(a[0]), int(a[1]))[2],
+            lambda env, seed: env.reset(seed=seed),
+        )
+
+    make_env, fmt_action, is_done, _, _ = WRAPPERS[kind]
+    return (
+        lambda: make_env(level, stack_n),
+        lambda env, a: is_done(env.step(fmt_action(a))),
+        lambda env, seed: env.reset(seed=seed),
+    )
+
+
+# Function: The CoopEnv underneath any driver's env
+def _raw_env(env):
+    return env if isinstance(env, CoopEnv) else env.env
+
+
+# Function: Bytes and blocks allocated during each step, measured with tracemalloc.
+# peak_bytes is the high-water mark above the level before the step (transient
+# arrays, dicts and lists built by the step); net_bytes / net_blocks is what the
+# step left allocated afterwards.
+def bench_step_allocations(kind, level, stack_n, steps, seed=0):
+    make_env, step, reset = _env_driver(kind, level, stack_n)
+    env = make_env()
+    reset(env, seed)
+    actions = action_stream(steps + 50, seed)
+
+    # Warm caches so one-off allocations do not land in the first timed steps
+    episode = seed
+    for a in actions[:50]:
+        if step(env, a):
+            episode += 1
+            reset(env, episode)
+
+    peak = np.empty(steps, dtype=np.int64)
+    net = np.empty(steps, dtype=np.int64)
+    blocks = np.empty(steps, dtype=np.int64)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        for i, a in enumerate(actions[50:]):
+            before, _ = tracemalloc.get_traced_memory()
+            blocks_before = sys.getallocatedblocks()
+            tracemalloc.reset_peak()
+
+            done = step(env, a)
+
+            after, high = tracemalloc.get_traced_memory()
+            peak[i] = high - before
+            net[i] = after - before
+            blocks[i] = sys.getallocatedblocks() - blocks_before
+
+            if done:
+                episode += 1
+                reset(env, episode)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "steps": int(steps),
+        "peak_bytes_mean": float(peak.mean()),
+        "peak_bytes_p99": float(np.percentile(peak, 99)),
+        "net_bytes_mean": float(net.mean()),
+        "net_blocks_mean": float(blocks.mean()),
+        "net_blocks_p99": float(np.percentile(blocks, 99)),
+    }
+
+
+# Function: Memory cost of one more env, from building `count` envs that each run
+# a reset and a few hundred steps (so lazily built state is included). RSS moves
+# in whole pages, so the Python heap growth seen by tracemalloc is reported too.
+def bench_rss_per_env(kind, level, stack_n, count, seed=0, steps_per_env=200):
+    make_env, step, reset = _env_driver(kind, level, stack_n)
+    actions = action_stream(steps_per_env, seed)
+
+    gc.collect()
+    rss_before = current_rss()
+    tracemalloc.start()
+
+    envs = []
+    for i in range(count):
+        env = make_env()
+        reset(env, seed + i)
+        for a in actions:
+            if step(env, a):
+                reset(env, seed + i)
+        envs.append(env)
+
+    gc.collect()
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_after = current_rss()
+    per_env = max(0, rss_after - rss_before) / count
+    heap_per_env = traced / count
+
+    # Estimate from whichever is larger, RSS also sees numpy buffers and allocator slack
+    estimate = max(per_env, heap_per_env)
+    return {
+        "envs": int(count),
+        "rss_before_mib": rss_before / MIB,
+        "rss_after_mib": rss_after / MIB,
+        "rss_per_env_kib": per_env / 1024,
+        "heap_per_env_kib": heap_per_env / 1024,
+        "envs_per_gib": (1024 * MIB) / estimate if estimate > 0 else None,
+    }
+
+
+# Function: Play `episodes` full episodes on one env and watch for memory that
+# survives reset. Samples allocated blocks and RSS at ten checkpoints, tracks
+# the largest size each per-episode container reached at any episode end, and
+# the largest size each one still had straight after reset (should stay at its
+# fresh-episode size: 3 pending orders, everything else empty).
+def bench_retention(kind, level, stack_n, episodes, seed=0):
+    make_env, step, reset = _env_driver(kind, level, stack_n)
+    env = make_env()
+    reset(env, seed)
+    raw = _raw_env(env)
+    rng = np.random.default_rng(seed)
+
+    container_max = {name: 0 for name in EPISODE_CONTAINERS}
+    after_reset_max = {name: 0 for name in EPISODE_CONTAINERS}
+    checkpoints = sorted(set(max(1, (episodes * k) // 10) for k in range(1, 11)))
+    samples = []
+
+    # Baseline after one episode, so first-episode setup is not counted as growth
+    while not step(env, rng.integers(0, 6, size=2)):
+        pass
+    reset(env, seed)
+    gc.collect()
+    start_blocks = sys.getallocatedblocks()
+    start_rss = current_rss()
+
+    for ep in range(1, episodes + 1):
+        while not step(env, rng.integers(0, 6, size=2)):
+            pass
+
+        for name in EPISODE_CONTAINERS:
+            container_max[name] = max(container_max[name], len(getattr(raw, name)))
+
+        reset(env, seed + ep)
+
+        for name in EPISODE_CONTAINERS:
+            after_reset_max[name] = max(after_reset_max[name], len(getattr(raw, name)))
+
+        if ep in checkpoints:
+            gc.collect()
+            samples.append({
+                "episode": ep,
+                "blocks": sys.getallocatedblocks() - start_blocks,
+                "rss_mib": (current_rss() - start_rss) / MIB,
+            })
+
+    # Growth per 1k episodes from a straight line through the checkpoint samples
+    xs = np.array([s["episode"] for s in samples], dtype=np.float64)
+    ys = np.array([s["blocks"] for s in samples], dtype=np.float64)
+    slope = float(np.polyfit(xs, ys, 1)[0]) * 1000 if len(samples) > 1 else 0.0
+
+    return {
+        "episodes": int(episodes),
+        "retained_blocks_end": int(samples[-1]["blocks"]),
+        "retained_rss_mib_end": float(samples[-1]["rss_mib"]),
+        "blocks_per_1k_episodes": slope,
+        "container_max_at_episode_end": container_max,
+        "container_max_after_reset": after_reset_max,
+        "samples": samples,
+    }
+
+
+# Function: Every (case_id, thunk) in the memory suite
+def build_memory_cases(levels=LEVEL_NAMES, stack_n=4, scale=1.0, seed=0):
+    def n(kind):
+        return max(1, int(DEFAULT_COUNTS[kind] * scale))
+
+    kinds = ["coopenv"] + list(WRAPPERS)
+    cases = []
+    for level in levels:
+        for kind in kinds:
+            suffix = f"{level},stack_n={stack_n}" if kind != "coopenv" and WRAPPERS[kind][4] else level
+            cases.append((f"memory.{kind}.step_alloc[{suffix}]",
+                          lambda k=kind, level=level: bench_step_allocations(k, level, stack_n, n("alloc_steps"), seed)))
+            cases.append((f"memory.{kind}.rss_per_env[{suffix}]",
+                          lambda k=kind, level=level: bench_rss_per_env(k, level, stack_n, n("rss_envs"), seed)))
+            episodes = n("retention_episodes") if kind == "coopenv" else n("wrapper_retention_episodes")
+            cases.append((f"memory.{kind}.retention[{suffix}]",
+                          lambda k=kind, level=level, e=episodes: bench_retention(k, level, stack_n, e, seed)))
+    return cases
+
+
+# Function: Run the memory suite and return the results document
+def run_memory_suite(levels=LEVEL_NAMES, stack_n=4, scale=1.0, seed=0, only=None, progress=None):
+    cases = build_memory_cases(levels, stack_n, scale, seed)
+    if only:
+        cases = [(cid, fn) for cid, fn in cases if any(fnmatch.fnmatch(cid, p) for p in only)]
+
+    results = {}
+    with open(os.devnull, "w") as devnull:
+        for case_id, fn in cases:
+            with contextlib.redirect_stdout(devnull):
+                results[case_id] = fn()
+            if progress is not None:
+                progress(case_id, results[case_id])
+
+    return {
+        "machine": machine_info(),
+        "config": {"mode": "memory", "levels": list(levels), "stack_n": stack_n, "scale": scale, "seed": seed},
+        "cases": results,
+    }
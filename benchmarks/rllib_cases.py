@@ -0,0 +1,177 @@
+import os
+import shutil
+import tempfile
+import itertools
+import contextlib
+import time
+
+from .harness import machine_info
+
+# Training variant -> level its default training script trains on
+TRAIN_SETUPS = {
+    "centralised": "level_3",
+    "decentralised": "level_2",
+    "decentralised_comms": "level_3",
+}
+
+# Default sweep. RLlib rejects settings whose runners x envs x fragment does not fit the
+# training batch (32768) evenly, those combinations are reported as invalid.
+SWEEP = {
+    "num_env_runners": (0, 1, 2),
+    "num_envs_per_env_runner": (4, 8, 16),
+    "rollout_fragment_length": (512, 1024, 4096),
+}
+
+# Old API stack timers: time spent collecting the batch, in SGD, and pushing weights to runners
+PHASE_TIMERS = {"sample": "sample_s", "learn": "learn_s", "synch_weights": "sync_weights_s"}
+
+
+# Function: PPO config of the training experiment for a variant, with sampling
+# overrides (num_env_runners, num_envs_per_env_runner, rollout_fragment_length, train_batch_size)
+def build_training_config(setup, level_name=None, **overrides):
+    from agents.experiment import resolve_spec, build_config
+
+    spec = {"variant": setup, "level": level_name or TRAIN_SETUPS[setup], "resources": {}, "ppo": {}}
+    for key, value in overrides.items():
+        spec["ppo" if key == "train_batch_size" else "resources"][key] = value
+    return build_config(resolve_spec(spec))
+
+
+# Function: Every combination of the swept sampling settings, as build_training_config kwargs
+def sweep_grid(num_env_runners=SWEEP["num_env_runners"],
+               num_envs_per_env_runner=SWEEP["num_envs_per_env_runner"],
+               rollout_fragment_length=SWEEP["rollout_fragment_length"]):
+    return [
+        {"num_env_runners": r, "num_envs_per_env_runner": e, "rollout_fragment_length": f}
+        for r, e, f in itertools.product(num_env_runners, num_envs_per_env_runner, rollout_fragment_length)
+    ]
+
+
+# Function: Total seconds recorded so far by the algorithm's phase timers.
+# The old API stack only reports windowed means in results, so the running totals are read directly.
+def _timer_totals(algo):
+    timers = getattr(algo, "_timers", {})
+    return {key: timers[name]._total_time if name in timers else 0.0 for name, key in PHASE_TIMERS.items()}
+
+
+# Function: Env steps sampled over the algorithm's lifetime
+def _env_steps(result):
+    for key in ("num_env_steps_sampled_lifetime", "num_env_steps_sampled", "timesteps_total"):
+        if result.get(key) is not None:
+            return int(result[key])
+    return 0
+
+
+# Function: Build one config, run `warmup` untimed and `iterations` timed training
+# iterations, then time `checkpoints` saves. Returns env steps/sec overall and for
+# sampling alone, and the wall time split into sampling, learning, weight sync,
+# everything else in train(), and checkpointing (a blocking save, and the stall an
+# AsyncCheckpointWriter save puts on the training loop).
+def bench_training_config(setup, level_name, settings, iterations=2, warmup=1, checkpoints=1, train_batch_size=None):
+    from ray.tune.logger import NoopLogger
+    from agents.checkpointing import AsyncCheckpointWriter
+
+    overrides = dict(settings)
+    if train_batch_size is not None:
+        overrides["train_batch_size"] = train_batch_size
+
+    record = {"setup": setup, "level": level_name, **settings, "train_batch_size": train_batch_size or 4096 * 8}
+    try:
+        cfg = build_training_config(setup, level_name, **overrides)
+        cfg.validate()
+    except ValueError as e:
+        record.update(status="invalid", error=str(e).splitlines()[0])
+        return record
+
+    scratch = tempfile.mkdtemp(prefix="rllib_bench_")
+    algo = cfg.build(logger_creator=lambda config: NoopLogger(config, scratch))
+    try:
+        result = {}
+        for _ in range(warmup):
+            result = algo.train()
+
+        steps_before = _env_steps(result)
+        timers_before = _timer_totals(algo)
+        t0 = time.perf_counter()
+        for _ in range(iterations):
+            result = algo.train()
+        wall = time.perf_counter() - t0
+        timers_after = _timer_totals(algo)
+        steps = _env_steps(result) - steps_before
+
+        checkpoint_times = []
+        stall_times = []
+        with AsyncCheckpointWriter() as writer:
+            for i in range(checkpoints):
+                t1 = time.perf_counter()
+                algo.save(checkpoint_dir=os.path.join(scratch, f"checkpoint_{i}"))
+                checkpoint_times.append(time.perf_counter() - t1)
+
+                # What the training loop waits for with the background writer
+                t1 = time.perf_counter()
+                writer.save(algo, os.path.join(scratch, f"checkpoint_async_{i}"))
+                stall_times.append(time.perf_counter() - t1)
+                writer.flush()
+    finally:
+        algo.stop()
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    phases = {key: timers_after[key] - timers_before[key] for key in timers_after}
+    phases["other_s"] = max(0.0, wall - sum(phases.values()))
+
+    record.update(
+        status="ok",
+        iterations=iterations,
+        env_steps=steps,
+        train_s=wall,
+        env_steps_per_sec=steps / wall if wall > 0 else None,
+        sampling_steps_per_sec=steps / phases["sample_s"] if phases["sample_s"] > 0 else None,
+        checkpoint_s=sum(checkpoint_times) / len(checkpoint_times) if checkpoint_times else None,
+        checkpoint_stall_s=sum(stall_times) / len(stall_times) if stall_times else None,
+        **phases,
+    )
+    record.update({f"{key[:-2]}_share": value / wall if wall > 0 else None for key, value in phases.items()})
+    return record
+
+
+# Function: Run the sweep for each training setup and return the results document.
+# Ray gets at least one CPU per runner plus the driver, so large sweeps on small
+# machines oversubscribe instead of waiting forever for resources; `cpu_count`
+# in the machine info shows when that happened.
+def run_sampling_sweep(setups=tuple(TRAIN_SETUPS), grid=None, level_name=None, iterations=2, warmup=1,
+                       checkpoints=1, train_batch_size=None, progress=None, quiet=True):
+    import ray
+
+    grid = grid or sweep_grid()
+    max_runners = max(s["num_env_runners"] for s in grid)
+    num_cpus = max(os.cpu_count() or 1, max_runners + 1)
+    ray.init(ignore_reinit_error=True, include_dashboard=False, log_to_driver=False, num_cpus=num_cpus)
+
+    records = []
+    try:
+        for setup in setups:
+            level = level_name or TRAIN_SETUPS[setup]
+            for settings in grid:
+                with open(os.devnull, "w") as devnull:
+                    with contextlib.redirect_stdout(devnull) if quiet else contextlib.nullcontext():
+                        record = bench_training_config(setup, level, settings, iterations, warmup, checkpoints, train_batch_size)
+                records.append(record)
+                if progress is not None:
+                    progress(record)
+    finally:
+        ray.shutdown()
+
+    return {
+        "machine": machine_info(),
+        "config": {
+            "mode": "rllib_sampling",
+            "setups": list(setups),
+            "level": level_name,
+            "iterations": iterations,
+            "warmup": warmup,
+            "checkpoints": checkpoints,
+            "train_batch_size": train_batch_size or 4096 * 8,
+            "ray_num_cpus": num_cpus,
+        },
+        "runs": records,
+    }
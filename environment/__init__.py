@@ -1,7 +1,7 @@
-from .env import CoopEnv, find_char, COOK_TIME, BURN_TIME
+from .env import CoopEnv, find_char, COOK_TIME, BURN_TIME, EVENT_NAMES
 from .gym_wrapper import GymCoopEnv
 from .gym_wrapper_rllib_centralised import GymCoopEnvRLlibCentralised
 from .gym_wrapper_rllib_decentralised import GymCoopEnvRLlibDecentralised
 from .gym_wrapper_rllib_decentralised_comms import GymCoopEnvRLlibDecentralisedComms
 
-__all__ = ["CoopEnv", "find_char", "COOK_TIME", "BURN_TIME", "GymCoopEnv", "GymCoopEnvRLlibCentralised", "GymCoopEnvRLlibDecentralised", "GymCoopEnvRLlibDecentralisedComms"]
+__all__ = ["CoopEnv", "find_char", "COOK_TIME", "BURN_TIME", "EVENT_NAMES", "GymCoopEnv", "GymCoopEnvRLlibCentralised", "GymCoopEnvRLlibDecentralised", "GymCoopEnvRLlibDecentralisedComms"]
@@ -2,8 +2,11 @@ import random
 from pygame import *
 import os
 from collections import deque
+import numpy as np
 from gymnasium.utils import seeding
 
+from . import profiling
+
 THIS_DIR = os.path.dirname(os.path.abspath(__file__))
 
 BASE_DIR = os.path.dirname(THIS_DIR)
@@ -12,6 +15,54 @@ BASE_DIR = os.path.dirname(THIS_DIR)
 COOK_TIME = 200
 BURN_TIME = 350
 
+# Outcome counters kept by CoopEnv.step, in the order of CoopEnv.event_counts.
+# They record what handle_interact actually did, so evaluation can read them
+# after an episode instead of re-deriving them from the state before each step.
+EVENT_NAMES = (
+    "wrong_serve_attempts",
+    "not_done_serve_attempts",
+    "wrong_done_soup_pickups",
+    "burnt_soup_pickups",
+    "wrong_pot_adds",
+    "agent_1_ingredient_pickups",
+    "agent_2_ingredient_pickups",
+    "agent_1_valid_pot_adds",
+    "agent_2_valid_pot_adds",
+    "agent_1_bowl_pickups",
+    "agent_2_bowl_pickups",
+    "agent_1_done_soup_pickups",
+    "agent_2_done_soup_pickups",
+    "agent_1_serves",
+    "agent_2_serves",
+    "collision_attempts",
+    "both_idle_steps",
+)
+EVENT_INDEX = {name: i for i, name in enumerate(EVENT_NAMES)}
+
+# Indices of per-agent counters, looked up by agent id (1 or 2)
+_AGENT_EVENT_INDEX = {
+    kind: {agent: EVENT_INDEX[f"agent_{agent}_{kind}"] for agent in (1, 2)}
+    for kind in ("ingredient_pickups", "valid_pot_adds", "bowl_pickups", "done_soup_pickups", "serves")
+}
+_EV_WRONG_SERVE = EVENT_INDEX["wrong_serve_attempts"]
+_EV_NOT_DONE_SERVE = EVENT_INDEX["not_done_serve_attempts"]
+_EV_WRONG_SOUP_PICKUP = EVENT_INDEX["wrong_done_soup_pickups"]
+_EV_BURNT_SOUP_PICKUP = EVENT_INDEX["burnt_soup_pickups"]
+_EV_WRONG_POT_ADD = EVENT_INDEX["wrong_pot_adds"]
+_EV_COLLISION = EVENT_INDEX["collision_attempts"]
+_EV_BOTH_IDLE = EVENT_INDEX["both_idle_steps"]
+
+# Per-step state of a CoopEnv episode that is immutable (numbers, strings, tuples),
+# copied as is by CoopEnv.snapshot. Mutable state is copied field by field there.
+_SNAPSHOT_SCALARS = (
+    "step_count", "score",
+    "agent1_dir", "agent2_dir", "agent1_holding", "agent2_holding",
+    "pot_onions", "pot_tomatoes", "pot_target_onions", "pot_target_tomatoes", "pot_recipe", "pot_timer", "pot_state",
+    "soups_collected", "handoffs_rewarded",
+    "feedback_text", "feedback_color", "feedback_timer",
+    "serving_time", "serving_state",
+)
+
 # Function: this will load an image from the assets folder, given a relative path
 def load_image(*path_parts):
     full_path = os.path.join(BASE_DIR, "assets", *path_parts)
@@ -74,6 +125,12 @@ class CoopEnv:
 
         self.wall_items = {}
 
+        # Built by the first render() call
+        self._renderer = None
+
+        # Per-episode outcome counters, see EVENT_NAMES
+        self.event_counts = np.zeros(len(EVENT_NAMES), dtype=np.int64)
+
         # Load sprites if rendering is enabled, otherwise set sprite attributes to None
         if self.env_render:
             self.tile_sprites = {
@@ -232,6 +289,7 @@ class CoopEnv:
         # Clear any items on the counters from the previous episode
         self.wall_items.clear()
         self.invalid_pot_add_streak = {1: 0, 2: 0}
+        self.event_counts[:] = 0
 
         return self.get_observation()
 
@@ -255,6 +313,11 @@ class CoopEnv:
         return (obs_agent1, obs_agent2)
 
     def step(self, action1, action2):
+        # Per-phase timing, only when profiling is on
+        prof = profiling.PROFILER
+        if prof is not None:
+            t = prof.clock()
+
         # Step penalty to encourage efficiency
         reward = -0.01
 
@@ -299,6 +362,9 @@ class CoopEnv:
 
         self.step_count += 1
 
+        if prof is not None:
+            t = prof.lap("env.orders", t)
+
         # Set agent directions based on movement actions
         dx1, dy1 = action_to_delta(action1)
         dx2, dy2 = action_to_delta(action2)
@@ -321,6 +387,11 @@ class CoopEnv:
         a1_hits_a2  = (candidate1 == a2_pos)
         a2_hits_a1  = (candidate2 == a1_pos)
 
+        if a1_hits_a2 or a2_hits_a1:
+            self.event_counts[_EV_COLLISION] += 1
+        if action1 == 0 and action2 == 0:
+            self.event_counts[_EV_BOTH_IDLE] += 1
+
         # Handle movement including collision and swap logic
         if swap_attempt:
             self.agent1_pos, self.agent2_pos = list(a2_pos), list(a1_pos)
@@ -336,14 +407,20 @@ class CoopEnv:
                     and candidate2 != a1_pos_after):
                 if self.level[candidate2[1]][candidate2[0]] in (" ", "B", "A"):
                     self.agent2_pos = list(candidate2)
-        
+
+        if prof is not None:
+            t = prof.lap("env.movement", t)
+
         # Handle interaction actions
         if action1 == 5:
             reward += self.handle_interact(agent=1)
 
         if action2 == 5:
             reward += self.handle_interact(agent=2)
-        
+
+        if prof is not None:
+            t = prof.lap("env.interact", t)
+
         # Handle cooking timer, reward when cooking finishes, penalise burning
         if self.pot_state in ("start", "done"):
             self.pot_timer += 1
@@ -364,7 +441,10 @@ class CoopEnv:
             if self.serving_time >= 100:
                 self.serving_state = "idle"
                 self.serving_time = 0
-        
+
+        if prof is not None:
+            t = prof.lap("env.pot_timer", t)
+
         # Check if the episode is done: 
         # either max steps reached or all orders completed/failed
         done = (self.step_count >= self.max_steps) or (
@@ -376,6 +456,9 @@ class CoopEnv:
             if self.score == 3 and len(self.failed_orders) == 0:
                 reward += 10.0
 
+        if prof is not None:
+            t = prof.lap("env.done_check", t)
+
         obs = self.get_observation()
         info = {}
 
@@ -383,6 +466,9 @@ class CoopEnv:
             info["score"] = self.score
             info["failed_orders"] = len(self.failed_orders)
 
+        if prof is not None:
+            prof.lap("env.observation", t)
+
         return obs, reward, done, info
 
     def handle_interact(self, agent):
@@ -409,17 +495,20 @@ class CoopEnv:
             if holding is None:
                 holding = "onion"
                 self.invalid_pot_add_streak[agent] = 0
+                self.event_counts[_AGENT_EVENT_INDEX["ingredient_pickups"][agent]] += 1
 
         # Tomato dispenser
         elif tile == "J":
             if holding is None:
                 holding = "tomato"
                 self.invalid_pot_add_streak[agent] = 0
+                self.event_counts[_AGENT_EVENT_INDEX["ingredient_pickups"][agent]] += 1
 
         # Bowl rack
         elif tile == "R":
             if holding is None:
                 holding = "bowl"
+                self.event_counts[_AGENT_EVENT_INDEX["bowl_pickups"][agent]] += 1
                 if self.pot_state == "done":
                     print("picked up bowl when done")
                 elif self.pot_state == "start":
@@ -434,8 +523,10 @@ class CoopEnv:
 
                 # Reject if pot already has this ingredient type
                 if holding == "onion" and self.pot_onions >= 1:
+                    self.event_counts[_EV_WRONG_POT_ADD] += 1
                     return self._penalise_invalid_pot_add()
                 if holding == "tomato" and self.pot_tomatoes >= 1:
+                    self.event_counts[_EV_WRONG_POT_ADD] += 1
                     return self._penalise_invalid_pot_add()
 
                 # Check if the new contents lead toward a valid order
@@ -447,10 +538,12 @@ class CoopEnv:
                 )
 
                 if target is None:
+                    self.event_counts[_EV_WRONG_POT_ADD] += 1
                     return self._penalise_invalid_pot_add()
 
                 # Accept the ingredient
                 self.invalid_pot_add_streak[agent] = 0
+                self.event_counts[_AGENT_EVENT_INDEX["valid_pot_adds"][agent]] += 1
                 self.pot_onions = new_onions
                 self.pot_tomatoes = new_tomatoes
                 if self.soups_collected < 3:
@@ -481,6 +574,7 @@ class CoopEnv:
                 # penalise picking up burnt or incorrect soup
                 if self.pot_state == "done":
                     self.soups_collected += 1
+                    self.event_counts[_AGENT_EVENT_INDEX["done_soup_pickups"][agent]] += 1
                     soup_onions, soup_tomatoes = self._recipe_to_counts(soup_name)
                     matches = any(
                         not o.get("served") and o["onions"] == soup_onions and o["tomatoes"] == soup_tomatoes
@@ -492,9 +586,11 @@ class CoopEnv:
                     elif matches:
                         print(f"pick up correct done soup {soup_name} (over budget)")
                     else:
+                        self.event_counts[_EV_WRONG_SOUP_PICKUP] += 1
                         print(f"pick up incorrect done soup {soup_name}")
                 elif self.pot_state == "burnt":
                     self.soups_collected += 1
+                    self.event_counts[_EV_BURNT_SOUP_PICKUP] += 1
                     reward -= 3.0
                     print("pick up burnt soup")
 
@@ -531,6 +627,7 @@ class CoopEnv:
 
                     if served_correct:
                         self.score += 1
+                        self.event_counts[_AGENT_EVENT_INDEX["serves"][agent]] += 1
                         time_left = target_deadline - self.step_count
                         time_bonus = max(0, time_left * 0.01)
                         reward += 20.0 + time_bonus
@@ -541,6 +638,7 @@ class CoopEnv:
                         print("served correct done order")
                     else:
                         reward -= 2.0
+                        self.event_counts[_EV_WRONG_SERVE] += 1
                         self.serving_state = "bowl-done"
                         self.feedback_text = "Wrong order!"
                         self.feedback_color = (220, 80, 80)
@@ -548,9 +646,13 @@ class CoopEnv:
 
                     holding = None
 
-                # Burnt or undercooked soup served
+                # Burnt or undercooked soup served, a done soup with an unknown recipe is a wrong serve
                 else:
                     reward -= 2.0
+                    if soup_state == "done":
+                        self.event_counts[_EV_WRONG_SERVE] += 1
+                    else:
+                        self.event_counts[_EV_NOT_DONE_SERVE] += 1
                     if soup_state in ("start", "burnt"):
                         self.serving_state = f"bowl-{soup_state}"
                     else:
@@ -572,6 +674,10 @@ class CoopEnv:
             if holding is None and item_here is not None:
                 holding = item_here
                 del self.wall_items[key]
+                if item_here in ("onion", "tomato"):
+                    self.event_counts[_AGENT_EVENT_INDEX["ingredient_pickups"][agent]] += 1
+                elif item_here == "bowl":
+                    self.event_counts[_AGENT_EVENT_INDEX["bowl_pickups"][agent]] += 1
 
             elif holding is not None and item_here is None:
 
@@ -604,153 +710,50 @@ class CoopEnv:
         else:
             return None, (tx, ty)
 
+    # Function: Copy of everything step() can change, for seeking in replays.
+    # The layout-derived maps built by reset() are not included, so restore() only
+    # works on an env that has been reset on the same level.
+    def snapshot(self):
+        snap = {name: getattr(self, name) for name in _SNAPSHOT_SCALARS}
+        snap.update(
+            agent1_pos=list(self.agent1_pos),
+            agent2_pos=list(self.agent2_pos),
+            pending_orders=[dict(o) for o in self.pending_orders],
+            active_orders=[dict(o) for o in self.active_orders],
+            completed_orders=[dict(o) for o in self.completed_orders],
+            failed_orders=[dict(o) for o in self.failed_orders],
+            wall_items=dict(self.wall_items),
+            invalid_pot_add_streak=dict(self.invalid_pot_add_streak),
+            event_counts=self.event_counts.copy(),
+        )
+        return snap
+
+    # Function: Put the env back in the state a snapshot() was taken in
+    def restore(self, snap):
+        for name in _SNAPSHOT_SCALARS:
+            setattr(self, name, snap[name])
+        self.agent1_pos = list(snap["agent1_pos"])
+        self.agent2_pos = list(snap["agent2_pos"])
+        self.pending_orders = [dict(o) for o in snap["pending_orders"]]
+        # Lists the env mutates in place are refilled rather than replaced
+        self.active_orders[:] = [dict(o) for o in snap["active_orders"]]
+        self.completed_orders[:] = [dict(o) for o in snap["completed_orders"]]
+        self.failed_orders[:] = [dict(o) for o in snap["failed_orders"]]
+        self.wall_items.clear()
+        self.wall_items.update(snap["wall_items"])
+        self.invalid_pot_add_streak = dict(snap["invalid_pot_add_streak"])
+        self.event_counts[:] = snap["event_counts"]
+
+    # Function: Draw the env onto `screen`. Fonts, order icons and the static tiles are
+    # prepared once by a CoopRenderer, so each frame only draws what can change.
     def render(self, screen):
         if not self.env_render:
             return
-        
-        # Draw header background with score, orders, and feedback text
-        header_rect = (0, 0, self.grid_width * self.tile_size, self.header_size)
-        draw.rect(screen, self.header_bg_color, header_rect)
-
-        font1 = font.SysFont("arial", 24, bold=True)
-        score_text = font1.render(f"Score: {self.score}", True, self.header_text_color)
-        screen.blit(score_text, (10, 13))
-
-        if self.feedback_text:
-            font_feedback = font.SysFont("arial", 20)
-            feedback_surf = font_feedback.render(self.feedback_text, True, self.feedback_color)
-            screen.blit(feedback_surf, (10, 50))
-
-        orders_to_show = [o for o in self.active_orders if not o.get("served")]
-        orders_to_show = sorted(orders_to_show, key=lambda o: o["deadline"])
+        if self._renderer is None:
+            from .renderer import CoopRenderer
+            self._renderer = CoopRenderer(self)
+        self._renderer.render(screen)
 
-        if orders_to_show:
-            font_orders = font.SysFont("arial", 18)
-            start_x = 150
-            y = 10
-            gap = 8
-
-            icon_size = 26
-            icon_gap = 4
-            onion_icon_small = transform.smoothscale(self.item_sprites["onion"], (icon_size, icon_size))
-            tomato_icon_small = transform.smoothscale(self.item_sprites["tomato"], (icon_size, icon_size))
-
-            x = start_x
-
-            for order in orders_to_show[:4]:
-                remaining = max(0, order["deadline"] - self.step_count)
-
-                fill_color = (45, 45, 75)
-                border_color = (110, 110, 170)
-                if remaining < 300:
-                    border_color = (200, 90, 90)
-
-                onions = order.get("onions", 0)
-                tomatoes = order.get("tomatoes", 0)
-                total_icons = onions + tomatoes
-
-                seconds_left = remaining / 60.0
-                time_text = f"{seconds_left:.1f}s"
-                time_surf = font_orders.render(time_text, True, self.header_text_color)
-
-                icons_width = 0
-                if total_icons > 0:
-                    icons_width = total_icons * icon_size + (total_icons - 1) * icon_gap
-
-                card_w = 40 + icons_width + time_surf.get_width() + 20
-                card_h = 32
-
-                rect = Rect(x, y, card_w, card_h)
-                draw.rect(screen, fill_color, rect, border_radius=8)
-                draw.rect(screen, border_color, rect, width=2, border_radius=8)
-
-                icon_y = y + (card_h - icon_size) // 2
-                icon_x = x + 10
-
-                for _ in range(onions):
-                    screen.blit(onion_icon_small, (icon_x, icon_y))
-                    icon_x += icon_size + icon_gap
-
-                for _ in range(tomatoes):
-                    screen.blit(tomato_icon_small, (icon_x, icon_y))
-                    icon_x += icon_size + icon_gap
-
-                time_rect = time_surf.get_rect()
-                time_rect.midright = (x + card_w - 10, y + card_h // 2)
-                screen.blit(time_surf, time_rect)
-
-                x += card_w + gap
-
-        # Draw the grid with tiles, cooking pot (with timer), 
-        # items on counters, serving station state, and agents
-        for y, row in enumerate(self.level):
-            for x, char in enumerate(row):
-                if char == "A" or char == "B":
-                    char = " "
-
-                if char == "P":
-                    pot_sprite = self.pot_sprites[self.pot_state]
-                    screen.blit(pot_sprite, (x * self.tile_size, y * self.tile_size + self.header_size))
-
-                    if self.pot_state != "idle":
-                        font1 = font.SysFont("arial", 16, bold=True)
-
-                        if self.pot_state == "start":
-                            pot_time = font1.render(f"{(COOK_TIME - self.pot_timer) / 60:.1f}", True, (255, 255, 255))
-
-                        elif self.pot_state == "done":
-                            pot_time = font1.render(f"{(BURN_TIME - self.pot_timer) / 60:.1f}", True, (0, 255, 0))
-
-                        else:
-                            if (self.step_count // 10) % 2 == 0:
-                                color = (255, 0, 0)
-                            else:
-                                color = (255, 100, 100)
-                            pot_time = font1.render("!", True, color)
-
-                        pot_rect = pot_time.get_rect(center=(x * self.tile_size + self.tile_size // 2,
-                                                    y * self.tile_size + self.header_size + self.tile_size // 2))
-                        screen.blit(pot_time, pot_rect)
-
-                else:
-                    sprite = self.tile_sprites[char]
-                    screen.blit(sprite, (x * self.tile_size, y * self.tile_size + self.header_size))
-        
-        for (x, y), item_name in self.wall_items.items():
-            if item_name.startswith("bowl-done"):
-                item_name = "bowl-done"
-            elif item_name.startswith("bowl-start"):
-                item_name = "bowl-start"
-            elif item_name.startswith("bowl-burnt"):
-                item_name = "bowl-burnt"
-            sprite = self.item_sprites[item_name]
-            screen.blit(sprite, (x * self.tile_size, y * self.tile_size + self.header_size))
-        
-        if self.serving_state != "idle":
-            sprite = self.item_sprites[self.serving_state]
-            serving_x, serving_y = find_char(self.level, "S")
-            screen.blit(sprite, (serving_x * self.tile_size, serving_y * self.tile_size + self.header_size))
-
-        # Agent 1 sprite selection and rendering
-        dir_name = self._dir_to_name(self.agent1_dir)
-        carry_name = self._carry_to_name(self.agent1_holding)
-        if dir_name == "up" and carry_name != "empty":
-            carry_name = "carry"
-
-        sprite = self.agent1_sprites[(dir_name, carry_name)]
-        screen.blit(sprite, (self.agent1_pos[0] * self.tile_size,
-                            self.agent1_pos[1] * self.tile_size + self.header_size))
-
-        # Agent 2 sprite selection and rendering
-        dir_name = self._dir_to_name(self.agent2_dir)
-        carry_name = self._carry_to_name(self.agent2_holding)
-        if dir_name == "up" and carry_name != "empty":
-            carry_name = "carry"
-            
-        sprite = self.agent2_sprites[(dir_name, carry_name)]
-        screen.blit(sprite, (self.agent2_pos[0] * self.tile_size,
-                            self.agent2_pos[1] * self.tile_size + self.header_size))
-    
     # Function: Convert a direction vector to a string name for sprite selection
     def _dir_to_name(self, direction):
         if direction == (0, -1):
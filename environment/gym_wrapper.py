@@ -1,6 +1,7 @@
 import gymnasium as gym
 import numpy as np
 from .env import CoopEnv, find_char
+from . import profiling
 from .levels import LEVELS
 from gymnasium.utils import seeding
 from collections import deque
@@ -69,9 +70,16 @@ class GymCoopEnv(gym.Env):
 
         raw_obs, reward, done, info = self.env.step(a1, a2)
 
+        prof = profiling.PROFILER
+        if prof is not None:
+            t = prof.clock()
+
         # Convert the raw observation from the CoopEnv into a structured observation
         obs = self._get_obs(raw_obs)
 
+        if prof is not None:
+            prof.lap("wrapper.obs_encoding", t)
+
         truncated = self.env.step_count >= self.env.max_steps
         terminated = done and not truncated
 
@@ -152,6 +160,10 @@ class GymCoopEnv(gym.Env):
         front1 = front_features(agent1_view["self_pos"], agent1_view["self_dir"])
         front2 = front_features(agent1_view["other_pos"], agent1_view["other_dir"])
 
+        prof = profiling.PROFILER
+        if prof is not None:
+            t = prof.clock()
+
         # BFS distances (24 features)
         x1, y1 = agent1_view["self_pos"]
         x2, y2 = agent1_view["other_pos"]
@@ -174,6 +186,10 @@ class GymCoopEnv(gym.Env):
             j1_d, j1_r, j2_d, j2_r,
         ]
 
+        # Counted inside wrapper.obs_encoding as well
+        if prof is not None:
+            prof.lap("wrapper.bfs_lookup", t)
+
         # Pot state
         pot_oh = self._pot_state_onehot()
         pot_contents = [float(self.env.pot_onions), float(self.env.pot_tomatoes)]
@@ -4,6 +4,7 @@ from gymnasium.utils import seeding
 from collections import deque
 
 from .env import CoopEnv, find_char
+from . import profiling
 from .levels import LEVELS
 
 
@@ -23,8 +24,15 @@ class GymCoopEnvRLlibCentralised(gym.Env):
 
         # Seed management for reproducibility across multiple parallel environments
         self.base_seed = config.get("base_seed", None)
-        worker_index = int(config.get("worker_index", 0) or 0)
-        vector_index = config.get("vector_index", None)
+        # RLlib passes an EnvContext, which carries worker_index / vector_index as
+        # attributes rather than keys; plain dicts (tests, eval) use keys
+        worker_index = getattr(config, "worker_index", None)
+        if worker_index is None:
+            worker_index = config.get("worker_index", 0)
+        worker_index = int(worker_index or 0)
+        vector_index = getattr(config, "vector_index", None)
+        if vector_index is None:
+            vector_index = config.get("vector_index", None)
         if vector_index is None:
             vector_index = int(config.get("env_rank", -1))
         if vector_index is None or int(vector_index) < 0:
@@ -87,6 +95,10 @@ class GymCoopEnvRLlibCentralised(gym.Env):
         self.tomato_pos = find_char(self.env.level, "J")
         self.garbage_pos = find_char(self.env.level, "G")
 
+        prof = profiling.PROFILER
+        if prof is not None:
+            t = prof.clock()
+
         # BFS maps
         self._station_dist_maps = {
             "P": self._bfs_dist_map_to_station(self.pot_pos),
@@ -105,6 +117,9 @@ class GymCoopEnvRLlibCentralised(gym.Env):
                 finite_max = max(finite_max, float(finite.max()))
         self._max_bfs_dist = finite_max
 
+        if prof is not None:
+            prof.lap("wrapper.bfs_maps", t)
+
         obs = self._get_obs(raw_obs)
 
         self._frames.clear()
@@ -131,13 +146,25 @@ class GymCoopEnvRLlibCentralised(gym.Env):
 
         raw_obs, reward, done, info = self.env.step(a1, a2)
 
+        prof = profiling.PROFILER
+        if prof is not None:
+            t = prof.clock()
+
         obs = self._get_obs(raw_obs)
+
+        if prof is not None:
+            t = prof.lap("wrapper.obs_encoding", t)
+
         self._frames.append(obs.copy())
+        stacked = self._stack_obs()
+
+        if prof is not None:
+            prof.lap("wrapper.frame_stack", t)
 
         truncated = self.env.step_count >= self.env.max_steps
         terminated = bool(done and not truncated)
 
-        return self._stack_obs(), float(reward), terminated, bool(truncated), info
+        return stacked, float(reward), terminated, bool(truncated), info
 
     # Function: Stack frames into a single observation vector
     def _stack_obs(self):
@@ -222,6 +249,10 @@ class GymCoopEnvRLlibCentralised(gym.Env):
         front1 = front_features(agent1_view["self_pos"], agent1_view["self_dir"])
         front2 = front_features(agent1_view["other_pos"], agent1_view["other_dir"])
 
+        prof = profiling.PROFILER
+        if prof is not None:
+            t = prof.clock()
+
         # BFS distances
         x1, y1 = agent1_view["self_pos"]
         x2, y2 = agent1_view["other_pos"]
@@ -244,6 +275,10 @@ class GymCoopEnvRLlibCentralised(gym.Env):
             j1_d, j1_r, j2_d, j2_r,
         ]
 
+        # Counted inside wrapper.obs_encoding as well
+        if prof is not None:
+            prof.lap("wrapper.bfs_lookup", t)
+
         # Pot state
         pot_oh = self._pot_state_onehot()
         pot_contents = [float(self.env.pot_onions), float(self.env.pot_tomatoes)]
@@ -306,6 +341,22 @@ class GymCoopEnvRLlibCentralised(gym.Env):
 
         return np.array(obs, dtype=np.float32)
 
+    # Function: State of the episode-seed RNG, saved next to training checkpoints so a
+    # resumed run continues the episode sequence instead of replaying it (None before the first reset)
+    def get_rng_state(self):
+        if self._np_random is None:
+            return None
+        return {"bit_generator": self._np_random.bit_generator.state, "seed": self._seed}
+
+    def set_rng_state(self, state):
+        if state is None:
+            self._np_random = None
+            return
+        bit_generator = getattr(np.random, state["bit_generator"]["bit_generator"])()
+        bit_generator.state = state["bit_generator"]
+        self._np_random = np.random.Generator(bit_generator)
+        self._seed = state["seed"]
+
     def render(self):
         pass
     
@@ -6,6 +6,7 @@ from collections import deque
 from ray.rllib.env.multi_agent_env import MultiAgentEnv
 
 from .env import CoopEnv, find_char
+from . import profiling
 from .levels import LEVELS
 
 
@@ -25,8 +26,15 @@ class GymCoopEnvRLlibDecentralisedComms(MultiAgentEnv):
 
         # Seed management for reproducibility across multiple parallel environments
         self.base_seed = config.get("base_seed", None)
-        worker_index = int(config.get("worker_index", 0) or 0)
-        vector_index = config.get("vector_index", None)
+        # RLlib passes an EnvContext, which carries worker_index / vector_index as
+        # attributes rather than keys; plain dicts (tests, eval) use keys
+        worker_index = getattr(config, "worker_index", None)
+        if worker_index is None:
+            worker_index = config.get("worker_index", 0)
+        worker_index = int(worker_index or 0)
+        vector_index = getattr(config, "vector_index", None)
+        if vector_index is None:
+            vector_index = config.get("vector_index", None)
         if vector_index is None:
             vector_index = int(config.get("env_rank", -1))
         if vector_index is None or int(vector_index) < 0:
@@ -100,6 +108,10 @@ class GymCoopEnvRLlibDecentralisedComms(MultiAgentEnv):
         self.tomato_pos = find_char(self.env.level, "J")
         self.garbage_pos = find_char(self.env.level, "G")
 
+        prof = profiling.PROFILER
+        if prof is not None:
+            t = prof.clock()
+
         # BFS maps
         self._station_dist_maps = {
             "P": self._bfs_dist_map_to_station(self.pot_pos),
@@ -118,6 +130,9 @@ class GymCoopEnvRLlibDecentralisedComms(MultiAgentEnv):
                 finite_max = max(finite_max, float(finite.max()))
         self._max_bfs_dist = finite_max
 
+        if prof is not None:
+            prof.lap("wrapper.bfs_maps", t)
+
         obs_1 = self._get_obs(raw_obs, agent_index=0)
         obs_2 = self._get_obs(raw_obs, agent_index=1)
 
@@ -163,9 +178,16 @@ class GymCoopEnvRLlibDecentralisedComms(MultiAgentEnv):
 
         raw_obs, reward, done, info = self.env.step(a1, a2)
 
+        prof = profiling.PROFILER
+        if prof is not None:
+            t = prof.clock()
+
         obs_1 = self._get_obs(raw_obs, agent_index=0)
         obs_2 = self._get_obs(raw_obs, agent_index=1)
 
+        if prof is not None:
+            t = prof.lap("wrapper.obs_encoding", t)
+
         self._frames_1.append(obs_1.copy())
         self._frames_2.append(obs_2.copy())
 
@@ -181,6 +203,9 @@ class GymCoopEnvRLlibDecentralisedComms(MultiAgentEnv):
                 "agent_2": self._stack_obs(self._frames_2),
             }
 
+        if prof is not None:
+            t = prof.lap("wrapper.frame_stack", t)
+
         # Shared team reward for both agents
         rewards = {
             "agent_1": float(reward),
@@ -209,6 +234,9 @@ class GymCoopEnvRLlibDecentralisedComms(MultiAgentEnv):
                 "__common__": info,
             }
 
+        if prof is not None:
+            prof.lap("wrapper.dict_packing", t)
+
         return obs, rewards, terminateds, truncateds, infos
 
     # Function: Parse environment action safely for backward compatibility
@@ -333,6 +361,10 @@ class GymCoopEnvRLlibDecentralisedComms(MultiAgentEnv):
 
         front1 = front_features(agent_view["self_pos"], agent_view["self_dir"])
 
+        prof = profiling.PROFILER
+        if prof is not None:
+            t = prof.clock()
+
         # BFS distances
         x1, y1 = agent_view["self_pos"]
         a1_pos = (x1, y1)
@@ -370,6 +402,10 @@ class GymCoopEnvRLlibDecentralisedComms(MultiAgentEnv):
             *masked_bfs[10:12],
         ]
 
+        # Counted inside wrapper.obs_encoding as well
+        if prof is not None:
+            prof.lap("wrapper.bfs_lookup", t)
+
         # Pot state
         pot_oh = self._pot_state_onehot()
         pot_contents = [float(self.env.pot_onions), float(self.env.pot_tomatoes)]
@@ -417,6 +453,22 @@ class GymCoopEnvRLlibDecentralisedComms(MultiAgentEnv):
 
         return np.array(obs, dtype=np.float32)
 
+    # Function: State of the episode-seed RNG, saved next to training checkpoints so a
+    # resumed run continues the episode sequence instead of replaying it (None before the first reset)
+    def get_rng_state(self):
+        if self._np_random is None:
+            return None
+        return {"bit_generator": self._np_random.bit_generator.state, "seed": self._seed}
+
+    def set_rng_state(self, state):
+        if state is None:
+            self._np_random = None
+            return
+        bit_generator = getattr(np.random, state["bit_generator"]["bit_generator"])()
+        bit_generator.state = state["bit_generator"]
+        self._np_random = np.random.Generator(bit_generator)
+        self._seed = state["seed"]
+
     def render(self):
         pass
 
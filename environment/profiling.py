@@ -0,0 +1,97 @@
+import time
+from contextlib import contextmanager
+
+# Active profiler for this process, None while profiling is off.
+# Instrumented code reads it once per call and skips all timing when it is None,
+# so the disabled cost is one global lookup and a few `is not None` checks per step.
+PROFILER = None
+
+
+# Class: Cumulative wall time and call count per named phase
+class PhaseProfiler:
+    def __init__(self):
+        self.clock = time.perf_counter_ns
+        self.totals = {}
+
+    # Function: Charge the time since `start` to `name` and return the current clock,
+    # so consecutive phases can be timed with one clock read each
+    def lap(self, name, start):
+        now = self.clock()
+        entry = self.totals.get(name)
+        if entry is None:
+            self.totals[name] = [now - start, 1]
+        else:
+            entry[0] += now - start
+            entry[1] += 1
+        return now
+
+    # Function: Time a block as one call of `name`
+    @contextmanager
+    def phase(self, name):
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self.lap(name, start)
+
+    # Function: Add totals from another profiler's snapshot
+    def merge(self, snapshot):
+        for name, stats in snapshot.items():
+            entry = self.totals.setdefault(name, [0, 0])
+            entry[0] += int(round(stats["total_s"] * 1e9))
+            entry[1] += int(stats["calls"])
+
+    # Function: Totals per phase as {name: {total_s, calls, mean_us}}
+    def snapshot(self):
+        return {
+            name: {
+                "total_s": ns / 1e9,
+                "calls": calls,
+                "mean_us": ns / calls / 1e3 if calls else 0.0,
+            }
+            for name, (ns, calls) in sorted(self.totals.items())
+        }
+
+    def reset(self):
+        self.totals = {}
+
+
+# Function: Turn profiling on for this process (keeps an already active profiler)
+def enable(profiler=None):
+    global PROFILER
+    if profiler is not None or PROFILER is None:
+        PROFILER = profiler or PhaseProfiler()
+    return PROFILER
+
+
+# Function: Turn profiling off for this process
+def disable():
+    global PROFILER
+    PROFILER = None
+
+
+# Function: Snapshot of the active profiler ({} when off); with reset=True the
+# totals restart, so repeated calls return the time since the previous call
+def drain(reset=True):
+    if PROFILER is None:
+        return {}
+    snap = PROFILER.snapshot()
+    if reset:
+        PROFILER.reset()
+    return snap
+
+
+# Function: Profile everything inside the block, restoring the previous state after.
+#   with profiling.profiled() as prof:
+#       run_episode(...)
+#   print(prof.snapshot())
+@contextmanager
+def profiled(profiler=None):
+    global PROFILER
+    previous = PROFILER
+    PROFILER = profiler or PhaseProfiler()
+    try:
+        yield PROFILER
+    finally:
+        PROFILER = previous
+
@@ -0,0 +1,192 @@
+from pygame import Rect, Surface, display, draw, font, register_quit, transform
+
+from .env import COOK_TIME, BURN_TIME
+
+# Draws a CoopEnv onto a pygame surface. Everything that does not change during an episode
+# is prepared once: the fonts, the scaled order icons, the serving station position and a
+# background surface holding the header bar and every static tile. Each frame then blits
+# the background and draws only the dynamic layers (header text, order cards, pot, counter
+# items, serving station, agents), in the same order CoopEnv.render always used, so frames
+# come out pixel for pixel the same.
+#
+# CoopEnv.render creates one on first use; it needs the sprites a render=True env loads.
+
+# Size of the onion/tomato icons on the order cards
+ORDER_ICON_SIZE = 26
+ORDER_ICON_GAP = 4
+
+# Rendered text kept per renderer; timers and scores repeat, so the cache stays small
+_TEXT_CACHE_SIZE = 512
+
+# (name, size, bold) of the fonts used on screen
+SCORE_FONT = ("arial", 24, True)
+FEEDBACK_FONT = ("arial", 20, False)
+ORDER_FONT = ("arial", 18, False)
+POT_FONT = ("arial", 16, True)
+
+# Fonts are shared by every renderer in the process. pygame.quit() frees them, so the
+# cache is emptied then; renderers only keep font specs and look fonts up through it.
+_FONTS = {}
+
+
+# Function: Cached font.SysFont (building a SysFont is far slower than rendering with it)
+def get_font(name, size, bold=False):
+    key = (name, size, bold)
+    if key not in _FONTS:
+        if not _FONTS:
+            # pygame forgets quit callbacks once they have run, so register on every refill
+            register_quit(_FONTS.clear)
+        _FONTS[key] = font.SysFont(name, size, bold=bold)
+    return _FONTS[key]
+
+
+# Class: Cached renderer for one CoopEnv
+class CoopRenderer:
+    def __init__(self, env):
+        self.env = env
+        tile = env.tile_size
+        self.width = env.grid_width * tile
+        self.height = env.grid_height * tile + env.header_size
+
+        self._text = {}
+
+        self.order_icons = {
+            name: transform.smoothscale(env.item_sprites[name], (ORDER_ICON_SIZE, ORDER_ICON_SIZE))
+            for name in ("onion", "tomato")
+        }
+
+        # Tiles that change during an episode: the pot is drawn per frame, the rest is background
+        self.pot_tiles = []
+        self.serve_pos = None
+        self.background = self._build_background()
+
+    def _build_background(self):
+        env = self.env
+        tile = env.tile_size
+        background = Surface((self.width, self.height))
+        if display.get_surface() is not None:
+            background = background.convert()
+
+        draw.rect(background, env.header_bg_color, (0, 0, self.width, env.header_size))
+        for y, row in enumerate(env.level):
+            for x, char in enumerate(row):
+                if char == "A" or char == "B":
+                    char = " "
+                if char == "P":
+                    self.pot_tiles.append((x, y))
+                    continue
+                if char == "S" and self.serve_pos is None:
+                    self.serve_pos = (x, y)
+                background.blit(env.tile_sprites[char], (x * tile, y * tile + env.header_size))
+        return background
+
+    # Function: Rendered text surface, cached by font spec, text and colour
+    def text(self, font_spec, text, color):
+        key = (font_spec, text, color)
+        surf = self._text.get(key)
+        if surf is None:
+            if len(self._text) >= _TEXT_CACHE_SIZE:
+                self._text.clear()
+            surf = get_font(*font_spec).render(text, True, color)
+            self._text[key] = surf
+        return surf
+
+    def render(self, screen):
+        env = self.env
+        tile = env.tile_size
+        header = env.header_size
+
+        # Header bar, then its text and order cards, then the static tiles. Anything in the
+        # header layers that spills past the header is covered by the tiles, as it always was.
+        screen.blit(self.background, (0, 0), (0, 0, self.width, header))
+
+        screen.blit(self.text(SCORE_FONT, f"Score: {env.score}", env.header_text_color), (10, 13))
+        if env.feedback_text:
+            screen.blit(self.text(FEEDBACK_FONT, env.feedback_text, env.feedback_color), (10, 50))
+
+        self._render_orders(screen)
+
+        screen.blit(self.background, (0, header), (0, header, self.width, self.height - header))
+
+        # Pot with its cooking / burning timer
+        for x, y in self.pot_tiles:
+            screen.blit(env.pot_sprites[env.pot_state], (x * tile, y * tile + header))
+            if env.pot_state == "idle":
+                continue
+            if env.pot_state == "start":
+                pot_time = self.text(POT_FONT, f"{(COOK_TIME - env.pot_timer) / 60:.1f}", (255, 255, 255))
+            elif env.pot_state == "done":
+                pot_time = self.text(POT_FONT, f"{(BURN_TIME - env.pot_timer) / 60:.1f}", (0, 255, 0))
+            else:
+                color = (255, 0, 0) if (env.step_count // 10) % 2 == 0 else (255, 100, 100)
+                pot_time = self.text(POT_FONT, "!", color)
+            pot_rect = pot_time.get_rect(center=(x * tile + tile // 2, y * tile + header + tile // 2))
+            screen.blit(pot_time, pot_rect)
+
+        # Items on counters
+        for (x, y), item_name in env.wall_items.items():
+            if item_name.startswith("bowl-done"):
+                item_name = "bowl-done"
+            elif item_name.startswith("bowl-start"):
+                item_name = "bowl-start"
+            elif item_name.startswith("bowl-burnt"):
+                item_name = "bowl-burnt"
+            screen.blit(env.item_sprites[item_name], (x * tile, y * tile + header))
+
+        if env.serving_state != "idle" and self.serve_pos is not None:
+            serving_x, serving_y = self.serve_pos
+            screen.blit(env.item_sprites[env.serving_state], (serving_x * tile, serving_y * tile + header))
+
+        # Agents
+        for sprites, pos, direction, holding in (
+            (env.agent1_sprites, env.agent1_pos, env.agent1_dir, env.agent1_holding),
+            (env.agent2_sprites, env.agent2_pos, env.agent2_dir, env.agent2_holding),
+        ):
+            dir_name = env._dir_to_name(direction)
+            carry_name = env._carry_to_name(holding)
+            if dir_name == "up" and carry_name != "empty":
+                carry_name = "carry"
+            screen.blit(sprites[(dir_name, carry_name)], (pos[0] * tile, pos[1] * tile + header))
+
+    # Function: Cards for the unserved active orders, soonest deadline first
+    def _render_orders(self, screen):
+        env = self.env
+        orders_to_show = sorted((o for o in env.active_orders if not o.get("served")), key=lambda o: o["deadline"])
+
+        x = 150
+        y = 10
+        gap = 8
+        card_h = 32
+        for order in orders_to_show[:4]:
+            remaining = max(0, order["deadline"] - env.step_count)
+
+            fill_color = (45, 45, 75)
+            border_color = (200, 90, 90) if remaining < 300 else (110, 110, 170)
+
+            onions = order.get("onions", 0)
+            tomatoes = order.get("tomatoes", 0)
+            total_icons = onions + tomatoes
+
+            time_surf = self.text(ORDER_FONT, f"{remaining / 60.0:.1f}s", env.header_text_color)
+
+            icons_width = 0
+            if total_icons > 0:
+                icons_width = total_icons * ORDER_ICON_SIZE + (total_icons - 1) * ORDER_ICON_GAP
+
+            card_w = 40 + icons_width + time_surf.get_width() + 20
+            rect = Rect(x, y, card_w, card_h)
+            draw.rect(screen, fill_color, rect, border_radius=8)
+            draw.rect(screen, border_color, rect, width=2, border_radius=8)
+
+            icon_y = y + (card_h - ORDER_ICON_SIZE) // 2
+            icon_x = x + 10
+            for name, count in (("onion", onions), ("tomato", tomatoes)):
+                for _ in range(count):
+                    screen.blit(self.order_icons[name], (icon_x, icon_y))
+                    icon_x += ORDER_ICON_SIZE + ORDER_ICON_GAP
+
+            time_rect = time_surf.get_rect()
+            time_rect.midright = (x + card_w - 10, y + card_h // 2)
+            screen.blit(time_surf, time_rect)
+
+            x += card_w + gap
@@ -0,0 +1,120 @@
+import numpy as np
+
+from .env import CoopEnv, EVENT_NAMES
+from .levels import LEVELS
+from .rollouts import env_state, STATE_INDEX
+
+# Events read from the state column rather than the event counters
+STATE_EVENTS = {"orders_served": "score", "orders_failed": "failed_orders"}
+
+# Mistakes worth jumping between when inspecting a bad episode
+MISTAKE_EVENTS = (
+    "wrong_serve_attempts", "not_done_serve_attempts", "wrong_done_soup_pickups",
+    "burnt_soup_pickups", "wrong_pot_adds", "orders_failed",
+)
+
+
+# Class: Replays an episode from its CoopEnv seed and recorded joint actions, with no policy
+# and no wrapper, so it runs at raw CoopEnv speed. Snapshots of the env are kept every
+# `snapshot_every` steps as the replay advances: seek(t) restores the nearest one at or
+# before t and steps forward from there, so with snapshot_every=1 every seek to a step
+# already reached is O(1).
+#
+#   replay = EpisodeReplay.from_rollout(RolloutReader(path).episode(seed=10042))
+#   env = replay.seek(412)       # the CoopEnv right after step 412
+#   replay.seek(0)               # straight after reset
+class EpisodeReplay:
+    def __init__(self, level_name, env_seed, actions, snapshot_every=50, render=False):
+        self.level_name = level_name
+        self.env_seed = int(env_seed)
+        self.actions = np.asarray(actions, dtype=np.int64).reshape(-1, 2)
+        self.snapshot_every = max(1, int(snapshot_every))
+
+        self.env = CoopEnv(LEVELS[level_name], render=render)
+        self.env.reset(seed=self.env_seed)
+
+        # Step reached (0: after reset), and each step's reward once it has been replayed
+        self.t = 0
+        self.done = False
+        self.rewards = np.zeros(len(self.actions), dtype=np.float64)
+        self._snapshots = {0: (self.env.snapshot(), False)}
+
+    # Function: Replay of an episode read back with RolloutReader
+    @classmethod
+    def from_rollout(cls, episode, **kwargs):
+        row = episode["index"]
+        if row["env_seed"] is None or not row["level"]:
+            raise ValueError(f"Episode {row['episode']} has no CoopEnv seed or level to replay from")
+        return cls(row["level"], row["env_seed"], episode["actions"], **kwargs)
+
+    def __len__(self):
+        return len(self.actions)
+
+    # Function: Play the next recorded action, returning CoopEnv's (reward, done, info)
+    def step(self):
+        if self.t >= len(self.actions):
+            raise IndexError(f"Replay is already at its last step ({len(self.actions)})")
+        a1, a2 = self.actions[self.t]
+        _, reward, done, info = self.env.step(int(a1), int(a2))
+        self.rewards[self.t] = reward
+        self.t += 1
+        self.done = bool(done)
+        if self.t % self.snapshot_every == 0 and self.t not in self._snapshots:
+            self._snapshots[self.t] = (self.env.snapshot(), self.done)
+        return reward, done, info
+
+    # Function: Move to step t (0 is straight after reset, len(self) after the last action)
+    # and return the env
+    def seek(self, t):
+        t = int(t)
+        if not 0 <= t <= len(self.actions):
+            raise IndexError(f"Step {t} is outside the replay (0..{len(self.actions)})")
+
+        base = max(k for k in self._snapshots if k <= t)
+        if t < self.t or base > self.t:
+            snap, done = self._snapshots[base]
+            self.env.restore(snap)
+            self.t = base
+            self.done = done
+
+        while self.t < t:
+            self.step()
+        return self.env
+
+    # Function: Replay every remaining action
+    def run(self):
+        return self.seek(len(self.actions))
+
+    # Function: Compact state of the env at the current step (see environment/rollouts.py)
+    def state(self):
+        return env_state(self.env)
+
+
+# Function: First step at which replaying an exported episode disagrees with what was
+# recorded (state or reward), or None when the whole episode reproduces
+def first_divergence(episode, snapshot_every=50):
+    replay = EpisodeReplay.from_rollout(episode, snapshot_every=snapshot_every)
+    for t in range(len(replay)):
+        reward, _, _ = replay.step()
+        if not np.array_equal(replay.state(), episode["state"][t]):
+            return t
+        if not np.isclose(reward, episode["rewards"][t], atol=1e-5):
+            return t
+    return None
+
+
+# Function: Steps at which each event happened in an exported episode, as replay positions
+# (seek(t) shows the env right after the event). Names are EVENT_NAMES plus STATE_EVENTS.
+def event_steps(episode, names=None):
+    names = list(EVENT_NAMES) + list(STATE_EVENTS) if names is None else names
+    steps = {}
+    for name in names:
+        if name in STATE_EVENTS:
+            counts = episode["state"][:, STATE_INDEX[STATE_EVENTS[name]]]
+        elif name in EVENT_NAMES:
+            counts = episode["events"][:, EVENT_NAMES.index(name)]
+        else:
+            raise ValueError(f"Unknown event {name!r}, expected one of {list(EVENT_NAMES) + list(STATE_EVENTS)}")
+        increased = np.diff(counts.astype(np.int64), prepend=0) > 0
+        steps[name] = np.flatnonzero(increased) + 1
+    return steps
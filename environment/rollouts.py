@@ -0,0 +1,356 @@
+import os
+import csv
+import json
+import atexit
+
+import numpy as np
+
+from .env import EVENT_NAMES
+
+# Rollout export: per-step trajectories of training or evaluation episodes, written as
+# chunked, compressed columnar files so they can be analysed or replayed without the policy.
+#
+# A rollout directory holds:
+#   chunk_000000.npz, ...  one compressed .npz per chunk, one array per column, episodes back to back
+#   index.csv              one row per episode: its seed, the CoopEnv seed, chunk, offset and outcome
+#   meta.json              column layout and the codes used by the state column
+#
+# Columns (T steps per episode, P observed agents, F features per frame):
+#   obs      (T, P, F) float32  newest observation frame each agent acted on (frame stacks are not repeated)
+#   actions  (T, 2)    int8     joint action (a1, a2)
+#   rewards  (T,)      float32  team reward
+#   dones    (T,)      bool     episode ended on this step
+#   state    (T, S)    int16    compact CoopEnv state after the step, see STATE_FIELDS
+#   events   (T, E)    int16    CoopEnv.event_counts after the step (cumulative, see EVENT_NAMES)
+#
+# Episodes are buffered in memory only until a chunk is full, so exporting thousands of
+# episodes keeps memory bounded. Episodes still buffered when a run is killed are lost.
+
+COLUMNS = ("obs", "actions", "rewards", "dones", "state", "events")
+
+# Items an agent can hold, coded by their position here (-1 for anything else)
+ITEM_NAMES = (None, "onion", "tomato", "bowl") + tuple(
+    f"bowl-{soup_state}-{recipe}"
+    for soup_state in ("done", "burnt")
+    for recipe in ("onion-soup", "tomato-soup", "onion-tomato-soup", "invalid")
+)
+ITEM_CODES = {name: i for i, name in enumerate(ITEM_NAMES)}
+
+POT_STATES = ("idle", "start", "done", "burnt")
+POT_STATE_CODES = {name: i for i, name in enumerate(POT_STATES)}
+
+# Columns of the state array
+STATE_FIELDS = (
+    "step_count", "score",
+    "agent1_x", "agent1_y", "agent1_dx", "agent1_dy", "agent1_item",
+    "agent2_x", "agent2_y", "agent2_dx", "agent2_dy", "agent2_item",
+    "pot_state", "pot_timer", "pot_onions", "pot_tomatoes",
+    "pending_orders", "active_orders", "completed_orders", "failed_orders", "counter_items",
+)
+STATE_INDEX = {name: i for i, name in enumerate(STATE_FIELDS)}
+
+# Columns of index.csv
+INDEX_FIELDS = (
+    "episode", "seed", "env_seed", "level", "chunk", "start", "length",
+    "total_reward", "score", "failed_orders", "terminated",
+)
+
+
+# Function: Compact numeric snapshot of a CoopEnv, one int16 per STATE_FIELDS entry
+def env_state(env):
+    return np.array([
+        env.step_count, env.score,
+        env.agent1_pos[0], env.agent1_pos[1], env.agent1_dir[0], env.agent1_dir[1],
+        ITEM_CODES.get(env.agent1_holding, -1),
+        env.agent2_pos[0], env.agent2_pos[1], env.agent2_dir[0], env.agent2_dir[1],
+        ITEM_CODES.get(env.agent2_holding, -1),
+        POT_STATE_CODES.get(env.pot_state, -1), env.pot_timer, env.pot_onions, env.pot_tomatoes,
+        len(env.pending_orders), len(env.active_orders), len(env.completed_orders), len(env.failed_orders),
+        len(env.wall_items),
+    ], dtype=np.int16)
+
+
+# Function: Per-agent observation frames from what a wrapper returned: a dict keyed by
+# agent (multi-agent wrappers) or one joint vector. Only the newest of `stack_n` frames is kept.
+def obs_frames(obs, stack_n=1):
+    views = [obs["agent_1"], obs["agent_2"]] if isinstance(obs, dict) else [obs]
+    frames = []
+    for view in views:
+        view = np.asarray(view, dtype=np.float32).ravel()
+        frames.append(view[len(view) - len(view) // max(1, stack_n):])
+    return np.stack(frames)
+
+
+# Function: Rebuild stacked observations (T, P, F * stack_n) from exported frames, padding
+# the start of the episode with zero frames like the RLlib wrappers do
+def stack_frames(frames, stack_n):
+    frames = np.asarray(frames)
+    padded = np.concatenate([np.zeros((stack_n - 1,) + frames.shape[1:], dtype=frames.dtype), frames])
+    return np.concatenate([padded[i:i + len(frames)] for i in range(stack_n)], axis=-1)
+
+
+# Class: Collects the steps of one episode in memory
+class EpisodeRecorder:
+    def __init__(self, stack_n=1):
+        self.stack_n = stack_n
+        self.clear()
+
+    def clear(self):
+        self.steps = {key: [] for key in COLUMNS}
+
+    def __len__(self):
+        return len(self.steps["rewards"])
+
+    # Function: Record one step: the observation acted on, the joint action, and the
+    # outcome read from the CoopEnv after the step
+    def add(self, obs, a1, a2, reward, done, env):
+        self.steps["obs"].append(obs_frames(obs, self.stack_n))
+        self.steps["actions"].append((a1, a2))
+        self.steps["rewards"].append(reward)
+        self.steps["dones"].append(done)
+        self.steps["state"].append(env_state(env))
+        self.steps["events"].append(env.event_counts.astype(np.int16))
+
+    # Function: The episode as column arrays
+    def arrays(self):
+        return {
+            "obs": np.stack(self.steps["obs"]).astype(np.float32),
+            "actions": np.asarray(self.steps["actions"], dtype=np.int8).reshape(-1, 2),
+            "rewards": np.asarray(self.steps["rewards"], dtype=np.float32),
+            "dones": np.asarray(self.steps["dones"], dtype=bool),
+            "state": np.stack(self.steps["state"]),
+            "events": np.stack(self.steps["events"]),
+        }
+
+
+# Class: Streams episodes into a rollout directory, `chunk_episodes` episodes per .npz file.
+# Chunk files are written under a temporary name and renamed, and an episode only enters
+# index.csv once its chunk is on disk. Opening an existing directory appends to it.
+#
+#   with RolloutWriter("rollouts/ppo_decentralised_level_3", level="level_3") as rollouts:
+#       rollouts.write_episode(recorder.arrays(), seed=7, env_seed=raw_env._seed, terminated=True)
+class RolloutWriter:
+    def __init__(self, out_dir, chunk_episodes=16, level=None, stack_n=None):
+        self.out_dir = out_dir
+        self.chunk_episodes = max(1, int(chunk_episodes))
+        self.level = level
+        self.stack_n = stack_n
+        self.n_episodes = 0
+        self._next_chunk = 0
+        self._pending = []
+        self._meta_written = False
+
+        os.makedirs(out_dir, exist_ok=True)
+        index_path = os.path.join(out_dir, "index.csv")
+        if os.path.exists(index_path):
+            # Drop a half-written final row before appending after it
+            with open(index_path, "rb+") as f:
+                data = f.read()
+                if data and not data.endswith(b"\n"):
+                    f.seek(data.rfind(b"\n") + 1)
+                    f.truncate()
+            for row in read_index(out_dir):
+                self.n_episodes = max(self.n_episodes, row["episode"] + 1)
+                self._next_chunk = max(self._next_chunk, row["chunk"] + 1)
+            self._meta_written = os.path.exists(os.path.join(out_dir, "meta.json"))
+            self._index_file = open(index_path, "a", newline="")
+            self._index = csv.DictWriter(self._index_file, fieldnames=INDEX_FIELDS)
+        else:
+            self._index_file = open(index_path, "w", newline="")
+            self._index = csv.DictWriter(self._index_file, fieldnames=INDEX_FIELDS)
+            self._index.writeheader()
+
+    # Function: Queue one finished episode, writing a chunk once enough are queued
+    def write_episode(self, arrays, seed, env_seed=None, level=None, terminated=None):
+        if len(arrays["rewards"]) == 0:
+            return
+        state = arrays["state"][-1]
+        row = {
+            "seed": int(seed),
+            "env_seed": int(env_seed) if env_seed is not None else "",
+            "level": level or self.level or "",
+            "length": int(len(arrays["rewards"])),
+            "total_reward": float(arrays["rewards"].sum(dtype=np.float64)),
+            "score": int(state[STATE_INDEX["score"]]),
+            "failed_orders": int(state[STATE_INDEX["failed_orders"]]),
+            "terminated": bool(terminated) if terminated is not None else "",
+        }
+        self._pending.append((row, arrays))
+        if len(self._pending) >= self.chunk_episodes:
+            self.flush()
+
+    # Function: Write the queued episodes as one chunk and add them to the index
+    def flush(self):
+        if not self._pending:
+            return
+        rows, episodes = zip(*self._pending)
+        self._pending = []
+
+        chunk = self._next_chunk
+        self._next_chunk += 1
+        columns = {key: np.concatenate([ep[key] for ep in episodes]) for key in COLUMNS}
+        if not self._meta_written:
+            self._write_meta(columns)
+
+        path = os.path.join(self.out_dir, f"chunk_{chunk:06d}.npz")
+        with open(path + ".tmp", "wb") as f:
+            np.savez_compressed(f, **columns)
+        os.replace(path + ".tmp", path)
+
+        start = 0
+        for row in rows:
+            self._index.writerow(dict(row, episode=self.n_episodes, chunk=chunk, start=start))
+            start += row["length"]
+            self.n_episodes += 1
+        self._index_file.flush()
+        os.fsync(self._index_file.fileno())
+
+    def _write_meta(self, columns):
+        meta = {
+            "columns": {key: {"dtype": str(value.dtype), "shape": ["T"] + list(value.shape[1:])} for key, value in columns.items()},
+            "stack_n": self.stack_n,
+            "state_fields": list(STATE_FIELDS),
+            "event_names": list(EVENT_NAMES),
+            "item_names": list(ITEM_NAMES),
+            "pot_states": list(POT_STATES),
+        }
+        with open(os.path.join(self.out_dir, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+        self._meta_written = True
+
+    # Function: Write whatever is still queued and close the index
+    def close(self):
+        if self._index_file.closed:
+            return
+        self.flush()
+        self._index_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+# Function: Rows of a rollout directory's index.csv, with numbers parsed
+def read_index(out_dir):
+    rows = []
+    with open(os.path.join(out_dir, "index.csv"), newline="") as f:
+        for row in csv.DictReader(f):
+            # Skip a half-written final row left by a killed run
+            if None in row.values():
+                continue
+            for key in ("episode", "seed", "chunk", "start", "length", "score", "failed_orders"):
+                row[key] = int(row[key])
+            row["env_seed"] = int(row["env_seed"]) if row["env_seed"] else None
+            row["total_reward"] = float(row["total_reward"])
+            row["terminated"] = {"True": True, "False": False}.get(row["terminated"])
+            rows.append(row)
+    return rows
+
+
+# Class: Reads episodes back from a rollout directory, by seed or in index order.
+# The most recently used chunk stays loaded, so reading episodes in order
+# decompresses each chunk once.
+#
+#   rollouts = RolloutReader("rollouts/ppo_decentralised_level_3")
+#   episode = rollouts.episode(seed=7)    # {"obs": ..., "actions": ..., ..., "index": row}
+class RolloutReader:
+    def __init__(self, out_dir):
+        self.out_dir = out_dir
+        self.index = read_index(out_dir)
+        meta_path = os.path.join(out_dir, "meta.json")
+        self.meta = {}
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                self.meta = json.load(f)
+        # Latest episode for each seed
+        self._by_seed = {row["seed"]: row for row in self.index}
+        self._chunk = (None, None)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __iter__(self):
+        for row in self.index:
+            yield self._load(row)
+
+    @property
+    def seeds(self):
+        return [row["seed"] for row in self.index]
+
+    # Function: Columns of the episode started from `seed`, plus its index row
+    def episode(self, seed):
+        if seed not in self._by_seed:
+            raise KeyError(f"No episode with seed {seed} in {self.out_dir}")
+        return self._load(self._by_seed[seed])
+
+    def _load(self, row):
+        chunk_id, columns = self._chunk
+        if chunk_id != row["chunk"]:
+            with np.load(os.path.join(self.out_dir, f"chunk_{row['chunk']:06d}.npz")) as data:
+                columns = {key: data[key] for key in data.files}
+            self._chunk = (row["chunk"], columns)
+        rows = slice(row["start"], row["start"] + row["length"])
+        episode = {key: value[rows] for key, value in columns.items()}
+        episode["index"] = row
+        return episode
+
+
+# Function: Start exporting an RLlib wrapper's episodes if its env config asks for it
+# (env_config["rollouts"] = {"out_dir", "every", "chunk_episodes"}). Each env writes to
+# its own out_dir/runner_<worker_index>_env_<vector_index>/ directory.
+def record_from_config(env, env_config):
+    rollouts = env_config.get("rollouts")
+    if not rollouts or not rollouts.get("out_dir"):
+        return None
+    out_dir = os.path.join(rollouts["out_dir"], f"runner_{env.worker_index}_env_{env.vector_index}")
+    return record_env(env, out_dir, rollouts.get("every", 1), rollouts.get("chunk_episodes", 16))
+
+
+# Function: Export every `every`-th episode an RLlib wrapper plays to `out_dir`.
+# The wrapper's reset/step/close are wrapped on this instance only, so training code
+# and RLlib see the same env object; used by training when the spec sets rollouts.out_dir.
+def record_env(env, out_dir, every=1, chunk_episodes=16):
+    multi_agent = hasattr(env, "single_action_space")
+    raw_env = env.env
+    writer = RolloutWriter(out_dir, chunk_episodes=chunk_episodes, level=env.level_name, stack_n=env.stack_n)
+    recorder = EpisodeRecorder(stack_n=env.stack_n)
+    every = max(1, int(every))
+    reset, step, close = env.reset, env.step, env.close
+    episode = {"count": 0, "obs": None, "recording": False}
+
+    def recording_reset(*args, **kwargs):
+        obs, info = reset(*args, **kwargs)
+        recorder.clear()
+        episode["recording"] = episode["count"] % every == 0
+        episode["count"] += 1
+        episode["obs"] = obs
+        return obs, info
+
+    def recording_step(action):
+        result = step(action)
+        if episode["recording"]:
+            obs, reward, terminated, truncated = result[:4]
+            if multi_agent:
+                a1, a2 = int(action.get("agent_1", 0)), int(action.get("agent_2", 0))
+                reward, terminated, truncated = reward["agent_1"], terminated["__all__"], truncated["__all__"]
+            else:
+                a1, a2 = int(action[0]), int(action[1])
+            recorder.add(episode["obs"], a1, a2, reward, bool(terminated or truncated), raw_env)
+            episode["obs"] = obs
+            if terminated or truncated:
+                writer.write_episode(recorder.arrays(), seed=raw_env._seed, env_seed=raw_env._seed, terminated=terminated)
+                recorder.clear()
+                episode["recording"] = False
+        return result
+
+    def recording_close():
+        writer.close()
+        return close()
+
+    env.reset, env.step, env.close = recording_reset, recording_step, recording_close
+    # RLlib does not always close its envs, so flush the last chunk when the process exits
+    atexit.register(writer.close)
+    return writer
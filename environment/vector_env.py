@@ -0,0 +1,123 @@
+import numpy as np
+
+from .rollouts import record_from_config
+
+
+# Class: `num_envs` copies of one RLlib wrapper stepped in lockstep in this process, with
+# automatic resets. Env i gets the config RLlib's local env runner would give it
+# (worker_index 0, vector_index i), so base_seed yields the same episode seeds as
+# training with RLlib and no remote env runners.
+#
+# Observations are (num_envs, num_policies, obs_dim): one joint view for the centralised
+# wrapper, one view per agent for the multi-agent wrappers. Actions are (num_envs, 2),
+# the joint action (a1, a2) whatever the wrapper.
+#
+#   venv = CoopVectorEnv(GymCoopEnvRLlibCentralised, "level_1", num_envs=8, base_seed=12345)
+#   obs = venv.reset()
+#   obs, rewards, terminated, truncated, final_obs = venv.step(actions)
+#
+# When an episode ends, obs holds the first observation of the next episode and final_obs
+# the last observation of the one that ended (for bootstrapping values at the time limit).
+# `rollouts` turns on rollout export per env, as the "rollouts" key of an RLlib env config does.
+class CoopVectorEnv:
+    def __init__(self, wrapper_cls, level_name, num_envs, base_seed=None, stack_n=4, rollouts=None):
+        self.num_envs = int(num_envs)
+        self.envs = []
+        for i in range(self.num_envs):
+            env_config = {
+                "level_name": level_name,
+                "stack_n": stack_n,
+                "render": False,
+                "base_seed": base_seed,
+                "seed_envs_per_runner": self.num_envs,
+                "worker_index": 0,
+                "vector_index": i,
+                "rollouts": rollouts,
+            }
+            env = wrapper_cls(env_config)
+            record_from_config(env, env_config)
+            self.envs.append(env)
+
+        first = self.envs[0]
+        self.multi_agent = hasattr(first, "single_action_space")
+        if self.multi_agent:
+            self.agent_ids = ("agent_1", "agent_2")
+            self.observation_space = first.single_observation_space
+            self.action_space = first.single_action_space
+        else:
+            self.agent_ids = ("joint",)
+            self.observation_space = first.observation_space
+            self.action_space = first.action_space
+        self.num_policies = len(self.agent_ids)
+        self.obs_dim = int(np.prod(self.observation_space.shape))
+
+        self._obs = np.zeros((self.num_envs, self.num_policies, self.obs_dim), dtype=np.float32)
+        self._episode_return = np.zeros(self.num_envs, dtype=np.float64)
+        self._episode_len = np.zeros(self.num_envs, dtype=np.int64)
+        # Episodes finished since the last pop_episodes(): {return, length, score, failed_orders}
+        self.finished = []
+
+    def reset(self):
+        for i, env in enumerate(self.envs):
+            obs, _ = env.reset()
+            self._write_obs(self._obs[i], obs)
+        self._episode_return[:] = 0.0
+        self._episode_len[:] = 0
+        return self._obs.copy()
+
+    def step(self, actions):
+        actions = np.asarray(actions)
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        terminated = np.zeros(self.num_envs, dtype=bool)
+        truncated = np.zeros(self.num_envs, dtype=bool)
+        final_obs = {}
+
+        for i, env in enumerate(self.envs):
+            a1, a2 = int(actions[i, 0]), int(actions[i, 1])
+            if self.multi_agent:
+                obs, reward, term, trunc, _ = env.step({"agent_1": a1, "agent_2": a2})
+                # Shared team reward is duplicated for both agents, so only count one copy
+                reward, term, trunc = reward["agent_1"], term["__all__"], trunc["__all__"]
+            else:
+                obs, reward, term, trunc, _ = env.step(np.array([a1, a2], dtype=np.int64))
+
+            rewards[i] = reward
+            terminated[i] = term
+            truncated[i] = trunc
+            self._episode_return[i] += reward
+            self._episode_len[i] += 1
+
+            if term or trunc:
+                last = np.zeros((self.num_policies, self.obs_dim), dtype=np.float32)
+                self._write_obs(last, self._last_frames(env) if self.multi_agent and not obs else obs)
+                final_obs[i] = last
+                self.finished.append({
+                    "return": float(self._episode_return[i]),
+                    "length": int(self._episode_len[i]),
+                    "score": int(env.env.score),
+                    "failed_orders": len(env.env.failed_orders),
+                })
+                self._episode_return[i] = 0.0
+                self._episode_len[i] = 0
+                obs, _ = env.reset()
+
+            self._write_obs(self._obs[i], obs)
+
+        return self._obs.copy(), rewards, terminated, truncated, final_obs
+
+    # Function: Episodes finished since the previous call
+    def pop_episodes(self):
+        finished, self.finished = self.finished, []
+        return finished
+
+    def _write_obs(self, out, obs):
+        if self.multi_agent:
+            for p, agent_id in enumerate(self.agent_ids):
+                out[p] = obs[agent_id]
+        else:
+            out[0] = obs
+
+    # Function: Stacked observations at the end of a multi-agent episode, which the
+    # wrappers do not return (RLlib expects no observations once every agent is done)
+    def _last_frames(self, env):
+        return {"agent_1": env._stack_obs(env._frames_1), "agent_2": env._stack_obs(env._frames_2)}
@@ -0,0 +1,12 @@
+from .results_writer import StreamingResultWriter, EVENT_KEYS, SB3_EVENT_KEYS, DIAGNOSTIC_KEYS
+from .adaptive import AdaptiveStopper, run_seed_batches
+from .controllers import SB3JointController, RLlibCentralisedController, RLlibPerAgentController, load_controller
+from .engine import run_episode, evaluate_level, eval_main
+from .video import select_episodes, render_episode_video, record_videos
+
+__all__ = [
+    "StreamingResultWriter", "EVENT_KEYS", "SB3_EVENT_KEYS", "DIAGNOSTIC_KEYS", "AdaptiveStopper", "run_seed_batches",
+    "SB3JointController", "RLlibCentralisedController", "RLlibPerAgentController", "load_controller",
+    "run_episode", "evaluate_level", "eval_main",
+    "select_episodes", "render_episode_video", "record_videos",
+]
@@ -0,0 +1,185 @@
+import os
+import csv
+import json
+import math
+from statistics import NormalDist
+
+
+# Function: Two-sided normal quantile for a confidence level, e.g. 0.95 -> 1.96
+def z_for_confidence(confidence):
+    return NormalDist().inv_cdf(0.5 + confidence / 2.0)
+
+
+# Function: Wilson score interval for a rate such as perfect_rate
+def wilson_interval(successes, n, z):
+    if n == 0:
+        return 0.0, 1.0
+    p = successes / n
+    denom = 1.0 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1.0 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+# Function: Normal-approximation interval for a mean from running sums
+def mean_interval(total, sq_total, n, z, lo=0.0, hi=3.0):
+    if n < 2:
+        return lo, hi
+    mean = total / n
+    var = max(0.0, (sq_total - n * mean * mean) / (n - 1))
+    half = z * math.sqrt(var / n)
+    return max(lo, mean - half), min(hi, mean + half)
+
+
+# Function: Load the intervals of the current best checkpoint from its summary JSON.
+# Prefers the interval recorded by an adaptive run, then rebuilds it from the
+# matching per-episode CSV, and finally falls back to the point estimates.
+def load_reference(summary_path, confidence):
+    with open(summary_path) as f:
+        summary = json.load(f)
+
+    adaptive = summary.get("adaptive")
+    if adaptive and "score_mean_ci" in adaptive:
+        return {
+            "perfect_rate_ci": tuple(adaptive["perfect_rate_ci"]),
+            "score_mean_ci": tuple(adaptive["score_mean_ci"]),
+        }
+
+    z = z_for_confidence(confidence)
+    csv_path = summary_path.replace(".summary.json", ".csv")
+    if os.path.exists(csv_path):
+        n = perfect = 0
+        total = sq_total = 0.0
+        with open(csv_path, newline="") as f:
+            for row in csv.DictReader(f):
+                score = int(row["score"])
+                n += 1
+                total += score
+                sq_total += score * score
+                perfect += 1 if row["perfect"] == "True" else 0
+        return {
+            "perfect_rate_ci": wilson_interval(perfect, n, z),
+            "score_mean_ci": mean_interval(total, sq_total, n, z),
+        }
+
+    pr = float(summary.get("perfect_rate", 0.0))
+    sm = float(summary.get("score_mean", 0.0))
+    return {"perfect_rate_ci": (pr, pr), "score_mean_ci": (sm, sm)}
+
+
+# Sequential stopping rule for one checkpoint evaluation.
+# Stops once both intervals are narrower than their targets, or once the
+# upper bound on score_mean is below the best checkpoint's lower bound.
+# score_mean is the primary key of the benchmark's selection rule, so a
+# checkpoint that loses on it cannot be chosen whatever its perfect rate.
+class AdaptiveStopper:
+    def __init__(self, confidence=0.95, perfect_width=0.08, score_width=0.1,
+                 min_episodes=50, reference=None):
+        self.confidence = float(confidence)
+        self.z = z_for_confidence(self.confidence)
+        self.perfect_width = float(perfect_width)
+        self.score_width = float(score_width)
+        self.min_episodes = int(min_episodes)
+        self.reference = reference
+
+    # Function: Current intervals from the writer's running aggregates
+    def intervals(self, writer):
+        n = writer.n_episodes
+        return {
+            "perfect_rate_ci": wilson_interval(writer.perfect_count, n, self.z),
+            "score_mean_ci": mean_interval(writer.score_sum, writer.score_sq_sum, n, self.z),
+        }
+
+    # Function: Return a stop reason, or None to keep evaluating
+    def check(self, writer):
+        if writer.n_episodes < self.min_episodes:
+            return None
+
+        ci = self.intervals(writer)
+        p_lo, p_hi = ci["perfect_rate_ci"]
+        s_lo, s_hi = ci["score_mean_ci"]
+
+        if self.reference is not None:
+            best_lo = self.reference["score_mean_ci"][0]
+            if s_hi < best_lo:
+                return "dominated"
+
+        if (p_hi - p_lo) <= self.perfect_width and (s_hi - s_lo) <= self.score_width:
+            return "converged"
+
+        return None
+
+    # Function: Block recorded under "adaptive" in the summary JSON
+    def report(self, writer, stop_reason, max_episodes, batch_size):
+        ci = self.intervals(writer)
+        return {
+            "episodes_used": int(writer.n_episodes),
+            "max_episodes": int(max_episodes),
+            "batch_size": int(batch_size),
+            "confidence": self.confidence,
+            "stop_reason": stop_reason,
+            "perfect_rate_ci": [float(v) for v in ci["perfect_rate_ci"]],
+            "score_mean_ci": [float(v) for v in ci["score_mean_ci"]],
+            "target_perfect_width": self.perfect_width,
+            "target_score_width": self.score_width,
+        }
+
+
+# Function: Run episodes for the given seeds in batches, writing each result.
+# Without a stopper this is the plain fixed-size loop. With one, the stop rule
+# is checked after every batch and the "adaptive" block is attached to the summary.
+# batch_fn(seeds) may replace run_fn to play a whole batch at once (e.g. on a
+# process pool); it must return the results in the order of the seeds given.
+def run_seed_batches(writer, seeds, run_fn=None, stopper=None, batch_size=50, batch_fn=None):
+    todo = [s for s in seeds if s not in writer.completed_seeds]
+    batch_size = max(1, int(batch_size))
+    stop_reason = None
+
+    for start in range(0, len(todo), batch_size):
+        if stopper is not None:
+            stop_reason = stopper.check(writer)
+            if stop_reason is not None:
+                break
+
+        batch = todo[start:start + batch_size]
+        results = batch_fn(batch) if batch_fn is not None else map(run_fn, batch)
+        for result in results:
+            writer.write(result)
+
+    if stopper is not None:
+        if stop_reason is None:
+            stop_reason = stopper.check(writer) or "max_episodes"
+        writer.extra_summary["adaptive"] = stopper.report(writer, stop_reason, len(seeds), batch_size)
+
+    return stop_reason
+
+
+# Function: Shared command line options for adaptive evaluation
+def add_adaptive_args(parser):
+    parser.add_argument("--adaptive", action="store_true", default=False,
+                        help="Stop early once the confidence intervals are tight enough; --episodes becomes the maximum")
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--min-episodes", type=int, default=50)
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--target-perfect-width", type=float, default=0.08)
+    parser.add_argument("--target-score-width", type=float, default=0.1)
+    parser.add_argument("--best-summary", type=str, default=None,
+                        help="Summary JSON of the current best checkpoint, used to stop on dominated checkpoints")
+
+
+# Function: Build a stopper from parsed arguments, or None for fixed-size evaluation
+def stopper_from_args(args):
+    if not args.adaptive:
+        return None
+
+    reference = None
+    if args.best_summary:
+        reference = load_reference(args.best_summary, args.confidence)
+
+    return AdaptiveStopper(
+        confidence=args.confidence,
+        perfect_width=args.target_perfect_width,
+        score_width=args.target_score_width,
+        min_episodes=args.min_episodes,
+        reference=reference,
+    )
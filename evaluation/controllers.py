@@ -0,0 +1,204 @@
+import os
+from collections import deque
+import numpy as np
+
+
+# Controllers turn observations into a joint action (a1, a2) and own the gym
+# wrapper that produces those observations. The evaluation engine only talks to
+# the raw CoopEnv underneath (gym_env.env) for its diagnostics, so every
+# controller is scored by exactly the same code.
+#
+# Interface:
+#   make_env(level_name, stack_n) -> gym env with .env pointing at the CoopEnv
+#   reset(gym_env, seed)          -> obs
+#   act(obs, deterministic)       -> (a1, a2)
+#   step(gym_env, a1, a2)         -> obs, reward, terminated, truncated
+
+
+# Class: Stable-Baselines3 model acting on both agents from a stacked joint observation
+class SB3JointController:
+    def __init__(self, model, stack_n=4):
+        self.model = model
+        self.stack_n = stack_n
+        self.frames = deque(maxlen=stack_n)
+
+    def make_env(self, level_name, stack_n):
+        from environment.gym_wrapper import GymCoopEnv
+        return GymCoopEnv(level_name)
+
+    def reset(self, gym_env, seed):
+        obs, info = gym_env.reset(seed=seed)
+
+        # Initialize the frame stack with copies of the first observation
+        self.frames.clear()
+        for _ in range(self.stack_n):
+            self.frames.append(obs.copy())
+        return obs
+
+    def act(self, obs, deterministic):
+        obs_stack = np.concatenate(list(self.frames), axis=0).astype(np.float32)
+        action, _ = self.model.predict(obs_stack, deterministic=deterministic)
+        return int(action[0]), int(action[1])
+
+    def step(self, gym_env, a1, a2):
+        obs, reward, term, trunc, info = gym_env.step(np.array([a1, a2], dtype=np.int64))
+        self.frames.append(obs.copy())
+        return obs, float(reward), bool(term), bool(trunc)
+
+
+# Class: RLlib algorithm with a single policy choosing the joint MultiDiscrete action
+class RLlibCentralisedController:
+    def __init__(self, algo):
+        self.algo = algo
+
+    def make_env(self, level_name, stack_n):
+        from environment.gym_wrapper_rllib_centralised import GymCoopEnvRLlibCentralised
+        return GymCoopEnvRLlibCentralised({"level_name": level_name, "stack_n": stack_n, "render": False})
+
+    def reset(self, gym_env, seed):
+        obs, info = gym_env.reset(seed=seed)
+        return obs
+
+    def act(self, obs, deterministic):
+        action = self.algo.compute_single_action(obs, explore=not deterministic)
+        return int(action[0]), int(action[1])
+
+    def step(self, gym_env, a1, a2):
+        obs, reward, term, trunc, info = gym_env.step(np.array([a1, a2], dtype=np.int64))
+        return obs, float(reward), bool(term), bool(trunc)
+
+
+# Class: RLlib algorithm with one policy per agent (decentralised and comms variants).
+# Deterministic actions for both agents come from one fused forward pass when the two
+# policies are plain torch MLPs of the same shape (see agents/torch_ppo.py FusedPolicies);
+# anything else, and exploring, goes through compute_single_action per agent. Only
+# evaluation goes through here; RLlib training samples each policy separately.
+class RLlibPerAgentController:
+    def __init__(self, algo, env_cls, policy_ids=("agent_1_policy", "agent_2_policy")):
+        self.algo = algo
+        self.env_cls = env_cls
+        self.policy_ids = policy_ids
+        self.fused = None
+
+    def make_env(self, level_name, stack_n):
+        return self.env_cls({"level_name": level_name, "stack_n": stack_n, "render": False})
+
+    def reset(self, gym_env, seed):
+        obs, info = gym_env.reset(seed=seed)
+        return obs
+
+    def act(self, obs, deterministic):
+        if deterministic and self._fused_policies():
+            import torch
+            batch = torch.from_numpy(np.stack([obs["agent_1"], obs["agent_2"]]).astype(np.float32)[:, None])
+            actions, _, _ = self.fused.act(batch, deterministic=True, values=False)
+            return int(actions[0, 0, 0]), int(actions[1, 0, 0])
+
+        action_1 = self.algo.compute_single_action(obs["agent_1"], policy_id=self.policy_ids[0], explore=not deterministic)
+        action_2 = self.algo.compute_single_action(obs["agent_2"], policy_id=self.policy_ids[1], explore=not deterministic)
+        return int(action_1), int(action_2)
+
+    # Function: Build the fused forward on first use; False when the policies cannot be fused
+    def _fused_policies(self):
+        if self.fused is None:
+            self.fused = False
+            if not hasattr(self.algo, "get_policy"):
+                return self.fused
+            policies = [self.algo.get_policy(pid) for pid in self.policy_ids]
+            weights = [policy.get_weights() for policy in policies]
+            models = [policy.config.get("model", {}) for policy in policies]
+            same_shape = all(
+                w.keys() == weights[0].keys() and all(w[k].shape == weights[0][k].shape for k in w) for w in weights
+            )
+            if (same_shape and "_logits._model.0.weight" in weights[0]
+                    and all(policy.config.get("_disable_preprocessor_api") for policy in policies)
+                    and len({(m.get("fcnet_activation"), m.get("vf_share_layers")) for m in models}) == 1):
+                from agents.torch_ppo import ACTIVATIONS, FusedPolicies
+                if models[0].get("fcnet_activation", "tanh") in ACTIVATIONS:
+                    self.fused = FusedPolicies(weights, [int(policies[0].action_space.n)],
+                                               models[0].get("fcnet_activation", "tanh"),
+                                               bool(models[0].get("vf_share_layers", False)))
+        return self.fused
+
+    def step(self, gym_env, a1, a2):
+        obs, rewards, terms, truncs, info = gym_env.step({"agent_1": a1, "agent_2": a2})
+
+        # Shared team reward is duplicated for both agents, so only count one copy
+        return obs, float(rewards["agent_1"]), bool(terms["__all__"]), bool(truncs["__all__"])
+
+
+# Class: The policies of a weights-only checkpoint (scripts/compact_checkpoints.py) behind the
+# one Algorithm method the RLlib controllers use, so they act the same on either kind
+class RLlibPolicySet:
+    def __init__(self, policies):
+        self.policies = policies
+
+    def compute_single_action(self, obs, policy_id="default_policy", explore=None):
+        action, _, _ = self.policies[policy_id].compute_single_action(obs, explore=explore)
+        return action
+
+    def get_policy(self, policy_id="default_policy"):
+        return self.policies[policy_id]
+
+
+# Function: Restore an RLlib algorithm, registering the env name its config refers to.
+# Weights-only checkpoints load their policies alone with Policy.from_checkpoint.
+def _restore_rllib(checkpoint_path, env_name, env_cls):
+    checkpoint_path = os.path.abspath(checkpoint_path)
+    policies_dir = os.path.join(checkpoint_path, "policies")
+    if os.path.isfile(os.path.join(checkpoint_path, "weights_only.json")):
+        from ray.rllib.policy.policy import Policy
+        return RLlibPolicySet({
+            pid: Policy.from_checkpoint(os.path.join(policies_dir, pid)) for pid in sorted(os.listdir(policies_dir))
+        })
+
+    import ray
+    from ray.tune.registry import register_env
+    from ray.rllib.algorithms.algorithm import Algorithm
+
+    register_env(env_name, lambda env_config: env_cls(env_config))
+    ray.init(ignore_reinit_error=True, include_dashboard=False, log_to_driver=False)
+    return Algorithm.from_checkpoint(checkpoint_path)
+
+
+# Function: Load an SB3 PPO model
+def _load_sb3(path, stack_n):
+    from stable_baselines3 import PPO
+    return SB3JointController(PPO.load(path), stack_n)
+
+
+# Function: Load a centralised RLlib checkpoint
+def _load_rllib_centralised(path, stack_n):
+    from environment.gym_wrapper_rllib_centralised import GymCoopEnvRLlibCentralised
+    algo = _restore_rllib(path, "marl_coop_centralised", GymCoopEnvRLlibCentralised)
+    return RLlibCentralisedController(algo)
+
+
+# Function: Load a decentralised RLlib checkpoint
+def _load_rllib_decentralised(path, stack_n):
+    from environment.gym_wrapper_rllib_decentralised import GymCoopEnvRLlibDecentralised
+    algo = _restore_rllib(path, "marl_coop_decentralised", GymCoopEnvRLlibDecentralised)
+    return RLlibPerAgentController(algo, GymCoopEnvRLlibDecentralised)
+
+
+# Function: Load a decentralised task-state cue RLlib checkpoint
+def _load_rllib_decentralised_comms(path, stack_n):
+    from environment.gym_wrapper_rllib_decentralised_comms import GymCoopEnvRLlibDecentralisedComms
+    algo = _restore_rllib(path, "marl_coop_decentralised_comms", GymCoopEnvRLlibDecentralisedComms)
+    return RLlibPerAgentController(algo, GymCoopEnvRLlibDecentralisedComms)
+
+
+CONTROLLER_LOADERS = {
+    "sb3": _load_sb3,
+    "rllib_centralised": _load_rllib_centralised,
+    "rllib_decentralised": _load_rllib_decentralised,
+    "rllib_decentralised_comms": _load_rllib_decentralised_comms,
+}
+
+
+# Function: Build a controller of the given kind from a model/checkpoint path.
+# Takes only picklable arguments so process-pool workers can load their own copy.
+def load_controller(kind, path, stack_n=4):
+    if kind not in CONTROLLER_LOADERS:
+        raise ValueError(f"Unknown controller kind: {kind}")
+    return CONTROLLER_LOADERS[kind](path, stack_n)
@@ -0,0 +1,320 @@
+import os
+import sys
+import json
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from .adaptive import add_adaptive_args, stopper_from_args, run_seed_batches
+from .controllers import load_controller
+from .results_writer import StreamingResultWriter, EVENT_KEYS, SB3_EVENT_KEYS, result_fieldnames
+from environment.env import EVENT_NAMES
+from environment.rollouts import EpisodeRecorder, RolloutWriter
+
+
+# Function: Point pygame at the dummy video driver so evaluation runs headless
+def init_headless_pygame():
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    import pygame
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+
+
+# Function: Event columns written for a controller kind. The SB3 script keeps the five
+# columns its CSVs always had; the RLlib scripts add the per-agent counters.
+def event_keys_for(kind):
+    return SB3_EVENT_KEYS if kind == "sb3" else EVENT_KEYS
+
+
+# Function: Run a single episode with any controller and collect detailed results.
+# With record=True the per-step trajectory is added as result["rollout"] = (env_seed, columns),
+# see environment/rollouts.py.
+def run_episode(controller, level_name, seed, deterministic, stack_n, max_steps_cap, record=False,
+                event_keys=EVENT_KEYS):
+
+    # Create the environment through the controller and reset it
+    gym_env = controller.make_env(level_name, stack_n)
+    obs = controller.reset(gym_env, seed)
+
+    # Get the raw environment for detailed state access
+    raw_env = gym_env.env
+    total_reward = 0.0
+    steps = 0
+
+    # Outcome counters are kept by CoopEnv.step itself, only the stuck check happens here
+    stuck_penalty_steps = 0
+
+    done = False
+    terminated = False
+    truncated = False
+
+    recorder = EpisodeRecorder(getattr(gym_env, "stack_n", 1)) if record else None
+
+    # Main loop for the episode
+    while not done:
+        if max_steps_cap is not None and steps >= max_steps_cap:
+            truncated = True
+            break
+
+        a1, a2 = controller.act(obs, deterministic)
+
+        # Take the step in the environment
+        acted_on = obs
+        obs, reward, terminated, truncated = controller.step(gym_env, a1, a2)
+        total_reward += reward
+        if recorder is not None:
+            recorder.add(acted_on, a1, a2, reward, terminated or truncated, raw_env)
+        steps += 1
+        if terminated or truncated:
+            done = True
+
+        # Count stuck penalty steps
+        if hasattr(raw_env, "stuck_steps") and raw_env.stuck_steps >= 80:
+            stuck_penalty_steps += 1
+
+    counts = dict(zip(EVENT_NAMES, raw_env.event_counts.tolist()))
+
+    # Episode outcome
+    score = int(raw_env.score)
+    failures = int(len(raw_env.failed_orders))
+
+    # How many orders remain unserved at end
+    unserved_active = 0
+    for o in raw_env.active_orders:
+        if not o.get("served", False):
+            unserved_active += 1
+
+    pending_left = int(len(raw_env.pending_orders))
+    completed = int(len(raw_env.completed_orders))
+
+    # Perfect definition
+    perfect = (score == 3 and failures == 0)
+
+    # End reason
+    end_reason = "terminated"
+    if truncated:
+        end_reason = "truncated"
+    if max_steps_cap is not None and steps >= max_steps_cap:
+        end_reason = "cap_truncated"
+
+    result = {
+        "level": level_name,
+        "seed": int(seed),
+        "deterministic": bool(deterministic),
+        "steps": int(steps),
+        "terminated": bool(terminated),
+        "truncated": bool(truncated),
+        "end_reason": end_reason,
+
+        "score": score,
+        "failed_orders": failures,
+        "unserved_active_end": int(unserved_active),
+        "pending_left_end": int(pending_left),
+        "completed_orders": completed,
+
+        "perfect": bool(perfect),
+        "total_reward": float(total_reward),
+    }
+    for key in event_keys:
+        result[key] = int(counts[key])
+
+    result["collision_attempts"] = int(counts["collision_attempts"])
+    result["stuck_penalty_steps"] = int(stuck_penalty_steps)
+    result["both_idle_steps"] = int(counts["both_idle_steps"])
+
+    if recorder is not None and len(recorder):
+        result["rollout"] = (int(raw_env._seed), recorder.arrays())
+
+    return result
+
+
+# Class: Stands in for the result writer when rollouts are exported: each result's
+# rollout goes to the RolloutWriter and the rest to the result writer as usual
+class _RolloutExport:
+    def __init__(self, writer, rollouts):
+        self.writer = writer
+        self.rollouts = rollouts
+
+    def write(self, result):
+        rollout = result.pop("rollout", None)
+        if rollout is not None:
+            env_seed, arrays = rollout
+            self.rollouts.write_episode(arrays, seed=result["seed"], env_seed=env_seed,
+                                        level=result["level"], terminated=result["terminated"])
+        self.writer.write(result)
+
+    def __getattr__(self, name):
+        return getattr(self.writer, name)
+
+
+# Each pool worker restores its own controller once, then plays seeds on it
+_worker_controller = None
+_worker_episode_args = None
+
+
+# Function: Process-pool initializer, loads the controller inside the worker
+def _init_worker(kind, path, stack_n, level_name, deterministic, max_steps_cap, record=False,
+                 event_keys=EVENT_KEYS):
+    global _worker_controller, _worker_episode_args
+    init_headless_pygame()
+    _worker_controller = load_controller(kind, path, stack_n)
+    _worker_episode_args = (level_name, deterministic, stack_n, max_steps_cap, record, event_keys)
+
+
+# Function: Play one seed on the worker's controller
+def _worker_run(seed):
+    level_name, deterministic, stack_n, max_steps_cap, record, event_keys = _worker_episode_args
+    return run_episode(_worker_controller, level_name, seed, deterministic, stack_n, max_steps_cap, record, event_keys)
+
+
+# Function: Evaluate one level, streaming results to the writer.
+# With workers > 1 the seeds of each batch are spread across a process pool;
+# results still reach the writer in seed order so CSVs match a serial run.
+# Passing a RolloutWriter as `rollouts` also exports every episode's trajectory.
+# RLlib kinds only run serially: every pool worker would start its own Ray instance.
+def evaluate_level(writer, kind, path, level_name, seeds, deterministic=True, stack_n=4,
+                   max_steps_cap=None, stopper=None, batch_size=50, workers=1, controller=None,
+                   rollouts=None, event_keys=EVENT_KEYS):
+    if workers > 1 and kind is not None and kind.startswith("rllib"):
+        raise ValueError(f"workers > 1 is not supported for {kind}: each worker process would start its own Ray instance")
+
+    record = rollouts is not None
+    if record:
+        writer = _RolloutExport(writer, rollouts)
+
+    if workers <= 1:
+        if controller is None:
+            controller = load_controller(kind, path, stack_n)
+        return run_seed_batches(
+            writer,
+            seeds,
+            lambda seed: run_episode(controller, level_name, seed, deterministic, stack_n, max_steps_cap, record,
+                                     event_keys),
+            stopper=stopper,
+            batch_size=batch_size,
+        )
+
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=ctx,
+        initializer=_init_worker,
+        initargs=(kind, path, stack_n, level_name, deterministic, max_steps_cap, record, event_keys),
+    ) as pool:
+        return run_seed_batches(
+            writer,
+            seeds,
+            stopper=stopper,
+            batch_size=batch_size,
+            batch_fn=lambda batch: pool.map(_worker_run, batch),
+        )
+
+
+# Function: Shared command line for the eval scripts
+def build_eval_parser(model_arg="checkpoint", default_episodes=500, default_levels=("level_3",)):
+    parser = argparse.ArgumentParser()
+    parser.add_argument(f"--{model_arg}", type=str, required=True, dest="model_path")
+    parser.add_argument("--episodes", type=int, default=default_episodes)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--levels", nargs="+", default=list(default_levels))
+    parser.add_argument("--stack-n", type=int, default=4)
+    parser.add_argument("--deterministic", action="store_true", default=True)
+    parser.add_argument("--no-deterministic", action="store_false", dest="deterministic")
+    parser.add_argument("--out-dir", type=str, default="eval_results")
+    parser.add_argument("--max-steps-cap", type=int, default=None)
+    parser.add_argument("--resume", action="store_true", default=False)
+    parser.add_argument("--fsync-every", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Episodes played in parallel, each worker process loads its own copy of the model "
+                             "(SB3 models only, RLlib checkpoints are evaluated in one process)")
+    parser.add_argument("--export-rollouts", type=str, default=None, metavar="DIR",
+                        help="Also write every episode's trajectory to DIR/<model>_<level>/ (see environment/rollouts.py)")
+    add_adaptive_args(parser)
+    return parser
+
+
+# Function: Entry point used by every eval script
+def eval_main(kind, model_arg="checkpoint", default_episodes=500, default_levels=("level_3",), argv=None):
+    parser = build_eval_parser(model_arg, default_episodes, default_levels)
+    args = parser.parse_args(argv)
+    if args.workers > 1 and kind.startswith("rllib"):
+        parser.error("--workers > 1 is only supported for SB3 models: every worker process would start "
+                     "its own Ray instance. Run RLlib evaluations with --workers 1, or several scripts in parallel.")
+
+    # Validate model path
+    model_path = os.path.abspath(args.model_path)
+    if not os.path.exists(model_path):
+        print(f"{model_arg.capitalize()} not found")
+        sys.exit(1)
+
+    init_headless_pygame()
+
+    # Load once in this process for serial runs, pool workers load their own
+    controller = None
+    if args.workers <= 1:
+        controller = load_controller(kind, model_path, args.stack_n)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+
+    base_name = os.path.basename(model_path.rstrip("/")).replace(".zip", "")
+    event_keys = event_keys_for(kind)
+
+    for level in args.levels:
+        csv_file = os.path.join(args.out_dir, f"eval_{base_name}_{level}.csv")
+        json_file = os.path.join(args.out_dir, f"eval_{base_name}_{level}.summary.json")
+
+        rollouts = None
+        if args.export_rollouts:
+            rollouts = RolloutWriter(os.path.join(args.export_rollouts, f"{base_name}_{level}"),
+                                     level=level, stack_n=args.stack_n)
+
+        # Stream per-episode rows to disk, skipping seeds a previous run already finished.
+        # The summary covers exactly the requested seeds, whatever else the CSV holds.
+        seeds = [args.seed + i for i in range(args.episodes)]
+        config = {
+            "kind": kind,
+            "model": base_name,
+            "deterministic": args.deterministic,
+            "stack_n": args.stack_n,
+            "max_steps_cap": args.max_steps_cap,
+        }
+        try:
+            writer = StreamingResultWriter(csv_file, json_file, level, event_keys,
+                                           fsync_every=args.fsync_every, resume=args.resume, seeds=seeds,
+                                           fieldnames=result_fieldnames(event_keys), config=config)
+        except ValueError as e:
+            print(e)
+            sys.exit(1)
+
+        with writer:
+            if writer.completed_seeds:
+                print(f"Resuming {level}: {len(writer.completed_seeds)} of {len(seeds)} episodes already in {csv_file}")
+
+            try:
+                stop_reason = evaluate_level(
+                    writer,
+                    kind,
+                    model_path,
+                    level,
+                    seeds,
+                    deterministic=args.deterministic,
+                    stack_n=args.stack_n,
+                    max_steps_cap=args.max_steps_cap,
+                    stopper=stopper_from_args(args),
+                    batch_size=args.batch_size,
+                    workers=args.workers,
+                    controller=controller,
+                    rollouts=rollouts,
+                    event_keys=event_keys,
+                )
+            finally:
+                if rollouts is not None:
+                    rollouts.close()
+            if stop_reason is not None:
+                print(f"Adaptive eval on {level} stopped after {writer.n_episodes} episodes ({stop_reason})")
+
+        print(json.dumps(writer.summary(), indent=2))
+
+    if kind.startswith("rllib") and "ray" in sys.modules:
+        import ray
+        ray.shutdown()
@@ -0,0 +1,378 @@
+import os
+import csv
+import json
+from collections import Counter
+
+# Per-agent event columns written by the RLlib eval scripts
+EVENT_KEYS = (
+    "wrong_serve_attempts",
+    "not_done_serve_attempts",
+    "wrong_done_soup_pickups",
+    "burnt_soup_pickups",
+    "wrong_pot_adds",
+    "agent_1_ingredient_pickups",
+    "agent_2_ingredient_pickups",
+    "agent_1_valid_pot_adds",
+    "agent_2_valid_pot_adds",
+    "agent_1_bowl_pickups",
+    "agent_2_bowl_pickups",
+    "agent_1_done_soup_pickups",
+    "agent_2_done_soup_pickups",
+    "agent_1_serves",
+    "agent_2_serves",
+)
+
+# Event columns written by the older SB3 eval script
+SB3_EVENT_KEYS = (
+    "wrong_serve_attempts",
+    "not_done_serve_attempts",
+    "wrong_done_soup_pickups",
+    "burnt_soup_pickups",
+    "wrong_pot_adds",
+)
+
+# Extra diagnostics, listed after the wrong pot add seeds in the summary
+DIAGNOSTIC_KEYS = (
+    "collision_attempts",
+    "stuck_penalty_steps",
+    "both_idle_steps",
+)
+
+# Columns run_episode writes ahead of the event columns
+RESULT_KEYS = (
+    "level",
+    "seed",
+    "deterministic",
+    "steps",
+    "terminated",
+    "truncated",
+    "end_reason",
+    "score",
+    "failed_orders",
+    "unserved_active_end",
+    "pending_left_end",
+    "completed_orders",
+    "perfect",
+    "total_reward",
+)
+
+# Numeric per-episode columns that get a mean/sum/max block in the summary
+TOP_LEVEL_STAT_KEYS = (
+    "failed_orders",
+    "unserved_active_end",
+    "steps",
+    "total_reward",
+)
+
+
+# Function: CSV header of an eval run with the given event columns
+def result_fieldnames(event_keys=EVENT_KEYS):
+    return list(RESULT_KEYS) + list(event_keys) + list(DIAGNOSTIC_KEYS)
+
+
+# Function: Path of the run config stored next to a results CSV
+def config_path(csv_path):
+    base = csv_path[:-len(".csv")] if csv_path.endswith(".csv") else csv_path
+    return base + ".config.json"
+
+
+# Function: Convert a CSV cell back into the type run_episode produced
+def _parse_cell(value):
+    if value == "True":
+        return True
+    if value == "False":
+        return False
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+# Running mean/sum/max for one numeric column, matching calculate_stats
+class _RunningStat:
+    def __init__(self):
+        self.n = 0
+        self.total = 0.0
+        self.max = None
+
+    def add(self, value):
+        value = float(value)
+        self.n += 1
+        self.total += value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def as_dict(self):
+        if self.n == 0:
+            return {"mean": 0.0, "sum": 0, "max": 0.0}
+        return {
+            "mean": float(self.total / self.n),
+            "sum": int(self.total),
+            "max": float(self.max),
+        }
+
+
+# Running aggregates over per-episode results, in the summary layout the eval
+# scripts always wrote. With `seeds` given, only results for those seeds count.
+class ResultSummary:
+    def __init__(self, level, event_keys=EVENT_KEYS, seeds=None):
+        self.level = level
+        self.event_keys = tuple(event_keys)
+        self.seeds = None if seeds is None else {int(s) for s in seeds}
+
+        self.completed_seeds = set()
+        self.extra_summary = {}
+        self._reset_aggregates()
+
+    def _reset_aggregates(self):
+        self.n_episodes = 0
+        self.perfect_count = 0
+        self.truncated_count = 0
+        self.score_sum = 0.0
+        self.score_sq_sum = 0.0
+        self.score_min = None
+        self.score_max = None
+        self.end_reasons = Counter()
+        self.wrong_pot_add_seeds = set()
+        stat_keys = TOP_LEVEL_STAT_KEYS + self.event_keys + DIAGNOSTIC_KEYS
+        self._stats = {key: _RunningStat() for key in stat_keys}
+
+    # Function: Add the rows of a results CSV, skipping seeds outside `seeds` and
+    # seeds already counted. Returns the CSV header.
+    def add_csv(self, csv_path):
+        with open(csv_path, "r", newline="") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                result = {k: _parse_cell(v) for k, v in row.items()}
+                seed = int(result["seed"])
+                if seed in self.completed_seeds or (self.seeds is not None and seed not in self.seeds):
+                    continue
+                self._accumulate(result)
+            return reader.fieldnames
+
+    def _accumulate(self, result):
+        seed = int(result["seed"])
+        score = int(result["score"])
+
+        self.completed_seeds.add(seed)
+        self.n_episodes += 1
+        if result.get("perfect", False):
+            self.perfect_count += 1
+        if result.get("truncated", False):
+            self.truncated_count += 1
+
+        self.score_sum += score
+        self.score_sq_sum += score * score
+        self.score_min = score if self.score_min is None else min(self.score_min, score)
+        self.score_max = score if self.score_max is None else max(self.score_max, score)
+
+        self.end_reasons[result["end_reason"]] += 1
+        if result.get("wrong_pot_adds", 0) > 0:
+            self.wrong_pot_add_seeds.add(seed)
+
+        for key, stat in self._stats.items():
+            stat.add(result.get(key, 0.0))
+
+    @property
+    def perfect_rate(self):
+        if self.n_episodes == 0:
+            return 0.0
+        return float(self.perfect_count / self.n_episodes)
+
+    @property
+    def score_mean(self):
+        if self.n_episodes == 0:
+            return 0.0
+        return float(self.score_sum / self.n_episodes)
+
+    # Function: Build the summary dict in the same layout the eval scripts always wrote
+    def summary(self):
+        n = self.n_episodes
+
+        events = {key: self._stats[key].as_dict() for key in self.event_keys}
+        events["wrong_pot_add_seeds"] = sorted(self.wrong_pot_add_seeds)
+        for key in DIAGNOSTIC_KEYS:
+            events[key] = self._stats[key].as_dict()
+
+        summary = {
+            "level": self.level,
+            "n_episodes": n,
+
+            "perfect_rate": self.perfect_rate,
+            "truncated_rate": float(self.truncated_count / n) if n else 0.0,
+
+            "score_mean": self.score_mean,
+            "score_min": int(self.score_min) if n else 0,
+            "score_max": int(self.score_max) if n else 0,
+
+            "failed_orders": self._stats["failed_orders"].as_dict(),
+            "unserved_active_end": self._stats["unserved_active_end"].as_dict(),
+            "steps": self._stats["steps"].as_dict(),
+            "total_reward": self._stats["total_reward"].as_dict(),
+
+            "end_reasons": dict(self.end_reasons),
+
+            "events": events,
+        }
+        summary.update(self.extra_summary)
+
+        return summary
+
+
+# Function: Summary of the rows of a results CSV, limited to `seeds` if given.
+# Reads only; the event columns are taken from the CSV header.
+def summarise_csv(csv_path, level, seeds=None):
+    with open(csv_path, newline="") as f:
+        header = next(csv.reader(f), [])
+    aggregates = ResultSummary(level, [key for key in EVENT_KEYS if key in header], seeds)
+    aggregates.add_csv(csv_path)
+    return aggregates.summary()
+
+
+# Streaming per-episode writer for the eval scripts.
+# Rows are appended to the CSV as episodes finish and the summary is built
+# from running totals, so memory does not grow with the episode count.
+# With resume=True an existing CSV is read back, its aggregates rebuilt, and
+# its seeds exposed through completed_seeds so the caller can skip them.
+# `seeds` limits the summary to the requested seeds: rows of other seeds stay
+# in the CSV but are not counted. Resuming refuses (ValueError) a CSV whose
+# header differs from `fieldnames`, whose rows are for another level, or whose
+# stored run `config` differs from this one.
+class StreamingResultWriter(ResultSummary):
+    def __init__(self, csv_path, json_path, level, event_keys=EVENT_KEYS,
+                 fsync_every=50, resume=False, seeds=None, fieldnames=None, config=None):
+        super().__init__(level, event_keys, seeds)
+        self.csv_path = csv_path
+        self.json_path = json_path
+        self.fsync_every = max(1, int(fsync_every))
+        self.config = None if config is None else dict(config, level=level)
+
+        self._fieldnames = None if fieldnames is None else list(fieldnames)
+        self._writer = None
+        self._unsynced = 0
+
+        if resume and os.path.exists(csv_path) and self._load_existing():
+            self._file = open(csv_path, "a", newline="")
+            self._writer = csv.DictWriter(self._file, fieldnames=self._fieldnames)
+        else:
+            self._file = open(csv_path, "w", newline="")
+            if self._fieldnames is not None:
+                self._writer = csv.DictWriter(self._file, fieldnames=self._fieldnames)
+                self._writer.writeheader()
+        self._write_config()
+
+    # Function: Rebuild the running aggregates from a partially written CSV.
+    # Returns False if there is nothing to resume (no header yet).
+    def _load_existing(self):
+        # Drop a half-written final row left behind by a crash
+        with open(self.csv_path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                cut = data.rfind(b"\n") + 1
+                f.seek(cut)
+                f.truncate()
+
+        self._check_resumable()
+        header = self.add_csv(self.csv_path)
+        if header is None:
+            return False
+        self._fieldnames = list(header)
+        return True
+
+    # Function: Raise ValueError if the existing CSV was written by a different run
+    def _check_resumable(self):
+        with open(self.csv_path, "r", newline="") as f:
+            reader = csv.DictReader(f)
+            header = reader.fieldnames
+            if header is None:
+                return
+            if self._fieldnames is not None and list(header) != self._fieldnames:
+                raise ValueError(
+                    f"Cannot resume {self.csv_path}: its columns {list(header)} differ from this run's "
+                    f"{self._fieldnames}. Write to another --out-dir or drop --resume."
+                )
+            # Run settings that are also per-row columns must match on every row
+            checks = {"level": self.level}
+            if self.config is not None:
+                checks.update((k, v) for k, v in self.config.items() if k in header)
+            for row in reader:
+                for key, expected in checks.items():
+                    if _parse_cell(row[key]) != expected:
+                        raise ValueError(
+                            f"Cannot resume {self.csv_path}: seed {row['seed']} was run with "
+                            f"{key}={row[key]}, this run uses {key}={expected}."
+                        )
+
+        stored_path = config_path(self.csv_path)
+        if self.config is not None and os.path.exists(stored_path):
+            with open(stored_path) as f:
+                stored = json.load(f)
+            if stored != self.config:
+                changed = sorted(k for k in set(stored) | set(self.config) if stored.get(k) != self.config.get(k))
+                raise ValueError(
+                    f"Cannot resume {self.csv_path}: run config differs from {stored_path} in {changed}."
+                )
+
+    # Function: Store the run config next to the CSV so a later --resume can check it
+    def _write_config(self):
+        if self.config is None:
+            return
+        stored_path = config_path(self.csv_path)
+        tmp_path = stored_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.config, f, indent=2)
+        os.replace(tmp_path, stored_path)
+
+    # Function: Append one episode result and update the running aggregates
+    def write(self, result):
+        if self._writer is None:
+            self._fieldnames = list(result.keys())
+            self._writer = csv.DictWriter(self._file, fieldnames=self._fieldnames)
+            self._writer.writeheader()
+        elif list(result.keys()) != self._fieldnames:
+            raise ValueError(f"Result columns {list(result.keys())} differ from the CSV header {self._fieldnames}")
+
+        self._writer.writerow(result)
+        if self.seeds is None or int(result["seed"]) in self.seeds:
+            self._accumulate(result)
+
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every:
+            self.sync()
+
+    # Function: Flush buffered rows to disk
+    def sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    # Function: Flush the CSV and write the summary JSON, returning the summary
+    def close(self):
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+        summary = self.summary()
+
+        tmp_path = self.json_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(summary, f, indent=2)
+        os.replace(tmp_path, self.json_path)
+
+        return summary
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        elif not self._file.closed:
+            # Keep whatever finished so a --resume run can pick it up
+            self.sync()
+            self._file.close()
+        return False
@@ -0,0 +1,82 @@
+import os
+import math
+
+from .results_writer import summarise_csv
+
+# Validation split from BENCHMARK.md section 7: seeds 0-249, 250 episodes
+VALIDATION_SEED_START = 0
+VALIDATION_EPISODES = 250
+
+
+# Function: Sort key for the benchmark's checkpoint selection rule.
+# Strongest score_mean, then perfect_rate, then fewer failed orders,
+# then the earlier checkpoint if still tied.
+def selection_key(step, summary):
+    failed = summary.get("failed_orders", {})
+    failed_mean = failed.get("mean", 0.0) if isinstance(failed, dict) else float(failed)
+    return (
+        -float(summary.get("score_mean", 0.0)),
+        -float(summary.get("perfect_rate", 0.0)),
+        float(failed_mean),
+        int(step),
+    )
+
+
+# Function: Rank checkpoint steps best-first given {step: summary}
+def rank_checkpoints(summaries):
+    return sorted(summaries, key=lambda step: selection_key(step, summaries[step]))
+
+
+# Function: {step: summary} of each checkpoint over the first `budget` validation seeds,
+# read from the eval_checkpoint_<step>_<level>.csv files in out_dir. Rows of later
+# seeds (from a bigger round or an earlier full sweep) are not counted.
+def round_summaries(out_dir, steps, level, budget, seed_start=VALIDATION_SEED_START):
+    seeds = range(seed_start, seed_start + int(budget))
+    return {
+        step: summarise_csv(os.path.join(out_dir, f"eval_checkpoint_{step}_{level}.csv"), level, seeds)
+        for step in steps
+    }
+
+
+# Function: Budgets used by successive halving, doubling until the validation cap
+def budget_schedule(min_budget, max_budget):
+    budgets = []
+    budget = max(1, int(min_budget))
+    while budget < max_budget:
+        budgets.append(budget)
+        budget *= 2
+    budgets.append(int(max_budget))
+    return budgets
+
+
+# Function: Successive halving over checkpoint steps.
+# evaluate_fn(steps, budget) must return {step: summary} for every step it was
+# given, evaluated on the first `budget` validation seeds. After each round the
+# top keep_fraction survive and the budget doubles. Once the budget reaches
+# max_budget the best of the remaining checkpoints wins.
+def successive_halving(steps, evaluate_fn, min_budget=32, max_budget=VALIDATION_EPISODES,
+                       keep_fraction=0.5):
+    survivors = list(steps)
+    history = []
+    summaries = {}
+
+    for budget in budget_schedule(min_budget, max_budget):
+        summaries = evaluate_fn(survivors, budget)
+        ranked = rank_checkpoints({s: summaries[s] for s in survivors})
+
+        is_last = budget >= max_budget or len(ranked) == 1
+        keep = 1 if is_last else max(1, math.ceil(len(ranked) * keep_fraction))
+
+        history.append({
+            "budget": int(budget),
+            "evaluated": [int(s) for s in ranked],
+            "kept": [int(s) for s in ranked[:keep]],
+            "score_mean": {str(s): float(summaries[s].get("score_mean", 0.0)) for s in ranked},
+            "perfect_rate": {str(s): float(summaries[s].get("perfect_rate", 0.0)) for s in ranked},
+        })
+
+        survivors = ranked[:keep]
+        if len(survivors) == 1:
+            break
+
+    return survivors[0], history
@@ -0,0 +1,113 @@
+import os
+import shutil
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from environment.replay import EpisodeReplay
+from environment.rollouts import RolloutReader
+from .engine import init_headless_pygame
+
+
+# Function: The `n` worst or best episodes of a rollout index. Worst means lowest score,
+# then most failed orders, then lowest total reward; best is the reverse order.
+def select_episodes(index, n, which="worst"):
+    if which not in ("worst", "best"):
+        raise ValueError(f"Expected 'worst' or 'best', got {which!r}")
+    ranked = sorted(index, key=lambda row: (row["score"], -row["failed_orders"], row["total_reward"], -row["seed"]))
+    if which == "best":
+        ranked = ranked[::-1]
+    return ranked[:max(0, int(n))]
+
+
+# Function: Render one exported episode offscreen and encode it to an MP4 file. Frames come
+# from CoopEnv.render on a plain Surface (no window) and are written as fast as they render.
+def render_episode_video(rollout_dir, seed, out_path, fps=30, caption=True):
+    import cv2
+    from pygame import Surface, surfarray
+
+    episode = RolloutReader(rollout_dir).episode(seed)
+    # Played straight through once, so only the reset snapshot is needed
+    replay = EpisodeReplay.from_rollout(episode, snapshot_every=len(episode["actions"]) + 1, render=True)
+    env = replay.env
+    width = env.grid_width * env.tile_size
+    height = env.grid_height * env.tile_size + env.header_size
+    surface = Surface((width, height))
+
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    tmp_path = out_path + ".tmp.mp4"
+    writer = cv2.VideoWriter(tmp_path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    if not writer.isOpened():
+        raise RuntimeError(f"OpenCV could not open an MP4 writer for {out_path}")
+
+    try:
+        for t in range(len(replay) + 1):
+            if t:
+                replay.step()
+            surface.fill((0, 0, 0))
+            env.render(surface)
+            # surfarray is (width, height, RGB); OpenCV wants (height, width, BGR)
+            frame = np.ascontiguousarray(surfarray.pixels3d(surface).transpose(1, 0, 2)[:, :, ::-1])
+            if caption:
+                text = f"seed {seed}  step {t}/{len(replay)}  score {env.score}  failed {len(env.failed_orders)}"
+                cv2.putText(frame, text, (8, height - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1, cv2.LINE_AA)
+            writer.write(frame)
+    finally:
+        writer.release()
+    os.replace(tmp_path, out_path)
+    return {"seed": int(seed), "path": out_path, "frames": len(replay) + 1}
+
+
+# Function: Process-pool initializer, every worker renders into its own dummy display
+def _init_worker():
+    init_headless_pygame()
+
+
+def _render_job(job):
+    return render_episode_video(*job)
+
+
+# Function: Hard-link `src` to `dst` (a copy where links are not supported), replacing `dst`
+def _link_or_copy(src, dst):
+    if os.path.exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+# Function: Record the worst and/or best `n` episodes of each rollout directory (e.g. one
+# --export-rollouts directory per checkpoint) to <out_dir>/<rollout name>/<which>_<rank>_seed<seed>.mp4,
+# spreading the episodes over `workers` processes. Returns one entry per video. An episode that is
+# both among the worst and the best (fewer than 2*n episodes) is rendered once and linked.
+def record_videos(rollout_dirs, out_dir, n=5, which=("worst", "best"), fps=30, workers=1, caption=True):
+    jobs = []
+    links = []
+    for rollout_dir in rollout_dirs:
+        index = RolloutReader(rollout_dir).index
+        name = os.path.basename(os.path.normpath(rollout_dir))
+        rendered = {}
+        for kind in which:
+            for rank, row in enumerate(select_episodes(index, n, kind), start=1):
+                path = os.path.join(out_dir, name, f"{kind}_{rank:02d}_seed{row['seed']}.mp4")
+                if row["seed"] in rendered:
+                    links.append((rendered[row["seed"]], path))
+                    continue
+                rendered[row["seed"]] = path
+                jobs.append((rollout_dir, row["seed"], path, fps, caption))
+
+    if workers <= 1:
+        init_headless_pygame()
+        videos = [_render_job(job) for job in jobs]
+    else:
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker) as pool:
+            videos = list(pool.map(_render_job, jobs))
+
+    by_path = {video["path"]: video for video in videos}
+    for src, dst in links:
+        _link_or_copy(src, dst)
+        videos.append(dict(by_path[src], path=dst))
+    return videos
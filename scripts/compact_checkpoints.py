@@ -0,0 +1,39 @@
+import os
+import sys
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.checkpointing import plan_retention, compact_checkpoint
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compact old RLlib checkpoints to policy weights only (enough for evaluation and sweeps)"
+    )
+    parser.add_argument("--model-dir", type=str, nargs="+", required=True, help="Run directories, e.g. models/ppo_decentralised_level_2")
+    parser.add_argument("--keep-last", type=int, default=2, help="Newest checkpoints to keep in full, so training can resume")
+    parser.add_argument("--keep-steps", type=int, nargs="+", default=[], help="Checkpoint steps to keep in full as well")
+    parser.add_argument("--dry-run", action="store_true", default=False, help="List what would be compacted")
+    args = parser.parse_args()
+
+    total = 0
+    for model_dir in args.model_dir:
+        ckpt_root = os.path.join(model_dir, "checkpoints")
+        keep, compact = plan_retention(ckpt_root, args.keep_last, args.keep_steps)
+        print(f"{model_dir}: keeping {len(keep)} full checkpoint(s) {[step for step, _ in keep]}, compacting {len(compact)}")
+
+        for step, path in compact:
+            if args.dry_run:
+                print(f"  would compact checkpoint_{step}")
+                continue
+            freed = compact_checkpoint(path)
+            total += freed
+            print(f"  compacted checkpoint_{step} ({freed / 2**20:.1f} MiB freed)")
+
+    if not args.dry_run:
+        print(f"\nFreed {total / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import os
+import sys
+import time
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evaluation.video import record_videos
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Render the worst/best exported eval episodes to MP4, headless")
+    parser.add_argument("rollouts", nargs="+", help="Rollout directories written by --export-rollouts (one per checkpoint and level)")
+    parser.add_argument("--out-dir", type=str, default="videos")
+    parser.add_argument("--n", type=int, default=5, help="Episodes per directory and kind")
+    parser.add_argument("--which", nargs="+", choices=["worst", "best"], default=["worst", "best"])
+    parser.add_argument("--fps", type=int, default=30, help="Frame rate of the videos (rendering itself is not throttled)")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 1) - 1))
+    parser.add_argument("--no-caption", action="store_false", dest="caption", help="Leave out the step/score line")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    start = time.perf_counter()
+    videos = record_videos(args.rollouts, args.out_dir, n=args.n, which=args.which,
+                           fps=args.fps, workers=args.workers, caption=args.caption)
+    elapsed = time.perf_counter() - start
+    frames = sum(v["frames"] for v in videos)
+    for video in videos:
+        print(video["path"])
+    print(f"{len(videos)} videos, {frames} frames in {elapsed:.1f}s ({frames / max(elapsed, 1e-9):.0f} frames/s)")
+
+
+if __name__ == "__main__":
+    main()
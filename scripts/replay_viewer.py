@@ -0,0 +1,236 @@
+import sys
+import os
+import argparse
+import bisect
+import pygame
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from environment.rollouts import RolloutReader
+from environment.replay import EpisodeReplay, MISTAKE_EVENTS, event_steps
+
+# Colors for the UI
+WHITE = (255, 255, 255)
+GREY = (120, 120, 140)
+RED = (255, 50, 50)
+GREEN = (50, 255, 50)
+YELLOW = (200, 200, 0)
+DARK_BG = (20, 20, 30)
+
+PANEL_WIDTH = 260
+TIMELINE_HEIGHT = 40
+
+# Steps moved by Left/Right with shift held, and by Page Up/Down
+BIG_STEP = 50
+
+HELP = [
+    "Space  play / pause",
+    "Left/Right  step (shift: 50)",
+    "PgUp/PgDn  50 steps",
+    "Home/End  start / end",
+    "[ / ]  previous / next event",
+    "+ / -  playback speed",
+    "Click timeline  seek",
+]
+
+
+# Function: Draw text on the screen
+def draw_text(screen, text, x, y, size=18, color=WHITE):
+    font = pygame.font.SysFont("consolas", size, bold=True)
+    img = font.render(text, True, color)
+    screen.blit(img, (x, y))
+
+
+# Function: Step positions of the chosen events, merged and sorted, for [ / ] jumps
+def jump_targets(events):
+    return sorted({int(t) for steps in events.values() for t in steps})
+
+
+# Function: Timeline along the bottom: position marker plus a tick per event
+def draw_timeline(screen, rect, t, length, events):
+    x0, y0, width, height = rect
+    pygame.draw.rect(screen, (45, 45, 60), rect)
+    for steps in events.values():
+        for step in steps:
+            x = x0 + int(width * step / max(1, length))
+            pygame.draw.line(screen, RED, (x, y0 + 4), (x, y0 + height - 4), 1)
+    x = x0 + int(width * t / max(1, length))
+    pygame.draw.rect(screen, YELLOW, (x - 2, y0, 4, height))
+
+
+# Function: Info panel for the step on screen
+def draw_panel(screen, x, replay, episode, events, playing, speed):
+    env = replay.env
+    row = episode["index"]
+    t = replay.t
+    gap = 22
+    y = 15
+
+    draw_text(screen, "REPLAY", x, y, color=YELLOW)
+    y += int(gap * 1.5)
+    draw_text(screen, f"Seed: {row['seed']} (env {row['env_seed']})", x, y, size=16)
+    y += gap
+    draw_text(screen, f"Step: {t} / {len(replay)}", x, y)
+    y += gap
+    draw_text(screen, f"{'Playing' if playing else 'Paused'} x{speed}", x, y, size=16, color=GREY)
+    y += int(gap * 1.5)
+
+    last_reward = float(episode["rewards"][t - 1]) if t else 0.0
+    total_reward = float(episode["rewards"][:t].sum())
+    reward_color = GREEN if last_reward > 0 else (RED if last_reward < 0 else WHITE)
+    draw_text(screen, f"Score: {env.score}  Failed: {len(env.failed_orders)}", x, y)
+    y += gap
+    draw_text(screen, f"Last Rw: {last_reward:.4f}", x, y, color=reward_color)
+    y += gap
+    draw_text(screen, f"Total Rw: {total_reward:.2f}", x, y)
+    y += int(gap * 1.5)
+
+    if t:
+        a1, a2 = episode["actions"][t - 1]
+        draw_text(screen, f"Actions: A1 {a1}  A2 {a2}", x, y)
+        y += gap
+    draw_text(screen, f"Pot: {env.pot_state} ({env.pot_timer})", x, y)
+    y += gap
+    draw_text(screen, f"A1 Hold: {env.agent1_holding}", x, y, size=16)
+    y += gap
+    draw_text(screen, f"A2 Hold: {env.agent2_holding}", x, y, size=16)
+    y += int(gap * 1.5)
+
+    # Events at this step
+    here = [name for name, steps in events.items() if t in steps]
+    for name in here:
+        draw_text(screen, name, x, y, size=16, color=RED)
+        y += gap
+    if here:
+        y += gap // 2
+
+    for line in HELP:
+        draw_text(screen, line, x, y, size=14, color=GREY)
+        y += 18
+
+
+# Function: Open an exported episode and browse it. Every frame is rebuilt from the
+# recorded actions and env snapshots, so no checkpoint or policy is loaded.
+def view(rollout_dir, seed=None, events=None, start=0, snapshot_every=1, fps=30):
+    reader = RolloutReader(rollout_dir)
+    if len(reader) == 0:
+        print(f"No episodes in {rollout_dir}")
+        return
+    episode = reader.episode(reader.seeds[0] if seed is None else seed)
+
+    # Sprites are loaded with convert_alpha, which needs a display before the env exists
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    replay = EpisodeReplay.from_rollout(episode, snapshot_every=snapshot_every, render=True)
+    env = replay.env
+    event_marks = event_steps(episode, events)
+    targets = jump_targets(event_marks)
+
+    grid_w = env.grid_width * env.tile_size
+    grid_h = env.grid_height * env.tile_size + env.header_size
+    screen_w = grid_w + PANEL_WIDTH
+    screen_h = max(grid_h, 560) + TIMELINE_HEIGHT
+    screen = pygame.display.set_mode((screen_w, screen_h))
+    pygame.display.set_caption(f"Replay {os.path.basename(rollout_dir.rstrip('/'))} seed {episode['index']['seed']}")
+    timeline = (10, screen_h - TIMELINE_HEIGHT + 8, screen_w - 20, TIMELINE_HEIGHT - 16)
+
+    replay.seek(start)
+    clock = pygame.time.Clock()
+    running = True
+    playing = False
+    speed = 1
+    dragging = False
+    drawn_t = None
+
+    while running:
+        target = replay.t
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                big = event.mod & pygame.KMOD_SHIFT
+                if event.key == pygame.K_SPACE:
+                    playing = not playing
+                elif event.key == pygame.K_RIGHT:
+                    target += BIG_STEP if big else 1
+                elif event.key == pygame.K_LEFT:
+                    target -= BIG_STEP if big else 1
+                elif event.key == pygame.K_PAGEDOWN:
+                    target += BIG_STEP
+                elif event.key == pygame.K_PAGEUP:
+                    target -= BIG_STEP
+                elif event.key == pygame.K_HOME:
+                    target = 0
+                elif event.key == pygame.K_END:
+                    target = len(replay)
+                elif event.key == pygame.K_RIGHTBRACKET:
+                    i = bisect.bisect_right(targets, replay.t)
+                    target = targets[i] if i < len(targets) else target
+                elif event.key == pygame.K_LEFTBRACKET:
+                    i = bisect.bisect_left(targets, replay.t) - 1
+                    target = targets[i] if i >= 0 else target
+                elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                    speed = min(speed * 2, 64)
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    speed = max(speed // 2, 1)
+                elif event.key == pygame.K_ESCAPE:
+                    running = False
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                dragging = pygame.Rect(timeline).collidepoint(event.pos)
+            elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+                dragging = False
+
+            if dragging and event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION):
+                target = round((event.pos[0] - timeline[0]) / timeline[2] * len(replay))
+                playing = False
+
+        if playing:
+            target += speed
+            if target >= len(replay):
+                playing = False
+
+        replay.seek(min(max(target, 0), len(replay)))
+
+        # Only redraw when something on screen changes
+        if (replay.t, playing, speed) != drawn_t:
+            screen.fill(DARK_BG)
+            env.render(screen)
+            draw_panel(screen, grid_w + 15, replay, episode, event_marks, playing, speed)
+            draw_timeline(screen, timeline, replay.t, len(replay), event_marks)
+            pygame.display.flip()
+            drawn_t = (replay.t, playing, speed)
+
+        clock.tick(fps)
+
+    pygame.quit()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Browse an exported episode (see --export-rollouts) without loading the policy")
+    parser.add_argument("rollouts", type=str, help="Rollout directory with index.csv and chunk_*.npz")
+    parser.add_argument("--seed", type=int, default=None, help="Episode seed (default: the first episode in the index)")
+    parser.add_argument("--events", nargs="+", default=list(MISTAKE_EVENTS),
+                        help="Events marked on the timeline and visited by [ and ]")
+    parser.add_argument("--start", type=int, default=0, help="Step to open at")
+    parser.add_argument("--snapshot-every", type=int, default=1,
+                        help="Steps between env snapshots (1: instant seeking, more: less memory)")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--list", action="store_true", default=False, help="List the episodes in the directory and exit")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.list:
+        for row in RolloutReader(args.rollouts).index:
+            print(f"seed {row['seed']}: {row['length']} steps, score {row['score']}, "
+                  f"failed {row['failed_orders']}, reward {row['total_reward']:.2f}")
+        return
+
+    view(args.rollouts, seed=args.seed, events=args.events, start=args.start,
+         snapshot_every=args.snapshot_every, fps=args.fps)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import os
+import sys
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evaluation.engine import init_headless_pygame
+from benchmarks.env_cases import run_suite, LEVEL_NAMES, STACK_NS
+from benchmarks.memory_cases import run_memory_suite
+from benchmarks.harness import write_results, load_results, compare_to_baseline, print_comparison, machine_speed_ratio
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "baseline.json")
+
+
+# Function: Parse PATTERN=FRACTION threshold overrides
+def parse_overrides(items):
+    overrides = []
+    for item in items or []:
+        pattern, _, value = item.rpartition("=")
+        if not pattern:
+            raise argparse.ArgumentTypeError(f"Expected PATTERN=FRACTION, got {item}")
+        overrides.append((pattern, float(value)))
+    return overrides
+
+
+# Function: One line per memory case, the numbers that matter for each kind
+def print_memory_case(case_id, stats):
+    if "peak_bytes_mean" in stats:
+        detail = (f"peak {stats['peak_bytes_mean']:>9.0f} B/step  net {stats['net_bytes_mean']:>7.1f} B/step  "
+                  f"blocks {stats['net_blocks_mean']:>6.2f}/step")
+    elif "envs_per_gib" in stats:
+        per_gib = f"{stats['envs_per_gib']:.0f}" if stats["envs_per_gib"] else "n/a"
+        detail = (f"rss {stats['rss_per_env_kib']:>8.1f} KiB/env  heap {stats['heap_per_env_kib']:>8.1f} KiB/env  "
+                  f"~{per_gib} envs/GiB")
+    else:
+        carried = {k: v for k, v in stats["container_max_after_reset"].items() if v and k != "pending_orders"}
+        detail = (f"{stats['episodes']} episodes  {stats['blocks_per_1k_episodes']:+.1f} blocks/1k ep  "
+                  f"rss {stats['retained_rss_mib_end']:+.2f} MiB  carried over: {carried or 'none'}")
+    print(f"{case_id:<60} {detail}")
+
+
+# Function: Memory mode, reports only (no baseline, allocation counts do not drift with machine speed)
+def run_memory_mode(args):
+    results = run_memory_suite(args.levels, args.stack_n[0], args.scale, args.seed, args.only, print_memory_case)
+    out = args.out or "benchmarks/results/memory.json"
+    write_results(out, results)
+    print(f"\nWrote {len(results['cases'])} cases to {out}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode", choices=["speed", "memory"], default="speed",
+                        help="memory: per-step allocations, memory per env and retention across episodes")
+    parser.add_argument("--levels", nargs="+", default=list(LEVEL_NAMES))
+    parser.add_argument("--stack-n", nargs="+", type=int, default=None,
+                        help=f"Frame stack sizes (speed mode default {list(STACK_NS)}, memory mode uses the first, default 4)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier on the number of timed calls per case")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per case, the fastest median is kept")
+    parser.add_argument("--only", nargs="+", default=None, help="fnmatch patterns on case ids, e.g. 'coopenv.*'")
+    parser.add_argument("--out", type=str, default=None,
+                        help="Results file (default benchmarks/results/latest.json, or memory.json in memory mode)")
+
+    parser.add_argument("--baseline", type=str, default=DEFAULT_BASELINE)
+    parser.add_argument("--no-compare", action="store_true", default=False)
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="Allowed drop in throughput before a case counts as a regression (fraction)")
+    parser.add_argument("--case-threshold", nargs="+", default=None, metavar="PATTERN=FRACTION",
+                        help="Per-case thresholds, first matching pattern wins")
+    parser.add_argument("--normalise", action="store_true", default=False,
+                        help="Scale throughput by each run's calibration speed, for comparing across machines")
+    parser.add_argument("--update-baseline", action="store_true", default=False)
+
+    args = parser.parse_args()
+    overrides = parse_overrides(args.case_threshold)
+
+    init_headless_pygame()
+
+    if args.mode == "memory":
+        args.stack_n = args.stack_n or [4]
+        run_memory_mode(args)
+        return
+
+    args.stack_n = args.stack_n or list(STACK_NS)
+    args.out = args.out or "benchmarks/results/latest.json"
+
+    def progress(case_id, stats):
+        print(f"{case_id:<55} {stats['median_per_sec']:>12.0f}/s  p50 {stats['p50_us']:>9.1f}us  p99 {stats['p99_us']:>9.1f}us")
+
+    results = run_suite(args.levels, args.stack_n, args.scale, args.seed, args.only, progress, args.repeats)
+    write_results(args.out, results)
+    print(f"\nWrote {len(results['cases'])} cases to {args.out}")
+
+    if args.update_baseline:
+        write_results(args.baseline, results)
+        print(f"Updated baseline {args.baseline}")
+        return
+
+    if args.no_compare or not os.path.exists(args.baseline):
+        return
+
+    baseline = load_results(args.baseline)
+    normalise = args.normalise
+    rows, regressions = compare_to_baseline(results, baseline, args.threshold, overrides, normalise=normalise)
+
+    # Cases filtered out with --only are not missing
+    if args.only:
+        rows = [r for r in rows if r["status"] != "missing"]
+    print(f"\nCompared against {args.baseline}")
+    ratio = machine_speed_ratio(results, baseline)
+    if normalise and ratio is not None:
+        print(f"Machine speed vs baseline: {ratio:.2f}x (throughput normalised by this)")
+    print_comparison(rows)
+
+    if regressions:
+        print(f"\n{len(regressions)} case(s) regressed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
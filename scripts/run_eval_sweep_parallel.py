@@ -11,7 +11,7 @@ def build_checkpoint_steps(start_step, end_step, step_size):
 
 
 def build_command(python_bin, script_path, checkpoint_path, episodes, seed, level, stack_n,
-                  deterministic, out_dir, max_steps_cap):
+                  deterministic, out_dir, max_steps_cap, extra_args=None):
     cmd = [
         python_bin,
         script_path,
@@ -31,9 +31,49 @@ def build_command(python_bin, script_path, checkpoint_path, episodes, seed, leve
     if max_steps_cap is not None:
         cmd.extend(["--max-steps-cap", str(max_steps_cap)])
 
+    if extra_args:
+        cmd.extend(extra_args)
+
     return cmd
 
 
+# Function: Run (step, cmd, log_file) jobs with at most max_jobs at once, returning the failures
+def run_jobs(jobs, max_jobs):
+    env = os.environ.copy()
+    env.pop("RAY_ADDRESS", None)
+
+    running = []
+    pending = list(jobs)
+    failures = []
+
+    while pending or running:
+        while pending and len(running) < max_jobs:
+            step, cmd, log_file = pending.pop(0)
+            f = open(log_file, "w")
+            proc = subprocess.Popen(cmd, stdout=f, stderr=subprocess.STDOUT, env=env)
+            running.append((step, proc, f, log_file))
+            print(f"Started checkpoint_{step}")
+
+        still_running = []
+        for step, proc, f, log_file in running:
+            ret = proc.poll()
+            if ret is None:
+                still_running.append((step, proc, f, log_file))
+                continue
+
+            f.close()
+            if ret == 0:
+                print(f"Finished checkpoint_{step}")
+            else:
+                print(f"FAILED checkpoint_{step} (exit {ret}) -> {log_file}")
+                failures.append((step, ret, log_file))
+
+        running = still_running
+        time.sleep(1)
+
+    return failures
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--model-dir", type=str, required=True)
@@ -91,37 +131,7 @@ def main():
         print("No valid checkpoints found.")
         sys.exit(1)
 
-    env = os.environ.copy()
-    env.pop("RAY_ADDRESS", None)
-
-    running = []
-    pending = jobs.copy()
-    failures = []
-
-    while pending or running:
-        while pending and len(running) < args.max_jobs:
-            step, cmd, log_file = pending.pop(0)
-            f = open(log_file, "w")
-            proc = subprocess.Popen(cmd, stdout=f, stderr=subprocess.STDOUT, env=env)
-            running.append((step, proc, f, log_file))
-            print(f"Started checkpoint_{step}")
-
-        still_running = []
-        for step, proc, f, log_file in running:
-            ret = proc.poll()
-            if ret is None:
-                still_running.append((step, proc, f, log_file))
-                continue
-
-            f.close()
-            if ret == 0:
-                print(f"Finished checkpoint_{step}")
-            else:
-                print(f"FAILED checkpoint_{step} (exit {ret}) -> {log_file}")
-                failures.append((step, ret, log_file))
-
-        running = still_running
-        time.sleep(1)
+    failures = run_jobs(jobs, args.max_jobs)
 
     if failures:
         print("\nSome evaluations failed:")
@@ -0,0 +1,72 @@
+import os
+import sys
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evaluation.engine import init_headless_pygame
+from benchmarks.rllib_cases import run_sampling_sweep, sweep_grid, TRAIN_SETUPS, SWEEP
+from benchmarks.harness import write_results
+
+
+# Function: One line per swept config
+def print_run(run):
+    settings = (f"{run['setup']:<20} runners={run['num_env_runners']:<2} envs={run['num_envs_per_env_runner']:<3} "
+                f"fragment={run['rollout_fragment_length']:<5}")
+    if run["status"] != "ok":
+        print(f"{settings} invalid: {run['error']}")
+        return
+    print(
+        f"{settings} {run['env_steps_per_sec']:>8.0f} steps/s  sampling {run['sampling_steps_per_sec']:>8.0f} steps/s  "
+        f"sample {run['sample_share']:>4.0%}  learn {run['learn_share']:>4.0%}  sync {run['sync_weights_share']:>4.0%}  "
+        f"other {run['other_share']:>4.0%}  checkpoint {run['checkpoint_s']:.2f}s (async stall {run['checkpoint_stall_s']:.2f}s)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sampling and learning throughput of the RLlib training configs")
+    parser.add_argument("--setups", nargs="+", choices=list(TRAIN_SETUPS), default=list(TRAIN_SETUPS))
+    parser.add_argument("--level", type=str, default=None, help="Level for every setup (default: the level each script trains on)")
+    parser.add_argument("--num-env-runners", nargs="+", type=int, default=list(SWEEP["num_env_runners"]))
+    parser.add_argument("--num-envs-per-env-runner", nargs="+", type=int, default=list(SWEEP["num_envs_per_env_runner"]))
+    parser.add_argument("--rollout-fragment-length", nargs="+", type=int, default=list(SWEEP["rollout_fragment_length"]))
+    parser.add_argument("--train-batch-size", type=int, default=None, help="Override the training batch (default 4096 * 8)")
+    parser.add_argument("--iterations", type=int, default=2, help="Timed training iterations per config")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed training iterations per config")
+    parser.add_argument("--checkpoints", type=int, default=1, help="Timed checkpoint saves per config")
+    parser.add_argument("--out", type=str, default="benchmarks/results/rllib_sampling.json")
+    parser.add_argument("--verbose", action="store_true", default=False, help="Keep RLlib and env output")
+
+    args = parser.parse_args()
+    init_headless_pygame()
+
+    grid = sweep_grid(args.num_env_runners, args.num_envs_per_env_runner, args.rollout_fragment_length)
+    print(f"{len(args.setups)} setup(s) x {len(grid)} sampling configs, {args.iterations} timed iteration(s) each\n")
+
+    results = run_sampling_sweep(
+        setups=args.setups,
+        grid=grid,
+        level_name=args.level,
+        iterations=args.iterations,
+        warmup=args.warmup,
+        checkpoints=args.checkpoints,
+        train_batch_size=args.train_batch_size,
+        progress=print_run,
+        quiet=not args.verbose,
+    )
+    write_results(args.out, results)
+
+    # Fastest valid config per setup
+    print()
+    for setup in args.setups:
+        runs = [r for r in results["runs"] if r["setup"] == setup and r["status"] == "ok"]
+        if runs:
+            best = max(runs, key=lambda r: r["env_steps_per_sec"])
+            print(f"Best for {setup}: num_env_runners={best['num_env_runners']} "
+                  f"num_envs_per_env_runner={best['num_envs_per_env_runner']} "
+                  f"rollout_fragment_length={best['rollout_fragment_length']} ({best['env_steps_per_sec']:.0f} env steps/s)")
+    print(f"\nWrote {len(results['runs'])} runs to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
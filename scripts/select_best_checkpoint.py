@@ -0,0 +1,145 @@
+import os
+import sys
+import json
+import shutil
+import argparse
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evaluation.selection import successive_halving, budget_schedule, round_summaries, VALIDATION_SEED_START, VALIDATION_EPISODES
+from run_eval_sweep_parallel import build_checkpoint_steps, build_command, run_jobs
+
+
+# Function: Pick the eval script that matches a run directory name
+def infer_eval_script(run_name):
+    if run_name.startswith("ppo_decentralised_comms_"):
+        return "scripts/eval_decentralised_comms_rllib.py"
+    if run_name.startswith("ppo_decentralised_"):
+        return "scripts/eval_decentralised_rllib.py"
+    if run_name.startswith("ppo_centralised_"):
+        return "scripts/eval_centralised_rllib.py"
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model-dir", type=str, required=True)
+    parser.add_argument("--level", type=str, required=True)
+    parser.add_argument("--out-dir", type=str, default=None)
+    parser.add_argument("--stack-n", type=int, default=4)
+    parser.add_argument("--max-steps-cap", type=int, default=None)
+
+    parser.add_argument("--start-step", type=int, default=500_000)
+    parser.add_argument("--end-step", type=int, default=10_000_000)
+    parser.add_argument("--step-size", type=int, default=500_000)
+
+    parser.add_argument("--min-budget", type=int, default=32)
+    parser.add_argument("--max-budget", type=int, default=VALIDATION_EPISODES)
+    parser.add_argument("--keep-fraction", type=float, default=0.5)
+
+    parser.add_argument("--max-jobs", type=int, default=4)
+    parser.add_argument("--python-bin", type=str, default=sys.executable)
+    parser.add_argument("--eval-script", type=str, default=None)
+    parser.add_argument("--no-write-best", action="store_true", default=False)
+
+    args = parser.parse_args()
+
+    model_dir = Path(args.model_dir).resolve()
+    run_name = model_dir.name
+    ckpt_root = model_dir / "checkpoints"
+
+    eval_script = args.eval_script or infer_eval_script(run_name)
+    if eval_script is None:
+        print(f"Could not infer the eval script for {run_name}, pass --eval-script")
+        sys.exit(1)
+
+    # Kept apart from the full-sweep CSVs and summaries the plotting scripts read
+    out_dir = Path(args.out_dir or os.path.join("eval_sweeps", run_name, "selection")).resolve()
+    logs_dir = out_dir / "logs"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    logs_dir.mkdir(parents=True, exist_ok=True)
+
+    steps = []
+    for step in build_checkpoint_steps(args.start_step, args.end_step, args.step_size):
+        if (ckpt_root / f"checkpoint_{step}").exists():
+            steps.append(step)
+        else:
+            print(f"Skipping missing checkpoint: {ckpt_root / f'checkpoint_{step}'}")
+
+    if not steps:
+        print("No valid checkpoints found.")
+        sys.exit(1)
+
+    # Function: Evaluate the given checkpoints on the first `budget` validation seeds.
+    # Eval scripts run with --resume, so a survivor only plays the seeds it has not seen yet.
+    def evaluate(round_steps, budget):
+        jobs = []
+        for step in round_steps:
+            cmd = build_command(
+                python_bin=args.python_bin,
+                script_path=eval_script,
+                checkpoint_path=ckpt_root / f"checkpoint_{step}",
+                episodes=budget,
+                seed=VALIDATION_SEED_START,
+                level=args.level,
+                stack_n=args.stack_n,
+                deterministic=True,
+                out_dir=out_dir,
+                max_steps_cap=args.max_steps_cap,
+                extra_args=["--resume"],
+            )
+            log_file = logs_dir / f"eval_checkpoint_{step}_budget_{budget}.log"
+            jobs.append((step, cmd, log_file))
+
+        print(f"\nBudget {budget}: evaluating {len(jobs)} checkpoints")
+        failures = run_jobs(jobs, args.max_jobs)
+        if failures:
+            for step, ret, log_file in failures:
+                print(f"  checkpoint_{step}: exit {ret} ({log_file})")
+            sys.exit(1)
+
+        # Scored on this budget's seeds only
+        return round_summaries(out_dir, round_steps, args.level, budget)
+
+    winner, history = successive_halving(
+        steps,
+        evaluate,
+        min_budget=args.min_budget,
+        max_budget=args.max_budget,
+        keep_fraction=args.keep_fraction,
+    )
+
+    episodes_run = 0
+    prev_budget = 0
+    for rnd in history:
+        episodes_run += len(rnd["evaluated"]) * (rnd["budget"] - prev_budget)
+        prev_budget = rnd["budget"]
+    full_sweep = len(steps) * args.max_budget
+
+    selection = {
+        "run": run_name,
+        "level": args.level,
+        "best_step": int(winner),
+        "budgets": budget_schedule(args.min_budget, args.max_budget),
+        "keep_fraction": args.keep_fraction,
+        "episodes_run": int(episodes_run),
+        "full_sweep_episodes": int(full_sweep),
+        "rounds": history,
+    }
+
+    with open(out_dir / f"selection_{args.level}.json", "w") as f:
+        json.dump(selection, f, indent=2)
+
+    print(f"\nBest checkpoint: checkpoint_{winner} ({episodes_run} episodes vs {full_sweep} for a full sweep)")
+
+    if not args.no_write_best:
+        best_dir = ckpt_root / "best_checkpoint"
+        if best_dir.exists():
+            shutil.rmtree(best_dir)
+        shutil.copytree(ckpt_root / f"checkpoint_{winner}", best_dir)
+        print(f"Copied checkpoint_{winner} -> {best_dir}")
+
+
+if __name__ == "__main__":
+    main()
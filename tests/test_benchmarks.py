@@ -0,0 +1,77 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+
+from benchmarks.harness import summarise_latencies, compare_to_baseline, action_stream
+from benchmarks.env_cases import run_suite
+
+
+def test_latency_summary_percentiles_and_throughput():
+    stats = summarise_latencies(np.full(100, 2_000, dtype=np.int64))
+
+    assert stats["calls"] == 100
+    assert stats["p50_us"] == stats["p99_us"] == 2.0
+    assert abs(stats["per_sec"] - 500_000) < 1e-6
+
+
+def test_action_stream_is_seeded():
+    assert np.array_equal(action_stream(50, seed=3), action_stream(50, seed=3))
+    assert not np.array_equal(action_stream(50, seed=3), action_stream(50, seed=4))
+
+
+def test_compare_flags_only_drops_beyond_threshold():
+    baseline = {"cases": {"a": {"median_per_sec": 1000.0}, "b": {"median_per_sec": 1000.0}, "gone": {"median_per_sec": 1.0}}}
+    current = {"cases": {"a": {"median_per_sec": 900.0}, "b": {"median_per_sec": 700.0}, "new": {"median_per_sec": 1.0}}}
+
+    rows, regressions = compare_to_baseline(current, baseline, threshold=0.15)
+    status = {r["case"]: r["status"] for r in rows}
+    assert status == {"a": "ok", "b": "regressed", "new": "new", "gone": "missing"}
+    assert [r["case"] for r in regressions] == ["b"]
+
+    # a looser per-case threshold lets b through
+    _, regressions = compare_to_baseline(current, baseline, threshold=0.15, overrides=[("b", 0.5)])
+    assert regressions == []
+
+
+def test_suite_runs_selected_cases():
+    results = run_suite(levels=["level_1"], stack_ns=[4], scale=0.01, only=["coopenv.*", "rllib_centralised.step*"])
+
+    assert set(results["cases"]) == {
+        "coopenv.step[level_1]",
+        "coopenv.reset[level_1]",
+        "rllib_centralised.step[level_1,stack_n=4]",
+    }
+    assert results["machine"]["cpu_count"]
+    for stats in results["cases"].values():
+        assert stats["per_sec"] > 0
+
+
+def test_memory_retention_keeps_episode_containers_bounded():
+    from benchmarks.memory_cases import bench_retention, bench_step_allocations
+
+    stats = bench_retention("coopenv", "level_1", 4, episodes=20)
+    assert stats["episodes"] == 20
+    assert stats["container_max_after_reset"] == {
+        "pending_orders": 3, "active_orders": 0, "completed_orders": 0, "failed_orders": 0, "wall_items": 0,
+    }
+    assert stats["container_max_at_episode_end"]["failed_orders"] <= 3
+
+    alloc = bench_step_allocations("rllib_centralised", "level_1", 4, steps=20)
+    assert alloc["steps"] == 20
+    assert alloc["peak_bytes_mean"] > 0
+
+
+def test_sampling_sweep_builds_training_configs_with_overrides():
+    from benchmarks.rllib_cases import build_training_config, sweep_grid
+
+    cfg = build_training_config("decentralised")
+    assert (cfg.num_env_runners, cfg.num_envs_per_env_runner, cfg.rollout_fragment_length) == (0, 8, 4096)
+    assert cfg.train_batch_size == 4096 * 8
+    assert cfg.env_config["level_name"] == "level_2"
+
+    grid = sweep_grid([0, 2], [4, 8], [512, 1024, 4096])
+    assert len(grid) == 12
+    cfg = build_training_config("centralised", "level_1", **grid[-1])
+    assert (cfg.num_env_runners, cfg.num_envs_per_env_runner, cfg.rollout_fragment_length) == (2, 8, 4096)
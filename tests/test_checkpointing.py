@@ -0,0 +1,90 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import threading
+import numpy as np
+import pytest
+
+from agents.checkpointing import AsyncCheckpointWriter, latest_checkpoint, write_checkpoint
+
+class _FakeAlgo:
+    def __init__(self):
+        self.weights = np.zeros(4)
+
+    def __getstate__(self):
+        return {"iteration": 1, "worker": {"policy_states": {"default_policy": {"weights": self.weights}}}}
+
+def test_writer_snapshots_state_and_surfaces_write_errors():
+    algo = _FakeAlgo()
+    release = threading.Event()
+    written = []
+
+    def slow_write(checkpoint_dir, state, policy_states, env_rng):
+        release.wait()
+        if checkpoint_dir == "bad":
+            raise OSError("disk full")
+        written.append((checkpoint_dir, policy_states["default_policy"]["weights"].copy()))
+
+    writer = AsyncCheckpointWriter(max_pending=2, write_fn=slow_write)
+    writer.save(algo, "checkpoint_1")
+    algo.weights += 1.0  # training goes on while the write is pending
+    writer.save(algo, "checkpoint_2")
+    release.set()
+    writer.flush()
+
+    assert [d for d, _ in written] == ["checkpoint_1", "checkpoint_2"]
+    assert written[0][1].tolist() == [0.0] * 4
+    assert written[1][1].tolist() == [1.0] * 4
+
+    writer.save(algo, "bad")
+    with pytest.raises(RuntimeError, match="checkpoint failed"):
+        writer.close()
+
+def test_written_checkpoint_has_the_rllib_layout(tmp_path):
+    pytest.importorskip("ray")
+    from ray.rllib.utils.checkpoints import get_checkpoint_info
+
+    ckpt = tmp_path / "checkpoint_500000"
+    write_checkpoint(str(ckpt), {"worker": {}}, {"agent_1_policy": {"weights": {}}, "agent_2_policy": {"weights": {}}})
+
+    assert not (tmp_path / "checkpoint_500000.tmp").exists()
+    info = get_checkpoint_info(str(ckpt))
+    assert info["type"] == "Algorithm"
+    assert info["policy_ids"] == {"agent_1_policy", "agent_2_policy"}
+    assert get_checkpoint_info(str(ckpt / "policies" / "agent_1_policy"))["type"] == "Policy"
+
+def test_latest_checkpoint_skips_incomplete_directories(tmp_path):
+    assert latest_checkpoint(str(tmp_path / "missing")) is None
+    for name in ("checkpoint_500000", "checkpoint_1500000", "checkpoint_2000000.tmp", "checkpoint_3000000", "best_checkpoint"):
+        (tmp_path / name).mkdir()
+    for name in ("checkpoint_500000", "checkpoint_1500000", "checkpoint_2000000.tmp", "best_checkpoint"):
+        (tmp_path / name / "rllib_checkpoint.json").write_text("{}")
+
+    # checkpoint_3000000 has no rllib_checkpoint.json: interrupted before it finished
+    assert latest_checkpoint(str(tmp_path)) == (1_500_000, str(tmp_path / "checkpoint_1500000"))
+
+def test_retention_compacts_older_checkpoints_to_weights_only(tmp_path):
+    pytest.importorskip("ray")
+    import ray.cloudpickle as cloudpickle
+    from agents.checkpointing import apply_retention, is_weights_only
+
+    for step in (500_000, 1_000_000, 1_500_000):
+        policy_state = {"weights": {"w": np.full(8, step, dtype=np.float32)}, "_optimizer_variables": [np.zeros(8)]}
+        write_checkpoint(str(tmp_path / f"checkpoint_{step}"), {"worker": {}}, {"default_policy": policy_state}, {"1/0": {}})
+
+    compacted = apply_retention(str(tmp_path), keep_last=1, keep_steps=[500_000])
+    assert [step for step, _, _ in compacted] == [1_000_000]
+    assert compacted[0][2] > 0
+
+    ckpt = tmp_path / "checkpoint_1000000"
+    assert is_weights_only(str(ckpt))
+    assert sorted(os.listdir(ckpt)) == ["policies", "weights_only.json"]
+    with open(ckpt / "policies" / "default_policy" / "policy_state.pkl", "rb") as f:
+        state = cloudpickle.load(f)
+    assert "_optimizer_variables" not in state
+    assert state["weights"]["w"][0] == 1_000_000
+
+    # Training resumes from the newest full checkpoint; compacted ones are skipped
+    assert latest_checkpoint(str(tmp_path)) == (1_500_000, str(tmp_path / "checkpoint_1500000"))
+    assert not is_weights_only(str(tmp_path / "checkpoint_500000"))
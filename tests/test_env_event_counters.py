@@ -0,0 +1,107 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from environment.env import CoopEnv, EVENT_NAMES, EVENT_INDEX
+
+LEVEL = [
+    "###S#######",
+    "#    #    #",
+    "#    #    #",
+    "#    #    P",
+    "I    #    #",
+    "# B  #  A #",
+    "#    #    G",
+    "##R#####J##",
+]
+
+def _make_env():
+    env = CoopEnv(LEVEL)
+    env.reset(seed=0)
+    env.pending_orders = []
+    env.active_orders = [
+        {"meal": "onion-soup", "onions": 1, "tomatoes": 0,
+         "start": 0, "deadline": 9999, "served": False},
+    ]
+    return env
+
+def _counts(env):
+    return {name: int(env.event_counts[EVENT_INDEX[name]]) for name in EVENT_NAMES}
+
+def _nonzero(env):
+    return {k: v for k, v in _counts(env).items() if v}
+
+def test_counters_reset_with_episode():
+    env = _make_env()
+    env.step(0, 0)
+    assert _nonzero(env) == {"both_idle_steps": 1}
+
+    env.reset(seed=1)
+    assert env.event_counts.shape == (len(EVENT_NAMES),)
+    assert not env.event_counts.any()
+
+def test_pickups_are_counted_per_agent():
+    env = _make_env()
+    env.agent1_pos = [1, 4]
+    env.agent1_dir = (-1, 0)
+    env.agent2_pos = [2, 6]
+    env.agent2_dir = (0, 1)
+
+    env.step(5, 5)
+
+    assert _nonzero(env) == {"agent_1_ingredient_pickups": 1, "agent_2_bowl_pickups": 1}
+
+def test_pot_adds_split_into_valid_and_wrong():
+    env = _make_env()
+    env.agent2_pos = [9, 3]
+    env.agent2_dir = (1, 0)
+
+    env.agent2_holding = "tomato"
+    env.step(0, 5)
+    env.agent2_holding = "onion"
+    env.step(0, 5)
+
+    assert _counts(env)["wrong_pot_adds"] == 1
+    assert _counts(env)["agent_2_valid_pot_adds"] == 1
+    assert env.pot_state == "start"
+
+def test_serve_outcomes():
+    env = _make_env()
+    env.agent1_pos = [3, 1]
+    env.agent1_dir = (0, -1)
+
+    env.agent1_holding = "bowl-start-onion-soup"
+    env.step(5, 0)
+    env.agent1_holding = "bowl-done-tomato-soup"
+    env.step(5, 0)
+    env.agent1_holding = "bowl-done-onion-soup"
+    env.step(5, 0)
+
+    counts = _counts(env)
+    assert counts["not_done_serve_attempts"] == 1
+    assert counts["wrong_serve_attempts"] == 1
+    assert counts["agent_1_serves"] == 1
+    assert env.score == 1
+
+def test_soup_pickups_from_pot():
+    env = _make_env()
+    env.agent2_pos = [9, 3]
+    env.agent2_dir = (1, 0)
+    env.agent2_holding = "bowl"
+    env.pot_state = "done"
+    env.pot_onions = 0
+    env.pot_tomatoes = 1
+    env.pot_recipe = "tomato-soup"
+
+    env.step(0, 5)
+
+    assert _nonzero(env) == {"agent_2_done_soup_pickups": 1, "wrong_done_soup_pickups": 1}
+
+def test_collision_attempt_counted():
+    env = _make_env()
+    env.agent1_pos = [2, 2]
+    env.agent2_pos = [3, 2]
+
+    env.step(4, 0)
+
+    assert _counts(env)["collision_attempts"] == 1
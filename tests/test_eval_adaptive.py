@@ -0,0 +1,76 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+
+from evaluation.adaptive import AdaptiveStopper, wilson_interval, z_for_confidence, run_seed_batches
+from evaluation.results_writer import StreamingResultWriter, SB3_EVENT_KEYS
+
+
+def _result(seed, score):
+    return {
+        "seed": seed,
+        "score": score,
+        "perfect": score == 3,
+        "truncated": False,
+        "end_reason": "terminated",
+        "failed_orders": 3 - score,
+        "unserved_active_end": 0,
+        "steps": 600,
+        "total_reward": 20.0 * score,
+        "wrong_pot_adds": 0,
+    }
+
+
+def test_wilson_interval_contains_rate_and_shrinks():
+    z = z_for_confidence(0.95)
+    lo_small, hi_small = wilson_interval(45, 50, z)
+    lo_big, hi_big = wilson_interval(900, 1000, z)
+
+    assert lo_small < 0.9 < hi_small
+    assert lo_big < 0.9 < hi_big
+    assert (hi_big - lo_big) < (hi_small - lo_small)
+
+
+def test_fixed_size_run_has_no_adaptive_block(tmp_path):
+    writer = StreamingResultWriter(str(tmp_path / "a.csv"), str(tmp_path / "a.summary.json"), "level_1", SB3_EVENT_KEYS)
+    reason = run_seed_batches(writer, range(30), lambda s: _result(s, 3), stopper=None, batch_size=7)
+    summary = writer.close()
+
+    assert reason is None
+    assert summary["n_episodes"] == 30
+    assert "adaptive" not in summary
+
+
+def test_consistent_checkpoint_stops_early(tmp_path):
+    writer = StreamingResultWriter(str(tmp_path / "a.csv"), str(tmp_path / "a.summary.json"), "level_1", SB3_EVENT_KEYS)
+    stopper = AdaptiveStopper(perfect_width=0.2, score_width=0.2, min_episodes=50)
+
+    # perfect every time except one seed in twenty
+    reason = run_seed_batches(writer, range(2500), lambda s: _result(s, 2 if s % 20 == 0 else 3),
+                              stopper=stopper, batch_size=50)
+    summary = writer.close()
+
+    assert reason == "converged"
+    assert summary["n_episodes"] < 2500
+    assert summary["n_episodes"] % 50 == 0
+    adaptive = summary["adaptive"]
+    assert adaptive["episodes_used"] == summary["n_episodes"]
+    lo, hi = adaptive["score_mean_ci"]
+    assert lo <= summary["score_mean"] <= hi
+
+
+def test_dominated_checkpoint_stops_against_reference(tmp_path):
+    writer = StreamingResultWriter(str(tmp_path / "a.csv"), str(tmp_path / "a.summary.json"), "level_1", SB3_EVENT_KEYS)
+    reference = {"perfect_rate_ci": (0.9, 0.97), "score_mean_ci": (2.85, 2.95)}
+    stopper = AdaptiveStopper(perfect_width=0.001, score_width=0.001, min_episodes=50, reference=reference)
+
+    reason = run_seed_batches(writer, range(2500), lambda s: _result(s, 1 + s % 2), stopper=stopper, batch_size=50)
+    writer.close()
+
+    assert reason == "dominated"
+    assert writer.n_episodes == 50
+
+    with open(tmp_path / "a.summary.json") as f:
+        assert json.load(f)["adaptive"]["stop_reason"] == "dominated"
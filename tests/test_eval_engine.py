@@ -0,0 +1,76 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import pytest
+
+from environment.gym_wrapper_rllib_decentralised import GymCoopEnvRLlibDecentralised
+from evaluation.controllers import SB3JointController, RLlibCentralisedController, RLlibPerAgentController
+from evaluation.engine import run_episode, evaluate_level, eval_main, event_keys_for
+from evaluation.results_writer import StreamingResultWriter, EVENT_KEYS, DIAGNOSTIC_KEYS, result_fieldnames
+
+
+# Class: Stand-in policy that cycles through the actions, ignoring observations
+class CyclingModel:
+    def __init__(self):
+        self.t = 0
+
+    def _next(self):
+        self.t += 1
+        return self.t % 6
+
+    def predict(self, obs, deterministic=True):
+        assert obs.shape == (74 * 4,)
+        return np.array([self._next(), self._next()]), None
+
+    def compute_single_action(self, obs, policy_id=None, explore=False):
+        if policy_id is None:
+            return np.array([self._next(), self._next()])
+        return self._next()
+
+
+def test_every_controller_produces_the_same_columns():
+    controllers = [
+        SB3JointController(CyclingModel(), stack_n=4),
+        RLlibCentralisedController(CyclingModel()),
+        RLlibPerAgentController(CyclingModel(), GymCoopEnvRLlibDecentralised),
+    ]
+    results = [run_episode(c, "level_1", 3, True, 4, 40) for c in controllers]
+
+    for result in results:
+        assert list(result)[-len(DIAGNOSTIC_KEYS):] == list(DIAGNOSTIC_KEYS)
+        assert all(key in result for key in EVENT_KEYS)
+        assert result["steps"] == 40
+        assert result["end_reason"] == "cap_truncated"
+
+    # Same seed and same action sequence give the same episode whatever the adapter
+    assert results[0] == results[1] == results[2]
+
+
+def test_evaluate_level_streams_seeds_in_order(tmp_path):
+    writer = StreamingResultWriter(str(tmp_path / "e.csv"), str(tmp_path / "e.summary.json"), "level_1", EVENT_KEYS)
+    controller = RLlibCentralisedController(CyclingModel())
+
+    evaluate_level(writer, "rllib_centralised", None, "level_1", [5, 6, 7], stack_n=4,
+                   max_steps_cap=10, batch_size=2, controller=controller)
+    summary = writer.close()
+
+    assert summary["n_episodes"] == 3
+    with open(tmp_path / "e.csv") as f:
+        seeds = [line.split(",")[1] for line in f.read().splitlines()[1:]]
+    assert seeds == ["5", "6", "7"]
+
+
+def test_sb3_rows_keep_the_sb3_event_columns():
+    keys = event_keys_for("sb3")
+    result = run_episode(SB3JointController(CyclingModel(), stack_n=4), "level_1", 3, True, 4, 20, event_keys=keys)
+    assert list(result) == result_fieldnames(keys)
+    assert len(keys) == 5 and event_keys_for("rllib_centralised") == EVENT_KEYS
+
+
+def test_rllib_evaluation_refuses_worker_processes(tmp_path):
+    with pytest.raises(SystemExit):
+        eval_main("rllib_centralised", argv=["--checkpoint", str(tmp_path), "--workers", "2"])
+    with pytest.raises(ValueError, match="Ray"):
+        evaluate_level(None, "rllib_decentralised", str(tmp_path), "level_1", [0], workers=2)
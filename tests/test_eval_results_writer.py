@@ -0,0 +1,146 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import csv
+import json
+
+import pytest
+
+from evaluation.results_writer import StreamingResultWriter, SB3_EVENT_KEYS, EVENT_KEYS, result_fieldnames
+
+
+def _fake_result(seed, score, failed=0, wrong_adds=0):
+    return {
+        "level": "level_1",
+        "seed": seed,
+        "deterministic": True,
+        "steps": 500 + seed,
+        "terminated": True,
+        "truncated": False,
+        "end_reason": "terminated",
+        "score": score,
+        "failed_orders": failed,
+        "unserved_active_end": 0,
+        "pending_left_end": 0,
+        "completed_orders": score,
+        "perfect": bool(score == 3 and failed == 0),
+        "total_reward": 10.5 * score,
+        "wrong_serve_attempts": 0,
+        "not_done_serve_attempts": 0,
+        "wrong_done_soup_pickups": 0,
+        "burnt_soup_pickups": 0,
+        "wrong_pot_adds": wrong_adds,
+        "collision_attempts": seed % 3,
+        "stuck_penalty_steps": 0,
+        "both_idle_steps": 1,
+    }
+
+
+def test_summary_matches_batch_aggregation(tmp_path):
+    csv_path = str(tmp_path / "eval.csv")
+    json_path = str(tmp_path / "eval.summary.json")
+
+    results = [_fake_result(0, 3), _fake_result(1, 2, failed=1, wrong_adds=2), _fake_result(2, 3)]
+
+    with StreamingResultWriter(csv_path, json_path, "level_1", SB3_EVENT_KEYS) as writer:
+        for r in results:
+            writer.write(r)
+
+    with open(json_path) as f:
+        summary = json.load(f)
+
+    assert summary["n_episodes"] == 3
+    assert summary["perfect_rate"] == 2 / 3
+    assert summary["score_mean"] == 8 / 3
+    assert summary["score_min"] == 2 and summary["score_max"] == 3
+    assert summary["failed_orders"] == {"mean": 1 / 3, "sum": 1, "max": 1.0}
+    assert summary["events"]["wrong_pot_add_seeds"] == [1]
+    assert summary["end_reasons"] == {"terminated": 3}
+
+    # the events block keeps its historic key order for the plotting scripts
+    assert list(summary["events"].keys())[-4:] == [
+        "wrong_pot_add_seeds", "collision_attempts", "stuck_penalty_steps", "both_idle_steps"
+    ]
+
+    with open(csv_path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [int(r["seed"]) for r in rows] == [0, 1, 2]
+    assert list(rows[0].keys()) == list(results[0].keys())
+
+
+def test_resume_rebuilds_aggregates_and_drops_partial_row(tmp_path):
+    csv_path = str(tmp_path / "eval.csv")
+    json_path = str(tmp_path / "eval.summary.json")
+
+    writer = StreamingResultWriter(csv_path, json_path, "level_1", SB3_EVENT_KEYS)
+    writer.write(_fake_result(0, 3))
+    writer.write(_fake_result(1, 1, failed=2))
+    writer.sync()
+    writer._file.close()
+
+    # simulate a crash half way through writing the next row
+    with open(csv_path, "a") as f:
+        f.write("level_1,2,True,5")
+
+    resumed = StreamingResultWriter(csv_path, json_path, "level_1", SB3_EVENT_KEYS, resume=True)
+    assert resumed.completed_seeds == {0, 1}
+    resumed.write(_fake_result(2, 3))
+    summary = resumed.close()
+
+    assert summary["n_episodes"] == 3
+    assert summary["score_mean"] == 7 / 3
+    assert summary["failed_orders"]["sum"] == 2
+
+    with open(csv_path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [int(r["seed"]) for r in rows] == [0, 1, 2]
+
+
+def test_resume_summarises_only_the_requested_seeds(tmp_path):
+    csv_path = str(tmp_path / "eval.csv")
+    json_path = str(tmp_path / "eval.summary.json")
+
+    # A full 250-seed sweep where only seeds 0-31 are all perfect
+    with StreamingResultWriter(csv_path, json_path, "level_1", SB3_EVENT_KEYS) as writer:
+        for seed in range(250):
+            writer.write(_fake_result(seed, 3 if seed < 32 else 1, failed=0 if seed < 32 else 2))
+
+    resumed = StreamingResultWriter(csv_path, json_path, "level_1", SB3_EVENT_KEYS, resume=True, seeds=range(32))
+    assert resumed.completed_seeds == set(range(32))
+    summary = resumed.close()
+    assert summary["n_episodes"] == 32
+    assert summary["perfect_rate"] == 1.0
+
+    # Rows of other seeds are kept in the CSV
+    with open(csv_path, newline="") as f:
+        assert len(list(csv.DictReader(f))) == 250
+
+
+def test_resume_refuses_a_csv_from_a_different_run(tmp_path):
+    csv_path = str(tmp_path / "eval.csv")
+    json_path = str(tmp_path / "eval.summary.json")
+    fieldnames = result_fieldnames(SB3_EVENT_KEYS)
+    config = {"model": "checkpoint_500000", "deterministic": True, "max_steps_cap": None}
+
+    with StreamingResultWriter(csv_path, json_path, "level_1", SB3_EVENT_KEYS,
+                               fieldnames=fieldnames, config=config) as writer:
+        writer.write(_fake_result(0, 3))
+
+    with pytest.raises(ValueError, match="columns"):
+        StreamingResultWriter(csv_path, json_path, "level_1", EVENT_KEYS, resume=True,
+                              fieldnames=result_fieldnames(EVENT_KEYS), config=config)
+    with pytest.raises(ValueError, match="level"):
+        StreamingResultWriter(csv_path, json_path, "level_2", SB3_EVENT_KEYS, resume=True,
+                              fieldnames=fieldnames, config=config)
+    with pytest.raises(ValueError, match="deterministic"):
+        StreamingResultWriter(csv_path, json_path, "level_1", SB3_EVENT_KEYS, resume=True,
+                              fieldnames=fieldnames, config=dict(config, deterministic=False))
+    with pytest.raises(ValueError, match="max_steps_cap"):
+        StreamingResultWriter(csv_path, json_path, "level_1", SB3_EVENT_KEYS, resume=True,
+                              fieldnames=fieldnames, config=dict(config, max_steps_cap=400))
+
+    resumed = StreamingResultWriter(csv_path, json_path, "level_1", SB3_EVENT_KEYS, resume=True,
+                                    fieldnames=fieldnames, config=config)
+    assert resumed.completed_seeds == {0}
+    resumed.close()
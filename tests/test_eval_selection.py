@@ -0,0 +1,67 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from evaluation.results_writer import StreamingResultWriter, SB3_EVENT_KEYS
+from evaluation.selection import budget_schedule, rank_checkpoints, round_summaries, successive_halving
+from test_eval_results_writer import _fake_result
+
+
+def _summary(score_mean, perfect_rate=0.0, failed=0.0):
+    return {"score_mean": score_mean, "perfect_rate": perfect_rate, "failed_orders": {"mean": failed}}
+
+
+def test_ranking_follows_benchmark_rule():
+    summaries = {
+        500_000: _summary(2.5, 0.5, 0.4),
+        1_000_000: _summary(2.9, 0.1, 0.1),
+        1_500_000: _summary(2.9, 0.3, 0.1),
+        2_000_000: _summary(2.9, 0.3, 0.05),
+        2_500_000: _summary(2.9, 0.3, 0.05),
+    }
+    # score_mean, then perfect_rate, then fewer failures, then earlier checkpoint
+    assert rank_checkpoints(summaries) == [2_000_000, 2_500_000, 1_500_000, 1_000_000, 500_000]
+
+
+def test_budget_schedule_doubles_up_to_validation_cap():
+    assert budget_schedule(32, 250) == [32, 64, 128, 250]
+    assert budget_schedule(250, 250) == [250]
+
+
+def test_successive_halving_keeps_top_fraction_and_picks_best():
+    true_score = {step: 1.0 + (step % 7) * 0.2 for step in range(500_000, 10_500_000, 500_000)}
+    calls = []
+
+    def evaluate(steps, budget):
+        calls.append((list(steps), budget))
+        return {s: _summary(true_score[s]) for s in steps}
+
+    best = max(true_score, key=lambda s: (true_score[s], -s))
+    winner, history = successive_halving(list(true_score), evaluate, min_budget=32, max_budget=250)
+
+    assert winner == best
+    assert [len(steps) for steps, _ in calls] == [20, 10, 5, 3]
+    assert [budget for _, budget in calls] == [32, 64, 128, 250]
+    assert history[-1]["kept"] == [best]
+
+
+def test_rounds_are_scored_on_their_budget_seeds_only(tmp_path):
+    # Full 250-seed sweep CSVs already on disk: checkpoint 500k is perfect on the
+    # first 32 seeds and weak after, 1M is the reverse and better over all 250
+    for step, early, late in ((500_000, 3, 1), (1_000_000, 2, 3)):
+        base = str(tmp_path / f"eval_checkpoint_{step}_level_1")
+        with StreamingResultWriter(base + ".csv", base + ".summary.json", "level_1", SB3_EVENT_KEYS) as writer:
+            for seed in range(250):
+                writer.write(_fake_result(seed, early if seed < 32 else late))
+
+    rounds = []
+
+    def evaluate(steps, budget):
+        rounds.append(round_summaries(str(tmp_path), steps, "level_1", budget))
+        return rounds[-1]
+
+    winner, history = successive_halving([500_000, 1_000_000], evaluate, min_budget=32, max_budget=250)
+
+    assert [summary["n_episodes"] for summary in rounds[0].values()] == [32, 32]
+    assert history[0]["score_mean"] == {"500000": 3.0, "1000000": 2.0}
+    assert winner == 500_000
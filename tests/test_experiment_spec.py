@@ -0,0 +1,44 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import glob
+import pytest
+
+from agents.experiment import EXPERIMENTS_DIR, load_spec, resolve_spec
+
+def test_shipped_specs_resolve_to_the_original_run_names():
+    paths = sorted(glob.glob(os.path.join(EXPERIMENTS_DIR, "*.json")))
+    assert len(paths) == 9
+
+    for path in paths:
+        spec = resolve_spec(load_spec(path))
+        assert spec["name"] == os.path.splitext(os.path.basename(path))[0]
+        assert spec["timesteps"] == 10_000_000
+        assert spec["checkpoint_every"] == 500_000
+        assert spec["resources"]["rollout_fragment_length"] == 4096
+
+def test_unknown_or_invalid_settings_are_rejected():
+    with pytest.raises(ValueError, match="ppo.learning_rate"):
+        resolve_spec({"variant": "centralised", "level": "level_1", "ppo": {"learning_rate": 1e-3}})
+    with pytest.raises(ValueError, match="variant"):
+        resolve_spec({"variant": "shared", "level": "level_1"})
+
+    # Model options pass straight through to RLlib
+    spec = resolve_spec({"variant": "centralised", "level": "level_1", "ppo": {"model": {"fcnet_hiddens": [64]}}})
+    assert spec["ppo"]["model"] == {"fcnet_hiddens": [64], "fcnet_activation": "tanh", "vf_share_layers": False}
+
+def test_command_line_overrides_apply_on_top_of_the_spec_file():
+    from agents.train_rllib import build_parser, spec_from_args
+
+    path = os.path.join(EXPERIMENTS_DIR, "ppo_decentralised_level_2.json")
+    args = build_parser().parse_args([
+        path, "--level", "level_3", "--num-env-runners", "2",
+        "--set", "ppo.lr=0.0003", "resources.num_envs_per_env_runner=4", "checkpoint_every=250000",
+    ])
+    spec = spec_from_args(args)
+
+    assert spec["name"] == "ppo_decentralised_level_3"
+    assert spec["ppo"]["lr"] == 0.0003
+    assert spec["checkpoint_every"] == 250_000
+    assert spec["resources"]["rollout_fragment_length"] == 32768 // (2 * 4)
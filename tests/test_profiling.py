@@ -0,0 +1,86 @@
+import os
+import sys
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from types import SimpleNamespace
+
+from environment import profiling
+from environment.gym_wrapper_rllib_centralised import GymCoopEnvRLlibCentralised
+
+ENV_PHASES = {"env.orders", "env.movement", "env.interact", "env.pot_timer", "env.done_check", "env.observation"}
+
+def _run_steps(env, n):
+    for i in range(n):
+        env.step([i % 6, (i + 3) % 6])
+
+def test_profiling_is_off_by_default():
+    assert profiling.PROFILER is None
+    env = GymCoopEnvRLlibCentralised({"level_name": "level_1", "stack_n": 4})
+    env.reset(seed=0)
+    _run_steps(env, 10)
+    assert profiling.drain() == {}
+
+def test_profiled_block_times_every_phase_once_per_step():
+    env = GymCoopEnvRLlibCentralised({"level_name": "level_1", "stack_n": 4})
+
+    with profiling.profiled() as prof:
+        env.reset(seed=0)
+        _run_steps(env, 25)
+
+    assert profiling.PROFILER is None
+    snap = prof.snapshot()
+    for name in ENV_PHASES | {"wrapper.obs_encoding", "wrapper.frame_stack"}:
+        assert snap[name]["calls"] == 25, name
+        assert snap[name]["total_s"] >= 0.0
+    # _get_obs runs once on reset as well
+    assert snap["wrapper.bfs_lookup"]["calls"] == 26
+    assert snap["wrapper.bfs_maps"]["calls"] == 1
+
+def test_callback_merges_runner_snapshots_into_result():
+    from agents.callbacks import ProfilingCallbacks
+
+    runner_snapshots = [
+        {"env.movement": {"total_s": 1.0, "calls": 10, "mean_us": 1e5}},
+        {"env.movement": {"total_s": 3.0, "calls": 30, "mean_us": 1e5}},
+        {},
+    ]
+    group = SimpleNamespace(foreach_env_runner=lambda fn, local_env_runner=True: runner_snapshots)
+    algo = SimpleNamespace(env_runner_group=group, config=SimpleNamespace(env_config={"profile_every": 2}))
+
+    result = {"training_iteration": 1}
+    ProfilingCallbacks().on_train_result(algorithm=algo, result=result)
+    assert result["profiling"]["env.movement"]["calls"] == 40
+    assert abs(result["profiling"]["env.movement"]["total_s"] - 4.0) < 1e-9
+
+    skipped = {"training_iteration": 2}
+    ProfilingCallbacks().on_train_result(algorithm=algo, result=skipped)
+    assert "profiling" not in skipped
+
+def test_throughput_callback_splits_iteration_time():
+    from agents.callbacks import ThroughputCallbacks, summarise_throughput
+
+    timers = {name: SimpleNamespace(_total_time=0.0) for name in ("sample", "learn", "synch_weights")}
+    group = SimpleNamespace(num_remote_env_runners=lambda: 2,
+                            foreach_env_runner=lambda fn, local_env_runner=True: [100.0, 150.0])
+    algo = SimpleNamespace(_timers=timers, env_runner_group=group)
+
+    callbacks = ThroughputCallbacks()
+    callbacks.on_algorithm_init(algorithm=algo)
+    time.sleep(0.005)
+    timers["sample"]._total_time = 0.002
+    timers["learn"]._total_time = 0.001
+    result = {"num_env_steps_sampled_this_iter": 4000, "env_runners": {"episodes_this_iter": 8}}
+    callbacks.on_train_result(algorithm=algo, result=result)
+
+    speed = result["throughput"]
+    assert speed["env_steps"] == 4000 and speed["episodes"] == 8
+    assert abs(speed["sample_s"] - 0.002) < 1e-12 and abs(speed["learn_s"] - 0.001) < 1e-12
+    assert speed["wall_s"] >= speed["sample_s"]
+    assert abs(speed["env_runner_idle_s"] - (speed["wall_s"] - speed["sample_s"])) < 1e-12
+    assert speed["env_runner_rss_mb"] == 250.0 and speed["driver_rss_mb"] > 0
+
+    summary = summarise_throughput([speed, speed])
+    assert summary["iterations"] == 2 and summary["env_steps"] == 8000
+    assert abs(summary["env_steps_per_sec"] - speed["env_steps_per_sec"]) < 1e-6
+    assert summarise_throughput([]) == {"iterations": 0}
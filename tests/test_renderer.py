@@ -0,0 +1,228 @@
+import os
+import sys
+import subprocess
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import pytest
+from pygame import Rect, Surface, draw, font, surfarray, transform
+
+from environment.env import CoopEnv, COOK_TIME, BURN_TIME, find_char
+from environment.levels import LEVELS
+from environment.renderer import CoopRenderer, get_font
+from evaluation.engine import init_headless_pygame
+
+# Function: CoopEnv.render as it was before CoopRenderer, kept verbatim as the golden
+# reference: it rebuilds fonts and icons and redraws every tile on each call
+def _reference_render(env, screen):
+    # Draw header background with score, orders, and feedback text
+    header_rect = (0, 0, env.grid_width * env.tile_size, env.header_size)
+    draw.rect(screen, env.header_bg_color, header_rect)
+
+    font1 = font.SysFont("arial", 24, bold=True)
+    score_text = font1.render(f"Score: {env.score}", True, env.header_text_color)
+    screen.blit(score_text, (10, 13))
+
+    if env.feedback_text:
+        font_feedback = font.SysFont("arial", 20)
+        feedback_surf = font_feedback.render(env.feedback_text, True, env.feedback_color)
+        screen.blit(feedback_surf, (10, 50))
+
+    orders_to_show = [o for o in env.active_orders if not o.get("served")]
+    orders_to_show = sorted(orders_to_show, key=lambda o: o["deadline"])
+
+    if orders_to_show:
+        font_orders = font.SysFont("arial", 18)
+        start_x = 150
+        y = 10
+        gap = 8
+
+        icon_size = 26
+        icon_gap = 4
+        onion_icon_small = transform.smoothscale(env.item_sprites["onion"], (icon_size, icon_size))
+        tomato_icon_small = transform.smoothscale(env.item_sprites["tomato"], (icon_size, icon_size))
+
+        x = start_x
+
+        for order in orders_to_show[:4]:
+            remaining = max(0, order["deadline"] - env.step_count)
+
+            fill_color = (45, 45, 75)
+            border_color = (110, 110, 170)
+            if remaining < 300:
+                border_color = (200, 90, 90)
+
+            onions = order.get("onions", 0)
+            tomatoes = order.get("tomatoes", 0)
+            total_icons = onions + tomatoes
+
+            seconds_left = remaining / 60.0
+            time_text = f"{seconds_left:.1f}s"
+            time_surf = font_orders.render(time_text, True, env.header_text_color)
+
+            icons_width = 0
+            if total_icons > 0:
+                icons_width = total_icons * icon_size + (total_icons - 1) * icon_gap
+
+            card_w = 40 + icons_width + time_surf.get_width() + 20
+            card_h = 32
+
+            rect = Rect(x, y, card_w, card_h)
+            draw.rect(screen, fill_color, rect, border_radius=8)
+            draw.rect(screen, border_color, rect, width=2, border_radius=8)
+
+            icon_y = y + (card_h - icon_size) // 2
+            icon_x = x + 10
+
+            for _ in range(onions):
+                screen.blit(onion_icon_small, (icon_x, icon_y))
+                icon_x += icon_size + icon_gap
+
+            for _ in range(tomatoes):
+                screen.blit(tomato_icon_small, (icon_x, icon_y))
+                icon_x += icon_size + icon_gap
+
+            time_rect = time_surf.get_rect()
+            time_rect.midright = (x + card_w - 10, y + card_h // 2)
+            screen.blit(time_surf, time_rect)
+
+            x += card_w + gap
+
+    # Draw the grid with tiles, cooking pot (with timer),
+    # items on counters, serving station state, and agents
+    for y, row in enumerate(env.level):
+        for x, char in enumerate(row):
+            if char == "A" or char == "B":
+                char = " "
+
+            if char == "P":
+                pot_sprite = env.pot_sprites[env.pot_state]
+                screen.blit(pot_sprite, (x * env.tile_size, y * env.tile_size + env.header_size))
+
+                if env.pot_state != "idle":
+                    font1 = font.SysFont("arial", 16, bold=True)
+
+                    if env.pot_state == "start":
+                        pot_time = font1.render(f"{(COOK_TIME - env.pot_timer) / 60:.1f}", True, (255, 255, 255))
+
+                    elif env.pot_state == "done":
+                        pot_time = font1.render(f"{(BURN_TIME - env.pot_timer) / 60:.1f}", True, (0, 255, 0))
+
+                    else:
+                        if (env.step_count // 10) % 2 == 0:
+                            color = (255, 0, 0)
+                        else:
+                            color = (255, 100, 100)
+                        pot_time = font1.render("!", True, color)
+
+                    pot_rect = pot_time.get_rect(center=(x * env.tile_size + env.tile_size // 2,
+                                                y * env.tile_size + env.header_size + env.tile_size // 2))
+                    screen.blit(pot_time, pot_rect)
+
+            else:
+                sprite = env.tile_sprites[char]
+                screen.blit(sprite, (x * env.tile_size, y * env.tile_size + env.header_size))
+
+    for (x, y), item_name in env.wall_items.items():
+        if item_name.startswith("bowl-done"):
+            item_name = "bowl-done"
+        elif item_name.startswith("bowl-start"):
+            item_name = "bowl-start"
+        elif item_name.startswith("bowl-burnt"):
+            item_name = "bowl-burnt"
+        sprite = env.item_sprites[item_name]
+        screen.blit(sprite, (x * env.tile_size, y * env.tile_size + env.header_size))
+
+    if env.serving_state != "idle":
+        sprite = env.item_sprites[env.serving_state]
+        serving_x, serving_y = find_char(env.level, "S")
+        screen.blit(sprite, (serving_x * env.tile_size, serving_y * env.tile_size + env.header_size))
+
+    # Agent 1 sprite selection and rendering
+    dir_name = env._dir_to_name(env.agent1_dir)
+    carry_name = env._carry_to_name(env.agent1_holding)
+    if dir_name == "up" and carry_name != "empty":
+        carry_name = "carry"
+
+    sprite = env.agent1_sprites[(dir_name, carry_name)]
+    screen.blit(sprite, (env.agent1_pos[0] * env.tile_size,
+                        env.agent1_pos[1] * env.tile_size + env.header_size))
+
+    # Agent 2 sprite selection and rendering
+    dir_name = env._dir_to_name(env.agent2_dir)
+    carry_name = env._carry_to_name(env.agent2_holding)
+    if dir_name == "up" and carry_name != "empty":
+        carry_name = "carry"
+
+    sprite = env.agent2_sprites[(dir_name, carry_name)]
+    screen.blit(sprite, (env.agent2_pos[0] * env.tile_size,
+                        env.agent2_pos[1] * env.tile_size + env.header_size))
+
+def _frame(draw_fn, env):
+    # Wider and taller than the grid, so anything drawn outside it is compared too
+    screen = Surface((env.grid_width * env.tile_size + 200, env.grid_height * env.tile_size + env.header_size + 50))
+    screen.fill((20, 20, 30))
+    draw_fn(screen)
+    return surfarray.array3d(screen)
+
+@pytest.mark.parametrize("level", ["level_1", "level_2", "level_3"])
+@pytest.mark.parametrize("header_size", [0, 80])
+def test_renderer_matches_the_uncached_render_path(level, header_size):
+    init_headless_pygame()
+    env = CoopEnv(LEVELS[level], header_size=header_size, render=True)
+    env.reset(seed=5)
+    rng = np.random.default_rng(5)
+    for t in range(400):
+        env.step(int(rng.integers(6)), int(rng.integers(6)))
+        if t % 100 == 99:
+            # Cover every pot sprite and timer text, and a full serving station
+            env.pot_state = ("start", "done", "burnt", "idle")[t // 100]
+            env.pot_timer = t % 120
+            env.serving_state = "bowl-done"
+        if t % 25 == 24:
+            assert np.array_equal(_frame(env.render, env), _frame(lambda screen: _reference_render(env, screen), env))
+    assert get_font("arial", 18) is get_font("arial", 18)
+
+def test_cached_renderer_matches_a_fresh_one_after_many_frames():
+    init_headless_pygame()
+    env = CoopEnv(LEVELS["level_3"], header_size=80, render=True)
+    env.reset(seed=5)
+    rng = np.random.default_rng(5)
+    for t in range(400):
+        env.step(int(rng.integers(6)), int(rng.integers(6)))
+        _frame(env.render, env)
+        if t % 100 == 99:
+            # Cover every pot sprite and timer text
+            env.pot_state = ("start", "done", "burnt", "idle")[t // 100]
+            env.pot_timer = t % 120
+            assert np.array_equal(_frame(env.render, env), _frame(CoopRenderer(env).render, env))
+    assert get_font("arial", 18) is get_font("arial", 18)
+
+# Rendered in a child process: a font freed by pygame.quit() crashes the interpreter
+RENDER_AFTER_QUIT = """
+import os, sys
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+sys.path.insert(0, sys.argv[1])
+import pygame
+from environment.env import CoopEnv
+from environment.levels import LEVELS
+
+kept = None
+for i in range(3):
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    env = CoopEnv(LEVELS["level_1"], header_size=80, render=True)
+    env.reset(seed=i)
+    kept = kept or env
+    for e in (env, kept):
+        e.step(1, 2)
+        e.render(pygame.Surface((600, 600)))
+    pygame.quit()
+print("rendered")
+"""
+
+def test_rendering_survives_pygame_quit_and_reinit():
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    proc = subprocess.run([sys.executable, "-c", RENDER_AFTER_QUIT, root], capture_output=True, text=True, timeout=300)
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    assert "rendered" in proc.stdout
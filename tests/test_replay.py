@@ -0,0 +1,69 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+
+from environment.replay import EpisodeReplay, event_steps, first_divergence
+from environment.env import EVENT_NAMES
+from environment.rollouts import RolloutReader, RolloutWriter
+from evaluation.controllers import RLlibCentralisedController
+from evaluation.engine import evaluate_level
+from evaluation.results_writer import StreamingResultWriter, EVENT_KEYS
+
+# Class: Stand-in joint policy playing random actions, so episodes pick up and drop items
+class RandomModel:
+    def __init__(self, seed):
+        self.rng = np.random.default_rng(seed)
+
+    def compute_single_action(self, obs, explore=False):
+        return self.rng.integers(0, 6, size=2)
+
+def _exported_episode(tmp_path, seed):
+    writer = StreamingResultWriter(str(tmp_path / "e.csv"), str(tmp_path / "e.summary.json"), "level_1", EVENT_KEYS)
+    with RolloutWriter(str(tmp_path / "rollouts"), level="level_1", stack_n=4) as rollouts:
+        evaluate_level(writer, "rllib_centralised", None, "level_1", [seed], stack_n=4, max_steps_cap=300,
+                       controller=RLlibCentralisedController(RandomModel(seed)), rollouts=rollouts)
+    writer.close()
+    return RolloutReader(str(tmp_path / "rollouts")).episode(seed)
+
+def test_replay_reproduces_an_exported_eval_episode(tmp_path):
+    episode = _exported_episode(tmp_path, seed=11)
+    assert episode["events"][-1].sum() > 0
+    assert first_divergence(episode) is None
+
+    replay = EpisodeReplay.from_rollout(episode)
+    replay.run()
+    assert replay.t == 300
+    assert np.allclose(replay.rewards, episode["rewards"], atol=1e-5)
+    assert np.array_equal(replay.env.event_counts, episode["events"][-1])
+
+def test_seeking_matches_stepping_in_order(tmp_path):
+    episode = _exported_episode(tmp_path, seed=12)
+    replay = EpisodeReplay.from_rollout(episode, snapshot_every=7)
+
+    for t in (250, 3, 0, 118, 119, 300, 42):
+        replay.seek(t)
+        expected = episode["state"][t - 1] if t else None
+        if expected is not None:
+            assert np.array_equal(replay.state(), expected), t
+        else:
+            assert replay.env.step_count == 0 and replay.env.score == 0
+
+    # Backwards seeks restore the snapshot in place, leaving no stale order state behind
+    replay.seek(300)
+    end_orders = [dict(o) for o in replay.env.active_orders]
+    replay.seek(10)
+    replay.seek(300)
+    assert replay.env.active_orders == end_orders
+
+def test_event_steps_point_just_after_each_event(tmp_path):
+    episode = _exported_episode(tmp_path, seed=11)
+    marks = event_steps(episode, ["collision_attempts", "orders_failed"])
+    assert len(marks["collision_attempts"]) > 0 and len(marks["orders_failed"]) == 0
+
+    replay = EpisodeReplay.from_rollout(episode)
+    column = list(EVENT_NAMES).index("collision_attempts")
+    for t in marks["collision_attempts"]:
+        before = replay.seek(t - 1).event_counts[column]
+        assert replay.seek(t).event_counts[column] == before + 1
@@ -0,0 +1,69 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+
+from environment.gym_wrapper_rllib_decentralised import GymCoopEnvRLlibDecentralised
+from environment.rollouts import RolloutReader, RolloutWriter, STATE_INDEX, record_env, stack_frames
+from evaluation.controllers import RLlibCentralisedController
+from evaluation.engine import evaluate_level
+from evaluation.results_writer import StreamingResultWriter, EVENT_KEYS
+from test_eval_engine import CyclingModel
+
+def test_eval_export_matches_the_results_and_streams_in_chunks(tmp_path):
+    writer = StreamingResultWriter(str(tmp_path / "e.csv"), str(tmp_path / "e.summary.json"), "level_1", EVENT_KEYS)
+    rollouts = RolloutWriter(str(tmp_path / "rollouts"), chunk_episodes=2, level="level_1", stack_n=4)
+
+    evaluate_level(writer, "rllib_centralised", None, "level_1", [5, 6, 7], stack_n=4, max_steps_cap=30,
+                   controller=RLlibCentralisedController(CyclingModel()), rollouts=rollouts)
+    writer.close()
+
+    # Two full chunks' worth is on disk before close, the third episode only after it
+    assert sorted(os.listdir(tmp_path / "rollouts")) == ["chunk_000000.npz", "index.csv", "meta.json"]
+    rollouts.close()
+
+    reader = RolloutReader(str(tmp_path / "rollouts"))
+    assert reader.seeds == [5, 6, 7]
+    assert [row["chunk"] for row in reader.index] == [0, 0, 1]
+
+    with open(tmp_path / "e.csv") as f:
+        header, *rows = [line.split(",") for line in f.read().splitlines()]
+    assert "rollout" not in header
+    for row, episode in zip(rows, reader):
+        result = dict(zip(header, row))
+        assert len(episode["rewards"]) == int(result["steps"]) == 30
+        assert np.isclose(episode["rewards"].sum(), float(result["total_reward"]), atol=1e-4)
+        assert episode["state"][-1, STATE_INDEX["step_count"]] == 30
+        assert episode["obs"].shape == (30, 1, reader.meta["columns"]["obs"]["shape"][-1])
+
+    # Episodes can be looked up by seed, and a reopened directory is appended to
+    again = RolloutWriter(str(tmp_path / "rollouts"), level="level_1")
+    again.write_episode(reader.episode(6), seed=9)
+    again.close()
+    reader = RolloutReader(str(tmp_path / "rollouts"))
+    assert reader.seeds == [5, 6, 7, 9] and reader.index[-1]["chunk"] == 2
+    assert np.array_equal(reader.episode(9)["actions"], reader.episode(6)["actions"])
+
+def test_recorded_training_env_keeps_every_other_episode(tmp_path):
+    env = GymCoopEnvRLlibDecentralised({"level_name": "level_1", "base_seed": 3, "vector_index": 0})
+    record_env(env, str(tmp_path), every=2, chunk_episodes=1)
+
+    seeds, first_obs = [], []
+    for _ in range(3):
+        obs, _ = env.reset()
+        seeds.append(env.env._seed)
+        first_obs.append(obs)
+        done = False
+        while not done:
+            obs, _, term, trunc, _ = env.step({"agent_1": 0, "agent_2": 0})
+            done = term["__all__"] or trunc["__all__"]
+    env.close()
+
+    reader = RolloutReader(str(tmp_path))
+    assert reader.seeds == [seeds[0], seeds[2]]
+    episode = reader.episode(seeds[0])
+    assert episode["dones"][-1] and not episode["dones"][:-1].any()
+    # Frames stacked back up give the observations the policy saw
+    stacked = stack_frames(episode["obs"], 4)
+    assert np.array_equal(stacked[0, 0], first_obs[0]["agent_1"]) and np.array_equal(stacked[0, 1], first_obs[0]["agent_2"])
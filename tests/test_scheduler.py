@@ -0,0 +1,44 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from agents.experiment import resolve_spec
+from agents.scheduler import absolute_dirs, next_fit, run_all, run_cpus, share_env_runners
+
+def _spec(level, runners):
+    return resolve_spec({"variant": "centralised", "level": level, "resources": {"num_env_runners": runners}})
+
+def test_small_runs_fill_around_a_run_that_does_not_fit():
+    pending = [_spec("level_1", 7), _spec("level_2", 1), _spec("level_3", 0)]
+    assert [run_cpus(s) for s in pending] == [8, 2, 1]
+
+    assert next_fit(pending, 8) == 0
+    assert next_fit(pending, 3) == 1
+    assert next_fit(pending, 1) == 2
+    assert next_fit(pending, 0) is None
+
+    # 9 runs on 32 cores: one driver + 2 env runners each
+    assert share_env_runners(32, 9) == 2
+    assert share_env_runners(4, 9) == 0
+
+def test_runs_that_can_never_start_are_rejected_before_ray_starts():
+    with pytest.raises(ValueError, match="needs 5 CPUs"):
+        run_all([_spec("level_1", 4)], num_cpus=4)
+    with pytest.raises(ValueError, match="ppo_centralised_level_1"):
+        run_all([_spec("level_1", 0), _spec("level_1", 0)], num_cpus=4)
+
+def test_evaluation_worker_takes_its_own_cpu():
+    spec = resolve_spec({"variant": "decentralised", "level": "level_2", "eval": {"episodes": 250},
+                         "resources": {"num_env_runners": 2}})
+    assert run_cpus(spec) == 4
+    assert share_env_runners(36, 9, fixed_cpus=2) == 2
+def test_every_output_directory_is_made_absolute(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    spec = resolve_spec({"variant": "centralised", "level": "level_1", "rollouts": {"out_dir": "rollouts"}})
+    spec = absolute_dirs(spec)
+    assert spec["models_dir"] == str(tmp_path / "models") and spec["log_dir"] == str(tmp_path / "logs")
+    assert spec["eval"]["out_dir"] == str(tmp_path / "eval_sweeps")
+    assert spec["rollouts"]["out_dir"] == str(tmp_path / "rollouts")
+    assert absolute_dirs(resolve_spec({"variant": "centralised", "level": "level_1"}))["rollouts"]["out_dir"] is None
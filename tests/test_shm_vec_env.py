@@ -0,0 +1,39 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from stable_baselines3.common.env_util import make_vec_env
+from stable_baselines3.common.monitor import Monitor
+from stable_baselines3.common.vec_env import VecFrameStack
+
+from environment.gym_wrapper import GymCoopEnv
+from environment.shm_vec_env import ShmSubprocVecEnv
+
+def test_shared_memory_env_steps_like_the_in_process_env():
+    reference = VecFrameStack(make_vec_env(GymCoopEnv, n_envs=3, seed=7), n_stack=4)
+    shared = VecFrameStack(make_vec_env(GymCoopEnv, n_envs=3, seed=7, vec_env_cls=ShmSubprocVecEnv,
+                                        vec_env_kwargs={"n_workers": 2, "start_method": "fork"}), n_stack=4)
+    try:
+        assert np.array_equal(reference.reset(), shared.reset())
+        rng = np.random.default_rng(0)
+        finished = 0
+        for _ in range(1200):
+            actions = rng.integers(0, 6, size=(3, 2))
+            obs_a, rew_a, done_a, info_a = reference.step(actions)
+            obs_b, rew_b, done_b, info_b = shared.step(actions)
+            assert np.array_equal(obs_a, obs_b) and np.array_equal(rew_a, rew_b) and np.array_equal(done_a, done_b)
+            for a, b in zip(info_a, info_b):
+                assert a.keys() == b.keys()
+                if "terminal_observation" in a:
+                    finished += 1
+                    assert np.array_equal(a["terminal_observation"], b["terminal_observation"])
+                    assert a["episode"]["r"] == b["episode"]["r"]
+        assert finished >= 3
+
+        # Per-env calls reach the right env in the right worker
+        assert shared.get_attr("_seed") == [7, 8, 9]
+        assert shared.env_is_wrapped(Monitor) == [True] * 3
+        assert shared.env_method("get_wrapper_attr", "observation_space", indices=[2])[0].shape == (74,)
+    finally:
+        shared.close()
@@ -0,0 +1,103 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import torch
+
+from agents.experiment import resolve_spec
+from agents.torch_ppo import TorchPPO, compute_gae
+from environment.gym_wrapper_rllib_decentralised import GymCoopEnvRLlibDecentralised
+from environment.vector_env import CoopVectorEnv
+
+def _tiny_spec(variant, tmp_path):
+    return resolve_spec({
+        "variant": variant,
+        "level": "level_1",
+        "models_dir": str(tmp_path),
+        "resources": {"num_envs_per_env_runner": 2},
+        "ppo": {"train_batch_size": 32, "minibatch_size": 16, "num_epochs": 2, "model": {"fcnet_hiddens": [16]}},
+    })
+
+def test_gae_stops_at_termination_and_bootstraps_at_truncation():
+    rewards = np.array([[1.0], [1.0], [1.0]], dtype=np.float32)
+    values = np.zeros((3, 1), dtype=np.float32)
+    dones = np.array([[0.0], [1.0], [0.0]], dtype=np.float32)
+
+    # Step 1 terminated: nothing flows back from step 2 into steps 0-1
+    next_values = np.array([[0.0], [0.0], [5.0]], dtype=np.float32)
+    adv = compute_gae(rewards, values, next_values, dones, gamma=0.5, lambda_=1.0)
+    assert np.allclose(adv[:, 0], [1.5, 1.0, 3.5])
+
+    # Step 1 hit the time limit instead: its own target uses the bootstrap value, still no flow-through
+    next_values[1] = 4.0
+    adv = compute_gae(rewards, values, next_values, dones, gamma=0.5, lambda_=1.0)
+    assert np.allclose(adv[:, 0], [2.5, 3.0, 3.5])
+
+def test_vector_env_seeds_like_the_local_env_runner():
+    venv = CoopVectorEnv(GymCoopEnvRLlibDecentralised, "level_1", num_envs=2, base_seed=100)
+    assert [env._initial_seed for env in venv.envs] == [100, 101]
+
+    obs = venv.reset()
+    assert obs.shape == (2, 2, 74 * 4)
+    ended = {}
+    while len(ended) < 2:
+        obs, rewards, terminated, truncated, final_obs = venv.step(np.zeros((2, 2), dtype=np.int64))
+        assert sorted(final_obs) == np.flatnonzero(terminated | truncated).tolist()
+        ended.update(final_obs)
+    assert ended[0].shape == (2, 74 * 4)
+    # Finished episodes are reported once, and the envs have moved on to new ones
+    assert len(venv.pop_episodes()) >= 2 and venv.finished == []
+    assert all(env.env.step_count < 1000 for env in venv.envs)
+
+def test_saved_checkpoint_acts_like_the_trainer(tmp_path):
+    from ray.rllib.policy.policy import Policy
+
+    ppo = TorchPPO(_tiny_spec("centralised", tmp_path))
+    result = ppo.train()
+    assert result["num_env_steps_sampled_lifetime"] == 32
+
+    ckpt = ppo.save(os.path.join(tmp_path, "checkpoint_32"))
+    assert os.path.isfile(os.path.join(ckpt, "weights_only.json"))
+    policy = Policy.from_checkpoint(os.path.join(ckpt, "policies", "default_policy"))
+
+    obs = np.random.default_rng(0).uniform(-1, 1, size=(5, 74 * 4)).astype(np.float32)
+    ours, _, _ = ppo.nets["default_policy"].act(torch.from_numpy(obs), deterministic=True)
+    for row, expected in zip(obs, ours.numpy()):
+        action, _, _ = policy.compute_single_action(row, explore=False)
+        assert list(action) == list(expected)
+
+def test_fused_policies_match_each_policy_and_follow_updates(tmp_path):
+    from agents.torch_ppo import FusedPolicies
+
+    ppo = TorchPPO(_tiny_spec("decentralised", tmp_path))
+    ppo.train()
+    nets = [ppo.nets[pid] for pid in ppo.policy_ids]
+    assert isinstance(ppo.fused, FusedPolicies)
+
+    obs = torch.from_numpy(np.random.default_rng(1).uniform(-1, 1, size=(2, 7, 74 * 4)).astype(np.float32))
+    logits, values = ppo.fused.forward(obs)
+    for p, net in enumerate(nets):
+        with torch.no_grad():
+            expected_logits, expected_values = net(obs[p])
+        assert torch.allclose(logits[p], expected_logits, atol=1e-6)
+        assert torch.allclose(values[p], expected_values, atol=1e-6)
+
+    # train() refreshes the fused copy after updating the separate policies
+    ppo.train()
+    with torch.no_grad():
+        assert torch.allclose(ppo.fused.forward(obs)[0][1], nets[1](obs[1])[0], atol=1e-6)
+def test_train_saves_and_evaluates_each_checkpoint_once(tmp_path):
+    import csv
+    from agents.train_torch_ppo import train
+
+    spec = _tiny_spec("centralised", tmp_path)
+    spec.update(name="tiny", timesteps=64, checkpoint_every=32, log_dir=str(tmp_path / "logs"))
+    spec["eval"].update(episodes=1, max_steps_cap=20, out_dir=str(tmp_path / "eval"))
+    train(spec)
+
+    assert sorted(os.listdir(tmp_path / "tiny" / "checkpoints")) == ["checkpoint_32", "checkpoint_64"]
+    with open(tmp_path / "logs" / "tiny" / "eval_progress.csv", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [int(row["step"]) for row in rows] == [32, 64]
+    assert os.path.isfile(tmp_path / "eval" / "tiny" / "eval_checkpoint_64_level_1.csv")
@@ -0,0 +1,62 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import cv2
+
+from environment.rollouts import RolloutWriter
+from evaluation.controllers import RLlibCentralisedController
+from evaluation.engine import evaluate_level
+from evaluation.results_writer import StreamingResultWriter, EVENT_KEYS
+from evaluation.video import record_videos, select_episodes
+from test_replay import RandomModel
+
+def test_select_episodes_ranks_by_score_then_failures_then_reward():
+    index = [
+        {"seed": 1, "score": 2, "failed_orders": 1, "total_reward": 5.0},
+        {"seed": 2, "score": 0, "failed_orders": 3, "total_reward": -9.0},
+        {"seed": 3, "score": 0, "failed_orders": 3, "total_reward": -7.0},
+        {"seed": 4, "score": 3, "failed_orders": 0, "total_reward": 20.0},
+        {"seed": 5, "score": 0, "failed_orders": 2, "total_reward": -10.0},
+    ]
+    assert [row["seed"] for row in select_episodes(index, 3, "worst")] == [2, 3, 5]
+    assert [row["seed"] for row in select_episodes(index, 2, "best")] == [4, 1]
+
+def test_record_videos_writes_one_frame_per_step(tmp_path):
+    writer = StreamingResultWriter(str(tmp_path / "e.csv"), str(tmp_path / "e.summary.json"), "level_1", EVENT_KEYS)
+    with RolloutWriter(str(tmp_path / "ckpt_level_1"), level="level_1", stack_n=4) as rollouts:
+        evaluate_level(writer, "rllib_centralised", None, "level_1", [1, 2], stack_n=4, max_steps_cap=20,
+                       controller=RLlibCentralisedController(RandomModel(0)), rollouts=rollouts)
+    writer.close()
+
+    videos = record_videos([str(tmp_path / "ckpt_level_1")], str(tmp_path / "videos"), n=1, which=("worst",))
+    assert len(videos) == 1
+    assert os.path.dirname(videos[0]["path"]) == str(tmp_path / "videos" / "ckpt_level_1")
+
+    capture = cv2.VideoCapture(videos[0]["path"])
+    assert int(capture.get(cv2.CAP_PROP_FRAME_COUNT)) == 21
+    ok, frame = capture.read()
+    assert ok and frame.mean() > 0
+def test_episodes_in_both_worst_and_best_are_rendered_once(tmp_path, monkeypatch):
+    import evaluation.video as video
+
+    writer = StreamingResultWriter(str(tmp_path / "e.csv"), str(tmp_path / "e.summary.json"), "level_1", EVENT_KEYS)
+    with RolloutWriter(str(tmp_path / "ckpt_level_1"), level="level_1", stack_n=4) as rollouts:
+        evaluate_level(writer, "rllib_centralised", None, "level_1", [1, 2, 3], stack_n=4, max_steps_cap=10,
+                       controller=RLlibCentralisedController(RandomModel(0)), rollouts=rollouts)
+    writer.close()
+
+    rendered = []
+    render = video.render_episode_video
+    monkeypatch.setattr(video, "render_episode_video", lambda *job: rendered.append(job[1]) or render(*job))
+    videos = record_videos([str(tmp_path / "ckpt_level_1")], str(tmp_path / "videos"), n=2)
+
+    # 3 episodes, 2 worst + 2 best: one seed is in both lists but is rendered once
+    assert len(videos) == 4 and sorted(rendered) == [1, 2, 3]
+    by_seed = {}
+    for v in videos:
+        by_seed.setdefault(v["seed"], []).append(v["path"])
+    shared = [paths for paths in by_seed.values() if len(paths) == 2]
+    assert len(shared) == 1
+    with open(shared[0][0], "rb") as a, open(shared[0][1], "rb") as b:
+        assert a.read() == b.read()
@@ -0,0 +1,69 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from ray.rllib.env.env_context import EnvContext
+
+from environment.gym_wrapper_rllib_centralised import GymCoopEnvRLlibCentralised
+from environment.gym_wrapper_rllib_decentralised import GymCoopEnvRLlibDecentralised
+from environment.gym_wrapper_rllib_decentralised_comms import GymCoopEnvRLlibDecentralisedComms
+
+WRAPPERS = [GymCoopEnvRLlibCentralised, GymCoopEnvRLlibDecentralised, GymCoopEnvRLlibDecentralisedComms]
+
+def _ctx(worker_index, vector_index, envs_per_runner=4):
+    return EnvContext(
+        {"level_name": "level_1", "stack_n": 1, "base_seed": 1000, "seed_envs_per_runner": envs_per_runner},
+        worker_index=worker_index,
+        vector_index=vector_index,
+    )
+
+@pytest.mark.parametrize("wrapper", WRAPPERS)
+def test_env_context_indices_give_disjoint_seeds(wrapper):
+    seeds = {}
+    for worker in (1, 2, 3):
+        for vector in range(4):
+            env = wrapper(_ctx(worker, vector))
+            assert (env.worker_index, env.vector_index) == (worker, vector)
+            seeds[(worker, vector)] = env._initial_seed
+
+    assert len(set(seeds.values())) == 12
+    assert seeds[(1, 0)] == 1000
+    assert seeds[(3, 3)] == 1000 + 2 * 4 + 3
+
+@pytest.mark.parametrize("wrapper", WRAPPERS)
+def test_plain_dict_indices_still_work(wrapper):
+    env = wrapper({"level_name": "level_1", "stack_n": 1, "base_seed": 50,
+                   "seed_envs_per_runner": 8, "worker_index": 2, "vector_index": 5})
+    assert env._initial_seed == 50 + 8 + 5
+
+def test_runner_count_splits_the_training_batch():
+    from agents.experiment import resolve_spec, build_config
+
+    def config(**resources):
+        return build_config(resolve_spec({"variant": "decentralised", "level": "level_1", "resources": resources}))
+
+    cfg = config(num_env_runners=3, num_envs_per_env_runner=8)
+    assert cfg.num_env_runners == 3
+    assert cfg.env_config["seed_envs_per_runner"] == 8
+    # ceil(32768 / 24), so one sampling round covers the full batch
+    assert cfg.rollout_fragment_length == 1366
+    cfg.validate()
+
+    assert config().rollout_fragment_length == 4096
+
+@pytest.mark.parametrize("wrapper", WRAPPERS)
+def test_rng_state_continues_the_episode_seed_sequence(wrapper):
+    env = wrapper(_ctx(1, 2))
+    assert env.get_rng_state() is None
+    env.reset()
+    env.reset()
+    state = env.get_rng_state()
+    env.reset()
+    expected = env.env._seed
+
+    # A fresh env (e.g. after resuming from a checkpoint) picks up where the first left off
+    resumed = wrapper(_ctx(1, 2))
+    resumed.set_rng_state(state)
+    resumed.reset()
+    assert resumed.env._seed == expected